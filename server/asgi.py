@@ -0,0 +1,45 @@
+import contextlib
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse
+from starlette.routing import Mount
+from routes.async_rag_routes import async_rag_routes
+from handlers.async_rag_handler import shutdown_handler
+from utils.metrics import RequestMetricsMiddleware
+from config.config import Config
+
+# ASGI counterpart of app.create_app serving the same /api/v1 routes with
+# AsyncOpenAI and AsyncQdrantClient. Run with:
+#   uvicorn --factory asgi:create_asgi_app --port 3006
+
+def create_asgi_app():
+    async def not_found(request, exc):
+        return JSONResponse({"error": "Not found"}, status_code=404)
+
+    async def server_error(request, exc):
+        return JSONResponse({"error": "Internal server error"}, status_code=500)
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        yield
+        await shutdown_handler()
+
+    return Starlette(
+        debug=Config.DEBUG,
+        routes=[Mount('/api/v1', routes=async_rag_routes)],
+        middleware=[
+            Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*']),
+            Middleware(RequestMetricsMiddleware, timings_default=Config.RESPONSE_TIMINGS)
+        ],
+        exception_handlers={404: not_found, 500: server_error},
+        lifespan=lifespan
+    )
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(
+        create_asgi_app(),
+        host="0.0.0.0",
+        port=Config.ASGI_PORT_NUMBER
+    )
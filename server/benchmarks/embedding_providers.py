@@ -0,0 +1,98 @@
+import argparse
+import json
+import time
+import numpy as np
+from openai import OpenAI
+from benchmarks.fake_openai import FakeOpenAIServer
+from rag.embedding_providers import create_embedding_provider
+
+# Latency and throughput of the embedding providers EMBEDDING_MODEL can
+# select: the hashing baseline, a local ONNX model (--onnx-model) and the
+# OpenAI API. The remote provider talks to the fake OpenAI server with
+# --remote-latency-ms of simulated round trip unless --openai-base-url and
+# --openai-api-key point it at a real endpoint.
+# Usage (from server/): python -m benchmarks.embedding_providers --onnx-model models/all-MiniLM-L6-v2
+
+WORDS = ("the cell membrane controls what enters and leaves while mitochondria produce energy for "
+         "the rest of the cell through respiration and the nucleus stores genetic information").split()
+
+
+def make_texts(rng: np.random.Generator, count: int, words: int) -> list:
+    return [" ".join(rng.choice(WORDS, words)) + f" {i}" for i in range(count)]
+
+
+def percentiles(latencies: list) -> dict:
+    latencies = np.array(latencies)
+    return {
+        "mean_ms": float(latencies.mean()),
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "p99_ms": float(np.percentile(latencies, 99))
+    }
+
+
+def measure(provider, texts: list, args) -> dict:
+    provider.embed(texts[:8])
+    single = []
+    for text in texts[:args.single_requests]:
+        started = time.perf_counter()
+        provider.embed([text])
+        single.append((time.perf_counter() - started) * 1000)
+
+    batches = {}
+    for batch_size in args.batch_sizes:
+        started = time.perf_counter()
+        for start in range(0, len(texts), batch_size):
+            provider.embed(texts[start:start + batch_size])
+        elapsed = time.perf_counter() - started
+        batches[f"batch_{batch_size}"] = {
+            "texts_per_sec": len(texts) / elapsed,
+            "ms_per_batch": elapsed * 1000 / -(-len(texts) // batch_size)
+        }
+    return {
+        "provider": provider.name,
+        "dimension": provider.dimension,
+        "single_text": percentiles(single),
+        "throughput": batches
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--texts", type=int, default=1024)
+    parser.add_argument("--words", type=int, default=80, help="words per text; CHUNK_SIZE=500 chars is ~80")
+    parser.add_argument("--single-requests", type=int, default=100)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 32, 256])
+    parser.add_argument("--onnx-model", help="directory with model.onnx and tokenizer.json")
+    parser.add_argument("--threads", type=int, default=0, help="ONNX intra-op threads; 0 lets onnxruntime pick")
+    parser.add_argument("--remote-model", default="text-embedding-ada-002")
+    parser.add_argument("--remote-latency-ms", type=float, default=80.0)
+    parser.add_argument("--openai-base-url")
+    parser.add_argument("--openai-api-key")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    texts = make_texts(np.random.default_rng(args.seed), args.texts, args.words)
+    if args.openai_base_url:
+        client = OpenAI(api_key=args.openai_api_key, base_url=args.openai_base_url)
+        remote = "openai"
+    else:
+        fake_openai = FakeOpenAIServer(embedding_latency_ms=args.remote_latency_ms).start()
+        client = OpenAI(api_key="benchmark", base_url=fake_openai.base_url)
+        remote = f"fake_openai ({args.remote_latency_ms} ms)"
+
+    providers = [("hashing", create_embedding_provider("hashing"))]
+    if args.onnx_model:
+        providers.append(("onnx", create_embedding_provider(f"onnx:{args.onnx_model}", threads=args.threads)))
+    providers.append((remote, create_embedding_provider(args.remote_model, openai_client=client)))
+
+    print(json.dumps({
+        "benchmark": "embedding_providers",
+        "texts": args.texts,
+        "words_per_text": args.words,
+        "results": [dict(measure(provider, texts, args), backend=backend) for backend, provider in providers]
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+import argparse
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+
+# Local stand-in for the OpenAI embeddings and chat-completions endpoints.
+# Embeddings are deterministic per input text and every response can be
+# delayed to mimic network and model latency. Point the server at it with
+# OPENAI_BASE_URL=http://127.0.0.1:<port>/v1
+
+
+def fake_embedding(text: str, dimension: int) -> list:
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+    vector = np.random.default_rng(seed).standard_normal(dimension).astype(np.float32)
+    vector /= np.linalg.norm(vector)
+    return vector.round(6).tolist()
+
+
+class FakeOpenAIServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, dimension: int = 1536,
+                 embedding_latency_ms: float = 0.0, chat_latency_ms: float = 0.0):
+        super().__init__(("127.0.0.1", port), _FakeOpenAIHandler)
+        self.dimension = dimension
+        self.embedding_latency_ms = embedding_latency_ms
+        self.chat_latency_ms = chat_latency_ms
+        self.requests = {"embeddings": 0, "chat": 0}
+        self._counter_lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+    def count(self, endpoint: str):
+        with self._counter_lock:
+            self.requests[endpoint] += 1
+
+    def start(self) -> "FakeOpenAIServer":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+class _FakeOpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if self.path.endswith("/embeddings"):
+            self.server.count("embeddings")
+            self._embeddings(body)
+        elif self.path.endswith("/chat/completions"):
+            self.server.count("chat")
+            self._chat(body)
+        else:
+            self._send_json({"error": {"message": f"Unknown path {self.path}"}}, status=404)
+
+    def _embeddings(self, body: dict):
+        inputs = body.get("input", [])
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        time.sleep(self.server.embedding_latency_ms / 1000)
+        tokens = sum(len(text.split()) for text in inputs)
+        self._send_json({
+            "object": "list",
+            "model": body.get("model", "fake-embedding"),
+            "data": [
+                {"object": "embedding", "index": i, "embedding": fake_embedding(text, self.server.dimension)}
+                for i, text in enumerate(inputs)
+            ],
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens}
+        })
+
+    def _chat(self, body: dict):
+        question = body.get("messages", [{}])[-1].get("content", "")
+        answer = f"Fake answer about: {question[:200]}"
+        if body.get("stream"):
+            self._stream_chat(body, answer)
+            return
+        time.sleep(self.server.chat_latency_ms / 1000)
+        self._send_json({
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake-chat"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": answer},
+                "finish_reason": "stop"
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": len(answer.split()), "total_tokens": 0}
+        })
+
+    def _stream_chat(self, body: dict, answer: str):
+        # Spread the configured latency over the tokens so the first token
+        # arrives early, like a real streamed completion.
+        tokens = [word + " " for word in answer.split()]
+        delay = self.server.chat_latency_ms / 1000 / max(len(tokens), 1)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for i, token in enumerate(tokens + [None]):
+            time.sleep(delay if token is not None else 0)
+            self._write_chunk("data: " + json.dumps({
+                "id": "chatcmpl-fake",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": body.get("model", "fake-chat"),
+                "choices": [{
+                    "index": 0,
+                    "delta": {"content": token} if token is not None else {},
+                    "finish_reason": None if token is not None else "stop"
+                }]
+            }) + "\n\n")
+        self._write_chunk("data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _write_chunk(self, text: str):
+        data = text.encode("utf-8")
+        self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def _send_json(self, payload: dict, status: int = 200):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--dimension", type=int, default=1536)
+    parser.add_argument("--embedding-latency-ms", type=float, default=0.0)
+    parser.add_argument("--chat-latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = FakeOpenAIServer(args.port, args.dimension, args.embedding_latency_ms, args.chat_latency_ms)
+    print(f"Fake OpenAI listening on {server.base_url}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import argparse
+import json
+import time
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.http import models
+from database.qdrant_db import PAYLOAD_INDEXES
+
+# Filtered-search latency before and after creating the payload indexes
+# QdrantDB sets up. Needs a running Qdrant; the benchmark collection is
+# dropped and recreated on every run.
+# Usage (from server/): python -m benchmarks.filtered_search --points 300000
+
+DAY = 86400.0
+
+
+def build_filter(course: int, lecture: int, day_start: float) -> models.Filter:
+    return models.Filter(must=[
+        models.FieldCondition(key="course_title", match=models.MatchValue(value=f"course-{course}")),
+        models.FieldCondition(key="lecture_title", match=models.MatchValue(value=f"lecture-{lecture}")),
+        models.FieldCondition(key="timestamp_epoch", range=models.Range(gte=day_start, lt=day_start + DAY))
+    ])
+
+
+def populate(client: QdrantClient, collection: str, args, rng: np.random.Generator, base_epoch: float):
+    for start in range(0, args.points, args.batch_size):
+        count = min(args.batch_size, args.points - start)
+        vectors = rng.standard_normal((count, args.dim), dtype=np.float32)
+        courses = rng.integers(0, args.courses, count)
+        lectures = rng.integers(0, args.lectures, count)
+        days = rng.integers(0, args.days, count)
+        points = [
+            models.PointStruct(
+                id=start + i,
+                vector=vectors[i].tolist(),
+                payload={
+                    "course_title": f"course-{courses[i]}",
+                    "lecture_title": f"lecture-{lectures[i]}",
+                    "segment_id": f"segment-{courses[i]}-{lectures[i]}-{days[i]}",
+                    "timestamp_epoch": base_epoch + days[i] * DAY + float(rng.uniform(0, DAY))
+                }
+            )
+            for i in range(count)
+        ]
+        client.upsert(collection_name=collection, points=points, wait=False)
+
+
+def wait_until_green(client: QdrantClient, collection: str):
+    while client.get_collection(collection).status != models.CollectionStatus.GREEN:
+        time.sleep(1)
+
+
+def measure(client: QdrantClient, collection: str, args, rng: np.random.Generator, base_epoch: float) -> dict:
+    latencies = []
+    returned = []
+    for _ in range(args.queries):
+        query = rng.standard_normal(args.dim, dtype=np.float32).tolist()
+        query_filter = build_filter(
+            int(rng.integers(0, args.courses)),
+            int(rng.integers(0, args.lectures)),
+            base_epoch + int(rng.integers(0, args.days)) * DAY
+        )
+        started = time.perf_counter()
+        hits = client.search(collection_name=collection, query_vector=query,
+                             query_filter=query_filter, limit=args.limit)
+        latencies.append((time.perf_counter() - started) * 1000)
+        returned.append(len(hits))
+    latencies = np.array(latencies)
+    return {
+        "queries": args.queries,
+        "mean_ms": float(latencies.mean()),
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "avg_hits": float(np.mean(returned))
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=6333)
+    parser.add_argument("--location", default=None, help='e.g. ":memory:" for a quick local-mode run')
+    parser.add_argument("--collection", default="bench_filtered_search")
+    parser.add_argument("--points", type=int, default=300_000)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--courses", type=int, default=20)
+    parser.add_argument("--lectures", type=int, default=30)
+    parser.add_argument("--days", type=int, default=60)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--limit", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    if args.location:
+        client = QdrantClient(location=args.location)
+    else:
+        client = QdrantClient(args.host, port=args.port, timeout=120)
+    base_epoch = time.time() - args.days * DAY
+
+    if client.collection_exists(args.collection):
+        client.delete_collection(args.collection)
+    client.create_collection(
+        collection_name=args.collection,
+        vectors_config=models.VectorParams(size=args.dim, distance=models.Distance.COSINE)
+    )
+    populate(client, args.collection, args, rng, base_epoch)
+    wait_until_green(client, args.collection)
+
+    without_indexes = measure(client, args.collection, args, np.random.default_rng(args.seed + 1), base_epoch)
+
+    for field_name, field_schema in PAYLOAD_INDEXES.items():
+        client.create_payload_index(collection_name=args.collection,
+                                    field_name=field_name, field_schema=field_schema)
+    wait_until_green(client, args.collection)
+
+    with_indexes = measure(client, args.collection, args, np.random.default_rng(args.seed + 1), base_epoch)
+
+    print(json.dumps({
+        "benchmark": "filtered_search",
+        "points": args.points,
+        "dim": args.dim,
+        "without_indexes": without_indexes,
+        "with_indexes": with_indexes
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import argparse
+import json
+import shutil
+import tempfile
+import time
+import numpy as np
+from config.config import Config
+from utils.ingest_log import IngestLog
+
+# Cost the ingest write-ahead log adds to /add_lecture: append latency with
+# and without fsync, for single chunks and for bulk-sized groups, plus how
+# long a restart takes to replay the uncommitted tail.
+# Usage (from server/): python -m benchmarks.ingest_log --chunks 2000 --dir /var/tmp
+
+
+def make_chunk(number: int, words: int) -> dict:
+    return {
+        'content': " ".join(f"word{number}-{i}" for i in range(words)),
+        'timestamp': f"2024-11-09T10:00:00.{number % 1000000:06d}",
+        'chunk_number': number,
+        'segment_id': f"bench_segment_{number // 50}",
+        'course_title': "bench-course",
+        'lecture_title': "bench-lecture",
+        'session_key': "bench-course_bench-lecture_2024-11-09"
+    }
+
+
+def measure_appends(directory: str, args, fsync: bool, group_size: int) -> dict:
+    log = IngestLog(directory, segment_bytes=args.segment_bytes, fsync=fsync, target_ms=args.target_ms)
+    log.replay()
+    latencies = []
+    for start in range(0, args.chunks, group_size):
+        group = [make_chunk(n, args.words) for n in range(start, min(start + group_size, args.chunks))]
+        started = time.perf_counter()
+        ids = log.append_many(group)
+        latencies.append((time.perf_counter() - started) * 1000)
+        if args.commit_ratio and (start // group_size) % round(1 / args.commit_ratio) == 0:
+            log.commit(ids)
+    stats = log.stats()
+    log.close()
+
+    latencies = np.array(latencies)
+    return {
+        "fsync": fsync,
+        "group_size": group_size,
+        "appends": len(latencies),
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "per_chunk_us": float(latencies.sum() / args.chunks * 1000),
+        "under_target": float(np.percentile(latencies, 99)) <= args.target_ms,
+        "segments": stats["segments"],
+        "uncommitted_chunks": stats["uncommitted_chunks"]
+    }
+
+
+def measure_replay(directory: str) -> dict:
+    log = IngestLog(directory)
+    started = time.perf_counter()
+    pending = log.replay()
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    log.close()
+    return {"replayed_chunks": len(pending), "replay_ms": elapsed_ms}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dir", default=None, help="parent directory for the scratch logs (defaults to the system temp dir)")
+    parser.add_argument("--chunks", type=int, default=2000)
+    parser.add_argument("--words", type=int, default=60)
+    parser.add_argument("--group-size", type=int, default=64)
+    parser.add_argument("--commit-ratio", type=float, default=0.5,
+                        help="fraction of appends committed before the simulated restart")
+    parser.add_argument("--segment-bytes", type=int, default=Config.INGEST_LOG_SEGMENT_BYTES)
+    parser.add_argument("--target-ms", type=float, default=Config.INGEST_LOG_TARGET_MS)
+    args = parser.parse_args()
+
+    runs = []
+    replay = None
+    for fsync in (True, False):
+        for group_size in (1, args.group_size):
+            directory = tempfile.mkdtemp(prefix="ingest_log_bench_", dir=args.dir)
+            try:
+                runs.append(measure_appends(directory, args, fsync, group_size))
+                if fsync and group_size == 1:
+                    replay = measure_replay(directory)
+            finally:
+                shutil.rmtree(directory, ignore_errors=True)
+
+    print(json.dumps({
+        "benchmark": "ingest_log",
+        "chunks": args.chunks,
+        "target_ms": args.target_ms,
+        "appends": runs,
+        "replay": replay
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+import numpy as np
+from benchmarks.fake_openai import FakeOpenAIServer
+from utils.metrics import metrics
+
+# End-to-end ingest and query benchmark that needs neither an API key nor a
+# Qdrant server: OpenAI is replaced by the local fake server and Qdrant runs
+# in memory. Synthetic lectures are streamed through LectureTracker as live
+# transcript fragments, then concurrent student questions go through
+# RAG.query (or RAG.query_stream). The result is a single JSON document,
+# tagged with the git commit, so runs on different commits can be diffed.
+# Usage (from server/): python -m benchmarks.offline_suite --lectures 8 --queries 1000 --output run.json
+
+COURSE = "Offline Benchmark"
+TOPICS = {
+    "biology": "cell membrane mitochondria ribosome protein enzyme nucleus chromosome gene mutation osmosis",
+    "physics": "velocity acceleration momentum energy friction gravity wavelength frequency entropy torque",
+    "history": "empire treaty revolution dynasty parliament colony trade monarchy reform alliance",
+    "economics": "inflation demand supply market equilibrium tariff interest currency deficit growth",
+    "computing": "algorithm recursion compiler memory cache thread process network protocol database"
+}
+FILLER = "so basically what we see here is that the idea of".split()
+GENERIC_QUESTIONS = [
+    "Can you summarise what was covered so far?",
+    "What was the main point of the last part?",
+    "Which example did the lecturer use?",
+    "Why does this matter for the exam?"
+]
+
+
+def make_sentence(rng: np.random.Generator, terms: list, number: int) -> str:
+    words = list(rng.choice(FILLER, 4)) + list(rng.choice(terms, 3)) + [f"point{number}"]
+    return " ".join(words).capitalize() + "."
+
+
+def make_transcript(rng: np.random.Generator, topic: str, fragments: int, words_per_fragment: int) -> list:
+    terms = TOPICS[topic].split()
+    words = []
+    number = 0
+    while len(words) < fragments * words_per_fragment:
+        words.extend(make_sentence(rng, terms, number).split())
+        number += 1
+    return [" ".join(words[i:i + words_per_fragment]) for i in range(0, len(words), words_per_fragment)][:fragments]
+
+
+def make_questions(rng: np.random.Generator, lectures: list, count: int) -> list:
+    # Half quote the transcript (lexical matches), half are topical or
+    # generic questions that need the dense path
+    questions = []
+    for i in range(count):
+        lecture_title, topic, fragments = lectures[int(rng.integers(len(lectures)))]
+        kind = i % 4
+        if kind in (0, 1):
+            fragment = fragments[int(rng.integers(len(fragments)))]
+            question = f"What did the lecturer mean by {fragment}?"
+        elif kind == 2:
+            term = rng.choice(TOPICS[topic].split())
+            question = f"How does {term} relate to the rest of the {topic} lecture?"
+        else:
+            question = GENERIC_QUESTIONS[int(rng.integers(len(GENERIC_QUESTIONS)))]
+        questions.append((lecture_title, question))
+    return questions
+
+
+def percentiles(latencies: list) -> dict:
+    if not latencies:
+        return {"count": 0}
+    latencies = np.array(latencies)
+    return {
+        "count": len(latencies),
+        "mean_ms": float(latencies.mean()),
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "p99_ms": float(np.percentile(latencies, 99))
+    }
+
+
+def histogram_ms(summary: dict) -> dict:
+    return {key if key == "count" else f"{key}_ms": value if key == "count" else value * 1000
+            for key, value in summary.items()}
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def configure(args, base_url: str, log_dir: str):
+    # Config reads the environment on import, so this runs before any of
+    # the server modules are imported
+    os.environ.update({
+        "OPENAI_BASE_URL": base_url,
+        "OPEN_API_SECRET_KEY": "benchmark",
+        "QDRANT_LOCATION": ":memory:",
+        "COLLECTION_NAME": "bench_offline",
+        "INGEST_LOG_DIR": log_dir,
+        "EMBEDDING_CACHE_PATH": "",
+        "ANSWER_CACHE_SIZE": os.environ.get("ANSWER_CACHE_SIZE", "64" if args.answer_cache else "0"),
+        "CHUNK_IDLE_FLUSH_SECONDS": str(args.idle_flush_seconds)
+    })
+
+
+def run_ingest(tracker, lectures: list, interval_ms: float) -> dict:
+    fragment_latencies = []
+    latency_lock = threading.Lock()
+
+    def stream(lecture_title: str, fragments: list):
+        latencies = []
+        for fragment in fragments:
+            started = time.perf_counter()
+            result = tracker.add_or_update_lecture(COURSE, lecture_title, fragment)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if result["status"] != "success":
+                raise RuntimeError(result["message"])
+            if interval_ms:
+                time.sleep(interval_ms / 1000)
+        with latency_lock:
+            fragment_latencies.extend(latencies)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(lectures)) as executor:
+        list(executor.map(lambda lecture: stream(lecture[0], lecture[2]), lectures))
+    fed_seconds = time.perf_counter() - started
+    drain_started = time.perf_counter()
+    for lecture_title, _, _ in lectures:
+        result = tracker.finalize_lecture(COURSE, lecture_title)
+        if result["status"] != "success":
+            raise RuntimeError(result["message"])
+    drain_seconds = time.perf_counter() - drain_started
+    elapsed = time.perf_counter() - started
+
+    stats = tracker.get_ingest_stats()
+    return {
+        "fragments": stats["fragments_received"],
+        "chunks": stats["chunks_processed"],
+        "chunks_failed": stats["chunks_failed"],
+        "batches": stats["batches"],
+        "avg_batch_size": stats["avg_batch_size"],
+        "chunks_per_sec": stats["chunks_processed"] / elapsed if elapsed else 0.0,
+        "worker_chunks_per_sec": stats["chunks_per_sec"],
+        "feed_seconds": fed_seconds,
+        "drain_seconds": drain_seconds,
+        "add_lecture_ms": percentiles(fragment_latencies),
+        # Bucket-interpolated from the metrics histograms
+        "queue_lag": histogram_ms(metrics.stages.summary("queue_wait")),
+        "batch_commit": histogram_ms(metrics.stages.summary("ingest_batch"))
+    }
+
+
+def run_queries(rag, questions: list, concurrency: int, stream: bool) -> dict:
+    def ask(item):
+        lecture_title, question = item
+        started = time.perf_counter()
+        first_token = None
+        if stream:
+            retrieval = None
+            for event, payload in rag.query_stream(question, COURSE, lecture_title):
+                if event == "token" and first_token is None:
+                    first_token = (time.perf_counter() - started) * 1000
+                elif event == "done":
+                    retrieval = payload.get("retrieval")
+                elif event == "error":
+                    retrieval = "error"
+        else:
+            result = rag.query(question, COURSE, lecture_title)
+            retrieval = result.get("retrieval") if "answer" in result else "error"
+        return (time.perf_counter() - started) * 1000, first_token, retrieval
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        outcomes = list(executor.map(ask, questions))
+    elapsed = time.perf_counter() - started
+
+    paths = {}
+    for _, _, retrieval in outcomes:
+        paths[retrieval] = paths.get(retrieval, 0) + 1
+    summary = {
+        "queries": len(questions),
+        "concurrency": concurrency,
+        "stream": stream,
+        "errors": paths.pop("error", 0),
+        "queries_per_sec": len(questions) / elapsed if elapsed else 0.0,
+        "latency": percentiles([latency for latency, _, retrieval in outcomes if retrieval != "error"]),
+        "retrieval_paths": paths
+    }
+    if stream:
+        summary["first_token"] = percentiles([first for _, first, _ in outcomes if first is not None])
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lectures", type=int, default=8)
+    parser.add_argument("--fragments", type=int, default=400, help="transcript fragments per lecture")
+    parser.add_argument("--words-per-fragment", type=int, default=12)
+    parser.add_argument("--fragment-interval-ms", type=float, default=0.0,
+                        help="pause between fragments of one lecture; 0 replays as fast as possible")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--stream", action="store_true", help="ask through RAG.query_stream")
+    parser.add_argument("--answer-cache", action="store_true")
+    parser.add_argument("--no-ingest-log", action="store_true")
+    parser.add_argument("--idle-flush-seconds", type=float, default=1.0)
+    parser.add_argument("--embedding-latency-ms", type=float, default=30.0)
+    parser.add_argument("--chat-latency-ms", type=float, default=200.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="also write the JSON result to this file")
+    args = parser.parse_args()
+
+    fake_openai = FakeOpenAIServer(
+        embedding_latency_ms=args.embedding_latency_ms,
+        chat_latency_ms=args.chat_latency_ms
+    ).start()
+    log_dir = "" if args.no_ingest_log else tempfile.mkdtemp(prefix="bench_ingest_log_")
+    configure(args, fake_openai.base_url, log_dir)
+
+    from config.config import Config
+    from rag.rag import RAG
+    from rag.lecture_tracker import LectureTracker
+
+    rng = np.random.default_rng(args.seed)
+    topics = list(TOPICS)
+    lectures = []
+    for i in range(args.lectures):
+        topic = topics[i % len(topics)]
+        lectures.append((f"Lecture {i} ({topic})", topic,
+                         make_transcript(rng, topic, args.fragments, args.words_per_fragment)))
+    questions = make_questions(rng, lectures, args.queries)
+
+    rag = RAG()
+    tracker = LectureTracker(rag)
+    ingest = run_ingest(tracker, lectures, args.fragment_interval_ms)
+    ingest_requests = dict(fake_openai.requests)
+    queries = run_queries(rag, questions, args.concurrency, args.stream)
+
+    result = {
+        "benchmark": "offline_suite",
+        "commit": git_commit(),
+        "settings": {
+            "lectures": args.lectures,
+            "fragments_per_lecture": args.fragments,
+            "words_per_fragment": args.words_per_fragment,
+            "fragment_interval_ms": args.fragment_interval_ms,
+            "embedding_latency_ms": args.embedding_latency_ms,
+            "chat_latency_ms": args.chat_latency_ms,
+            "chunk_size": Config.CHUNK_SIZE,
+            "ingest_batch_size": Config.INGEST_BATCH_SIZE,
+            "ingest_workers": Config.INGEST_WORKERS,
+            "ingest_log": bool(log_dir),
+            "answer_cache_size": Config.ANSWER_CACHE_SIZE,
+            "seed": args.seed
+        },
+        "ingest": ingest,
+        "query": queries,
+        "openai_requests": {
+            "ingest": ingest_requests,
+            "query": {endpoint: count - ingest_requests[endpoint]
+                      for endpoint, count in fake_openai.requests.items()}
+        }
+    }
+    if log_dir:
+        shutil.rmtree(log_dir, ignore_errors=True)
+    output = json.dumps(result, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
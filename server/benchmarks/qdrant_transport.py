@@ -0,0 +1,136 @@
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+import httpx
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.http import models
+
+# Upsert and search latency over REST versus gRPC against a local Qdrant,
+# using the same pooled keep-alive settings QdrantDB uses. The benchmark
+# collection is dropped and recreated for each transport.
+# Usage (from server/): python -m benchmarks.qdrant_transport --points 20000
+
+
+def percentiles(latencies: list) -> dict:
+    latencies = np.array(latencies)
+    return {
+        "count": len(latencies),
+        "mean_ms": float(latencies.mean()),
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "p99_ms": float(np.percentile(latencies, 99))
+    }
+
+
+def make_client(args, prefer_grpc: bool) -> QdrantClient:
+    return QdrantClient(
+        host=args.host,
+        port=args.port,
+        grpc_port=args.grpc_port,
+        prefer_grpc=prefer_grpc,
+        timeout=60,
+        limits=httpx.Limits(max_connections=args.pool_size, max_keepalive_connections=args.pool_size)
+    )
+
+
+def make_points(rng: np.random.Generator, start: int, count: int, dim: int) -> list:
+    vectors = rng.standard_normal((count, dim), dtype=np.float32)
+    return [
+        models.PointStruct(
+            id=start + i,
+            vector=vectors[i].tolist(),
+            payload={"course_title": f"course-{(start + i) % 10}", "timestamp_epoch": float(start + i)}
+        )
+        for i in range(count)
+    ]
+
+
+def timed(fn) -> float:
+    started = time.perf_counter()
+    fn()
+    return (time.perf_counter() - started) * 1000
+
+
+def run_transport(args, prefer_grpc: bool) -> dict:
+    client = make_client(args, prefer_grpc)
+    rng = np.random.default_rng(args.seed)
+    if client.collection_exists(args.collection):
+        client.delete_collection(args.collection)
+    client.create_collection(
+        collection_name=args.collection,
+        vectors_config=models.VectorParams(size=args.dim, distance=models.Distance.COSINE)
+    )
+
+    upserts = {}
+    next_id = 0
+    for batch_size in (1, args.batch_size):
+        latencies = []
+        for _ in range(args.upserts):
+            points = make_points(rng, next_id, batch_size, args.dim)
+            next_id += batch_size
+            latencies.append(timed(lambda: client.upsert(args.collection, points=points, wait=True)))
+        upserts[f"batch_{batch_size}"] = percentiles(latencies)
+
+    while next_id < args.points:
+        count = min(1000, args.points - next_id)
+        client.upsert(args.collection, points=make_points(rng, next_id, count, args.dim), wait=True)
+        next_id += count
+
+    queries = rng.standard_normal((args.queries, args.dim), dtype=np.float32).tolist()
+    query_filter = models.Filter(must=[
+        models.FieldCondition(key="course_title", match=models.MatchValue(value="course-3"))
+    ])
+
+    def search(query):
+        return timed(lambda: client.search(args.collection, query_vector=query,
+                                           query_filter=query_filter, limit=args.limit))
+
+    sequential = [search(query) for query in queries]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        concurrent = list(executor.map(search, queries))
+    wall_seconds = time.perf_counter() - started
+
+    client.delete_collection(args.collection)
+    client.close()
+    return {
+        "transport": "grpc" if prefer_grpc else "rest",
+        "upsert": upserts,
+        "search": percentiles(sequential),
+        "concurrent_search": {
+            **percentiles(concurrent),
+            "concurrency": args.concurrency,
+            "req_per_sec": len(concurrent) / wall_seconds
+        }
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=6333)
+    parser.add_argument("--grpc-port", type=int, default=6334)
+    parser.add_argument("--collection", default="bench_qdrant_transport")
+    parser.add_argument("--points", type=int, default=20_000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--upserts", type=int, default=100)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--limit", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--pool-size", type=int, default=32)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(json.dumps({
+        "benchmark": "qdrant_transport",
+        "points": args.points,
+        "dim": args.dim,
+        "results": [run_transport(args, prefer_grpc) for prefer_grpc in (False, True)]
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
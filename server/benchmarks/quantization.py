@@ -0,0 +1,148 @@
+import argparse
+import json
+import time
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.http import models
+from database.qdrant_db import hnsw_config, quantization_config, search_params, vector_params
+
+# Recall, latency and memory of the collection settings QdrantDB can be
+# configured with (QDRANT_QUANTIZATION, QDRANT_VECTORS_ON_DISK, QDRANT_HNSW_*,
+# QDRANT_RESCORE, QDRANT_OVERSAMPLING) over a synthetic clustered corpus.
+# Recall@k is measured against exact brute-force cosine search. Memory is
+# estimated from the storage layout since Qdrant does not report it per
+# collection. Needs a running Qdrant; the local mode ignores quantization.
+# Usage (from server/): python -m benchmarks.quantization --points 50000
+
+SETTINGS = [
+    {"name": "float32", "quantization": "none", "on_disk": False, "rescore": False, "oversampling": 1.0},
+    {"name": "int8", "quantization": "scalar", "on_disk": False, "rescore": False, "oversampling": 1.0},
+    {"name": "int8_rescore", "quantization": "scalar", "on_disk": False, "rescore": True, "oversampling": 2.0},
+    {"name": "int8_on_disk_rescore", "quantization": "scalar", "on_disk": True, "rescore": True, "oversampling": 2.0},
+    {"name": "binary_on_disk_rescore", "quantization": "binary", "on_disk": True, "rescore": True, "oversampling": 3.0}
+]
+
+
+def make_corpus(rng: np.random.Generator, points: int, dim: int, clusters: int) -> np.ndarray:
+    # Embeddings of lecture text cluster by topic rather than spreading
+    # uniformly over the sphere
+    centers = rng.standard_normal((clusters, dim), dtype=np.float32)
+    labels = rng.integers(0, clusters, points)
+    vectors = centers[labels] + 0.6 * rng.standard_normal((points, dim), dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def exact_top_k(corpus: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    scores = queries @ corpus.T
+    return np.argpartition(-scores, k - 1, axis=1)[:, :k]
+
+
+def estimate_memory(points: int, dim: int, setting: dict, m: int) -> dict:
+    original = points * dim * 4
+    quantized = {"none": 0, "scalar": points * dim, "binary": points * dim // 8}[setting["quantization"]]
+    graph = points * m * 2 * 4
+    return {
+        "ram_bytes": (0 if setting["on_disk"] else original) + quantized + graph,
+        "disk_bytes": original if setting["on_disk"] else 0
+    }
+
+
+def populate(client: QdrantClient, collection: str, corpus: np.ndarray, batch_size: int):
+    for start in range(0, len(corpus), batch_size):
+        batch = corpus[start:start + batch_size]
+        client.upsert(
+            collection_name=collection,
+            points=models.Batch(ids=list(range(start, start + len(batch))), vectors=batch.tolist()),
+            wait=False
+        )
+    while client.get_collection(collection).status != models.CollectionStatus.GREEN:
+        time.sleep(1)
+
+
+def run_setting(client: QdrantClient, args, setting: dict, corpus: np.ndarray,
+                queries: np.ndarray, truth: np.ndarray) -> dict:
+    if client.collection_exists(args.collection):
+        client.delete_collection(args.collection)
+    client.create_collection(
+        collection_name=args.collection,
+        vectors_config=vector_params(args.dim, on_disk=setting["on_disk"]),
+        hnsw_config=hnsw_config(m=args.hnsw_m, ef_construct=args.ef_construct, on_disk=False),
+        quantization_config=quantization_config(setting["quantization"])
+    )
+    started = time.perf_counter()
+    populate(client, args.collection, corpus, args.batch_size)
+    index_seconds = time.perf_counter() - started
+
+    params = search_params(
+        quantized=setting["quantization"] != "none",
+        hnsw_ef=args.hnsw_ef,
+        rescore=setting["rescore"],
+        oversampling=setting["oversampling"]
+    )
+    latencies = []
+    recalls = []
+    for query, expected in zip(queries, truth):
+        started = time.perf_counter()
+        hits = client.search(collection_name=args.collection, query_vector=query.tolist(),
+                             search_params=params, limit=args.k)
+        latencies.append((time.perf_counter() - started) * 1000)
+        recalls.append(len({hit.id for hit in hits} & set(expected.tolist())) / args.k)
+    client.delete_collection(args.collection)
+
+    latencies = np.array(latencies)
+    return {
+        **setting,
+        "recall_at_k": float(np.mean(recalls)),
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "index_seconds": index_seconds,
+        **estimate_memory(args.points, args.dim, setting, args.hnsw_m)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=6333)
+    parser.add_argument("--location", default=None, help='e.g. ":memory:" for a quick local-mode run')
+    parser.add_argument("--collection", default="bench_quantization")
+    parser.add_argument("--points", type=int, default=50_000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--clusters", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--hnsw-m", type=int, default=16)
+    parser.add_argument("--ef-construct", type=int, default=100)
+    parser.add_argument("--hnsw-ef", type=int, default=0, help="search-time ef; 0 uses Qdrant's default")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--only", nargs="*", help="subset of setting names to run")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    corpus = make_corpus(rng, args.points, args.dim, args.clusters)
+    # Queries are perturbed corpus vectors so they land inside the clusters
+    queries = corpus[rng.integers(0, args.points, args.queries)] + \
+        0.05 * rng.standard_normal((args.queries, args.dim), dtype=np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    truth = exact_top_k(corpus, queries, args.k)
+
+    if args.location:
+        client = QdrantClient(location=args.location)
+    else:
+        client = QdrantClient(args.host, port=args.port, timeout=300)
+    settings = [setting for setting in SETTINGS if not args.only or setting["name"] in args.only]
+    print(json.dumps({
+        "benchmark": "quantization",
+        "points": args.points,
+        "dim": args.dim,
+        "k": args.k,
+        "hnsw_m": args.hnsw_m,
+        "ef_construct": args.ef_construct,
+        "results": [run_setting(client, args, setting, corpus, queries, truth) for setting in settings]
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
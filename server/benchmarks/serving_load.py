@@ -0,0 +1,156 @@
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+import httpx
+import numpy as np
+from benchmarks.fake_openai import FakeOpenAIServer
+
+# Requests/sec and latency percentiles for /api/v1/query served by the
+# Flask app (threaded WSGI server) and by the ASGI app (uvicorn), with the
+# fake OpenAI server standing in for the API. Both servers talk to the
+# Qdrant instance QdrantDB connects to, using a dedicated collection.
+# Usage (from server/): python -m benchmarks.serving_load --requests 500 --concurrency 64
+
+COURSE = "Benchmark 101"
+LECTURE = "Serving load"
+
+
+def serve(kind: str, port: int):
+    if kind == "flask":
+        from werkzeug.serving import make_server
+        from app import create_app
+        make_server("127.0.0.1", port, create_app(), threaded=True).serve_forever()
+    else:
+        import uvicorn
+        from asgi import create_asgi_app
+        uvicorn.run(create_asgi_app(), host="127.0.0.1", port=port, log_level="warning")
+
+
+def start_server(kind: str, port: int, env: dict) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.serving_load", "--serve", kind, "--port", str(port)],
+        env=env,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+
+
+def wait_until_ready(base_url: str, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/ingest_stats", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server at {base_url} did not become ready")
+
+
+def seed(base_url: str, chunks: int):
+    for i in range(chunks):
+        httpx.post(f"{base_url}/add_lecture", json={
+            "course_title": COURSE,
+            "lecture_title": LECTURE,
+            "content": f"Benchmark transcript chunk {i} about topic {i % 7}."
+        }).raise_for_status()
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if httpx.get(f"{base_url}/ingest_stats").json()["pending_chunks"] == 0:
+            break
+        time.sleep(0.2)
+    time.sleep(1.0)
+
+
+async def run_load(base_url: str, requests: int, concurrency: int, label: str) -> dict:
+    latencies = []
+    errors = 0
+    next_request = iter(range(requests))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(limits=limits, timeout=120.0) as client:
+        async def worker():
+            nonlocal errors
+            for i in next_request:
+                started = time.perf_counter()
+                response = await client.post(f"{base_url}/query", json={
+                    "question": f"[{label} {i}] What was said about topic {i % 7}?",
+                    "course_title": COURSE,
+                    "lecture_title": LECTURE,
+                    "prefer_recent": False
+                })
+                latencies.append((time.perf_counter() - started) * 1000)
+                if response.status_code != 200:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies = np.array(latencies)
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "requests_per_sec": requests / elapsed,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "p99_ms": float(np.percentile(latencies, 99))
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--serve", choices=["flask", "asgi"], help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, default=0, help=argparse.SUPPRESS)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--seed-chunks", type=int, default=50)
+    parser.add_argument("--embedding-latency-ms", type=float, default=40.0)
+    parser.add_argument("--chat-latency-ms", type=float, default=300.0)
+    parser.add_argument("--flask-port", type=int, default=3105)
+    parser.add_argument("--asgi-port", type=int, default=3106)
+    parser.add_argument("--collection", default="bench_serving_load")
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.port)
+        return
+
+    fake_openai = FakeOpenAIServer(
+        embedding_latency_ms=args.embedding_latency_ms,
+        chat_latency_ms=args.chat_latency_ms
+    ).start()
+    env = dict(
+        os.environ,
+        OPENAI_BASE_URL=fake_openai.base_url,
+        OPEN_API_SECRET_KEY="benchmark",
+        COLLECTION_NAME=args.collection,
+        ANSWER_CACHE_SIZE="0"
+    )
+
+    results = {}
+    for kind, port in (("flask", args.flask_port), ("asgi", args.asgi_port)):
+        base_url = f"http://127.0.0.1:{port}/api/v1"
+        process = start_server(kind, port, env)
+        try:
+            wait_until_ready(base_url)
+            seed(base_url, args.seed_chunks)
+            results[kind] = asyncio.run(run_load(base_url, args.requests, args.concurrency, kind))
+        finally:
+            process.terminate()
+            process.wait()
+
+    print(json.dumps({
+        "benchmark": "serving_load",
+        "embedding_latency_ms": args.embedding_latency_ms,
+        "chat_latency_ms": args.chat_latency_ms,
+        "results": results
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -7,11 +7,76 @@ class Config:
     PORT_NUMBER = int(os.getenv("PORT", "3005"))
     DEBUG = os.getenv("DEBUG", "False").lower() == "true"
     OPENAI_API_KEY = os.getenv("OPEN_API_SECRET_KEY")
-    QDRANT_HOST = os.getenv("QDRANT_HOST")
+    OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None
+    QDRANT_HOST = os.getenv("QDRANT_HOST", "localhost")
     QDRANT_PORT = int(os.getenv("QDRANT_PORT", "6333"))
     COLLECTION_NAME = os.getenv("COLLECTION_NAME")
     EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-ada-002")
+    EMBEDDING_DIMENSION = int(os.getenv("EMBEDDING_DIMENSION", "0"))
+    EMBEDDING_MAX_TOKENS = int(os.getenv("EMBEDDING_MAX_TOKENS", "256"))
+    EMBEDDING_THREADS = int(os.getenv("EMBEDDING_THREADS", "0"))
     LLM_MODEL = os.getenv("LLM_MODEL", "gpt-3.5-turbo")
     CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", "500"))
     BUFFER_SIZE = int(os.getenv("BUFFER_SIZE", "1000"))
-    UPDATE_INTERVAL = int(os.getenv("UPDATE_INTERVAL", "60"))
\ No newline at end of file
+    UPDATE_INTERVAL = int(os.getenv("UPDATE_INTERVAL", "60"))
+    INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "32"))
+    INGEST_BATCH_WAIT_MS = int(os.getenv("INGEST_BATCH_WAIT_MS", "200"))
+    EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "5000"))
+    EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "")
+    ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.95"))
+    ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "64"))
+    RECENT_CHUNKS_PER_SESSION = int(os.getenv("RECENT_CHUNKS_PER_SESSION", "32"))
+    LECTURE_EXPORT_BATCH_SIZE = int(os.getenv("LECTURE_EXPORT_BATCH_SIZE", "256"))
+    ASGI_PORT_NUMBER = int(os.getenv("ASGI_PORT", "3006"))
+    EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "256"))
+    INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "4"))
+    FINALIZE_TIMEOUT = float(os.getenv("FINALIZE_TIMEOUT", "30"))
+    INGEST_LOG_DIR = os.getenv("INGEST_LOG_DIR", "ingest_log")
+    INGEST_LOG_FSYNC = os.getenv("INGEST_LOG_FSYNC", "True").lower() == "true"
+    INGEST_LOG_SEGMENT_BYTES = int(os.getenv("INGEST_LOG_SEGMENT_BYTES", str(16 * 1024 * 1024)))
+    INGEST_LOG_TARGET_MS = float(os.getenv("INGEST_LOG_TARGET_MS", "5"))
+    INGEST_MAX_ATTEMPTS = int(os.getenv("INGEST_MAX_ATTEMPTS", "5"))
+    INGEST_RETRY_BACKOFF_SECONDS = float(os.getenv("INGEST_RETRY_BACKOFF_SECONDS", "1"))
+    SESSION_TTL_SECONDS = float(os.getenv("SESSION_TTL_SECONDS", "3600"))
+    SESSION_STORE_MAX_SESSIONS = int(os.getenv("SESSION_STORE_MAX_SESSIONS", "10000"))
+    SESSION_STORE_MAX_BYTES = int(os.getenv("SESSION_STORE_MAX_BYTES", str(64 * 1024 * 1024)))
+    SESSION_MEMORY_SIZE = int(os.getenv("SESSION_MEMORY_SIZE", "50"))
+    CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", "0"))
+    CHUNK_SNAP_TO_SENTENCE = os.getenv("CHUNK_SNAP_TO_SENTENCE", "True").lower() == "true"
+    CHUNK_IDLE_FLUSH_SECONDS = float(os.getenv("CHUNK_IDLE_FLUSH_SECONDS", "5"))
+    QDRANT_LOCATION = os.getenv("QDRANT_LOCATION", "")
+    QDRANT_GRPC_PORT = int(os.getenv("QDRANT_GRPC_PORT", "6334"))
+    QDRANT_PREFER_GRPC = os.getenv("QDRANT_PREFER_GRPC", "False").lower() == "true"
+    QDRANT_TIMEOUT = int(os.getenv("QDRANT_TIMEOUT", "10"))
+    QDRANT_POOL_SIZE = int(os.getenv("QDRANT_POOL_SIZE", "32"))
+    QDRANT_KEEPALIVE_SECONDS = float(os.getenv("QDRANT_KEEPALIVE_SECONDS", "30"))
+    OPENAI_POOL_SIZE = int(os.getenv("OPENAI_POOL_SIZE", "32"))
+    OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "60"))
+    QDRANT_QUANTIZATION = os.getenv("QDRANT_QUANTIZATION", "none").lower()
+    QDRANT_QUANTIZATION_QUANTILE = float(os.getenv("QDRANT_QUANTIZATION_QUANTILE", "0.99"))
+    QDRANT_QUANTIZATION_ALWAYS_RAM = os.getenv("QDRANT_QUANTIZATION_ALWAYS_RAM", "True").lower() == "true"
+    QDRANT_RESCORE = os.getenv("QDRANT_RESCORE", "True").lower() == "true"
+    QDRANT_OVERSAMPLING = float(os.getenv("QDRANT_OVERSAMPLING", "2.0"))
+    QDRANT_VECTORS_ON_DISK = os.getenv("QDRANT_VECTORS_ON_DISK", "False").lower() == "true"
+    QDRANT_HNSW_M = int(os.getenv("QDRANT_HNSW_M", "16"))
+    QDRANT_HNSW_EF_CONSTRUCT = int(os.getenv("QDRANT_HNSW_EF_CONSTRUCT", "100"))
+    QDRANT_HNSW_ON_DISK = os.getenv("QDRANT_HNSW_ON_DISK", "False").lower() == "true"
+    QDRANT_SEARCH_HNSW_EF = int(os.getenv("QDRANT_SEARCH_HNSW_EF", "0"))
+    LEXICAL_CHUNKS_PER_SESSION = int(os.getenv("LEXICAL_CHUNKS_PER_SESSION", "5000"))
+    LEXICAL_MIN_SCORE = float(os.getenv("LEXICAL_MIN_SCORE", "0.8"))
+    LEXICAL_MIN_TERMS = int(os.getenv("LEXICAL_MIN_TERMS", "2"))
+    LEXICAL_MIN_COVERAGE = float(os.getenv("LEXICAL_MIN_COVERAGE", "0.8"))
+    RRF_K = int(os.getenv("RRF_K", "60"))
+    CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "3000"))
+    CONTEXT_TOKEN_BUDGETS = os.getenv("CONTEXT_TOKEN_BUDGETS", "")
+    CONTEXT_DEDUP_THRESHOLD = float(os.getenv("CONTEXT_DEDUP_THRESHOLD", "0.85"))
+    RESPONSE_TIMINGS = os.getenv("RESPONSE_TIMINGS", "False").lower() == "true"
+    QUERY_COALESCING = os.getenv("QUERY_COALESCING", "True").lower() == "true"
+    SUMMARY_ENABLED = os.getenv("SUMMARY_ENABLED", "True").lower() == "true"
+    SUMMARY_MODEL = os.getenv("SUMMARY_MODEL", LLM_MODEL)
+    SUMMARY_INTERVAL_SECONDS = float(os.getenv("SUMMARY_INTERVAL_SECONDS", "10"))
+    SUMMARY_MIN_NEW_CHARS = int(os.getenv("SUMMARY_MIN_NEW_CHARS", "2000"))
+    SUMMARY_MAX_DELAY_SECONDS = float(os.getenv("SUMMARY_MAX_DELAY_SECONDS", "60"))
+    SUMMARY_MAX_INPUT_CHARS = int(os.getenv("SUMMARY_MAX_INPUT_CHARS", "8000"))
+    SUMMARY_MAX_WORDS = int(os.getenv("SUMMARY_MAX_WORDS", "250"))
+    TRANSCRIPT_CACHE_LECTURES = int(os.getenv("TRANSCRIPT_CACHE_LECTURES", "64"))
\ No newline at end of file
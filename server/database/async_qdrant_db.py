@@ -0,0 +1,57 @@
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.http import models
+from typing import AsyncIterator, List, Optional
+from qdrant_client.http.models import Filter
+from utils.metrics import metrics
+from .qdrant_db import client_options, next_scroll_cursor, search_params
+
+class AsyncQdrantDB:
+    # Collection and payload indexes are created by the synchronous QdrantDB
+    def __init__(self, collection_name: str):
+        self.client = AsyncQdrantClient(**client_options())
+        self.collection_name = collection_name
+        self.search_params = search_params()
+
+    async def search(self, query_vector: List[float], filter: Optional[Filter] = None, limit: int = 3):
+        with metrics.span("qdrant_search"):
+            return await self.client.search(
+                collection_name=self.collection_name,
+                query_vector=query_vector,
+                query_filter=filter,
+                search_params=self.search_params,
+                limit=limit
+            )
+
+    async def retrieve(self, point_ids: List, with_payload=True, with_vectors: bool = False) -> List[models.Record]:
+        with metrics.span("qdrant_retrieve"):
+            return await self.client.retrieve(
+                collection_name=self.collection_name,
+                ids=point_ids,
+                with_payload=with_payload,
+                with_vectors=with_vectors
+            )
+
+    async def scroll_ordered(self, filter: Filter, order_key: str = "timestamp_epoch",
+                             batch_size: int = 256) -> AsyncIterator[models.Record]:
+        start_from = None
+        seen_at_boundary = set()
+        while True:
+            points, _ = await self.client.scroll(
+                collection_name=self.collection_name,
+                scroll_filter=filter,
+                limit=batch_size,
+                with_payload=True,
+                with_vectors=False,
+                order_by=models.OrderBy(key=order_key, direction=models.Direction.ASC,
+                                        start_from=start_from)
+            )
+            fresh, start_from, seen_at_boundary, batch_size = next_scroll_cursor(
+                points, order_key, start_from, seen_at_boundary, batch_size
+            )
+            for point in fresh:
+                yield point
+            if batch_size is None:
+                return
+
+    async def close(self):
+        await self.client.close()
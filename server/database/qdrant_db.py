@@ -1,40 +1,204 @@
+import httpx
 from qdrant_client import QdrantClient
 from qdrant_client.http import models
-from typing import List, Optional
+from typing import Iterator, List, Optional, Tuple
 from qdrant_client.http.models import Filter, PointStruct
+from config.config import Config
+from utils.metrics import metrics
+
+PAYLOAD_INDEXES = {
+    "course_title": models.PayloadSchemaType.KEYWORD,
+    "lecture_title": models.PayloadSchemaType.KEYWORD,
+    "segment_id": models.PayloadSchemaType.KEYWORD,
+    "kind": models.PayloadSchemaType.KEYWORD,
+    "chunk_number": models.PayloadSchemaType.INTEGER,
+    "timestamp_epoch": models.PayloadSchemaType.FLOAT
+}
+
+def client_options() -> dict:
+    # Shared by the sync and async clients. qdrant_client turns keep-alive
+    # off for localhost unless limits are passed explicitly.
+    if Config.QDRANT_LOCATION:
+        # ":memory:" runs Qdrant in-process (benchmarks); the sync and async
+        # clients then each get a separate store
+        return {"location": Config.QDRANT_LOCATION}
+    return {
+        "host": Config.QDRANT_HOST,
+        "port": Config.QDRANT_PORT,
+        "grpc_port": Config.QDRANT_GRPC_PORT,
+        "prefer_grpc": Config.QDRANT_PREFER_GRPC,
+        "timeout": Config.QDRANT_TIMEOUT,
+        "limits": httpx.Limits(
+            max_connections=Config.QDRANT_POOL_SIZE,
+            max_keepalive_connections=Config.QDRANT_POOL_SIZE,
+            keepalive_expiry=Config.QDRANT_KEEPALIVE_SECONDS
+        )
+    }
+
+def vector_params(size: int, on_disk: bool = Config.QDRANT_VECTORS_ON_DISK) -> models.VectorParams:
+    return models.VectorParams(size=size, distance=models.Distance.COSINE, on_disk=on_disk)
+
+def hnsw_config(m: int = Config.QDRANT_HNSW_M, ef_construct: int = Config.QDRANT_HNSW_EF_CONSTRUCT,
+                on_disk: bool = Config.QDRANT_HNSW_ON_DISK) -> models.HnswConfigDiff:
+    return models.HnswConfigDiff(m=m, ef_construct=ef_construct, on_disk=on_disk)
+
+def quantization_config(mode: str = Config.QDRANT_QUANTIZATION,
+                        quantile: float = Config.QDRANT_QUANTIZATION_QUANTILE,
+                        always_ram: bool = Config.QDRANT_QUANTIZATION_ALWAYS_RAM):
+    if mode == "scalar":
+        return models.ScalarQuantization(scalar=models.ScalarQuantizationConfig(
+            type=models.ScalarType.INT8, quantile=quantile, always_ram=always_ram
+        ))
+    if mode == "binary":
+        return models.BinaryQuantization(binary=models.BinaryQuantizationConfig(always_ram=always_ram))
+    if mode in ("", "none"):
+        return None
+    raise ValueError(f"Unknown quantization mode: {mode}")
+
+def quantization_settings(config) -> Optional[tuple]:
+    # Only the fields quantization_config() sets; the server fills in
+    # defaults for the rest, so whole-object comparison always differs
+    if isinstance(config, models.ScalarQuantization):
+        scalar = config.scalar
+        return ("scalar", scalar.type, scalar.quantile, bool(scalar.always_ram))
+    if isinstance(config, models.BinaryQuantization):
+        return ("binary", bool(config.binary.always_ram))
+    if config is None:
+        return None
+    return (type(config).__name__,)
+
+def search_params(quantized: bool = Config.QDRANT_QUANTIZATION not in ("", "none"),
+                  hnsw_ef: int = Config.QDRANT_SEARCH_HNSW_EF,
+                  rescore: bool = Config.QDRANT_RESCORE,
+                  oversampling: float = Config.QDRANT_OVERSAMPLING) -> Optional[models.SearchParams]:
+    # Quantized vectors give the candidate list; rescoring re-ranks it with
+    # the original vectors (read from disk when they are stored there).
+    if not quantized and hnsw_ef <= 0:
+        return None
+    return models.SearchParams(
+        hnsw_ef=hnsw_ef if hnsw_ef > 0 else None,
+        quantization=models.QuantizationSearchParams(
+            rescore=rescore, oversampling=oversampling
+        ) if quantized else None
+    )
+
+def next_scroll_cursor(points: list, order_key: str, start_from, seen_at_boundary: set,
+                       batch_size: int) -> Tuple[list, object, set, Optional[int]]:
+    # order_by pages are addressed by the last value seen rather than a
+    # point offset, so points sharing that value are remembered to avoid
+    # yielding them twice. A batch_size of None means the scroll is done.
+    fresh = [point for point in points if point.id not in seen_at_boundary]
+    if len(points) < batch_size:
+        return fresh, start_from, seen_at_boundary, None
+    if not fresh:
+        return fresh, start_from, seen_at_boundary, batch_size * 2
+
+    last_value = points[-1].payload[order_key]
+    boundary = {point.id for point in points if point.payload[order_key] == last_value}
+    if last_value == start_from:
+        boundary |= seen_at_boundary
+    return fresh, last_value, boundary, batch_size
 
 class QdrantDB:
-    def __init__(self, collection_name: str):
-        self.client = QdrantClient("localhost", port=6333)
+    # vector_size comes from the embedding provider; tools that only work on
+    # an existing collection can leave it out
+    def __init__(self, collection_name: str, vector_size: Optional[int] = None):
+        self.client = QdrantClient(**client_options())
         self.collection_name = collection_name
-        self._ensure_collection_exists()
+        self.search_params = search_params()
+        self._ensure_collection_exists(vector_size)
+        self._ensure_payload_indexes()
 
-    def _ensure_collection_exists(self):
+    def _ensure_collection_exists(self, vector_size: Optional[int]):
         collections = self.client.get_collections().collections
         exists = any(col.name == self.collection_name for col in collections)
         
         if not exists:
+            if vector_size is None:
+                raise ValueError(f"Collection {self.collection_name} does not exist")
             self.client.create_collection(
                 collection_name=self.collection_name,
-                vectors_config=models.VectorParams(
-                    size=1536,  # OpenAI embedding size
-                    distance=models.Distance.COSINE
-                )
+                vectors_config=vector_params(vector_size),
+                hnsw_config=hnsw_config(),
+                quantization_config=quantization_config()
+            )
+        else:
+            self._check_vector_size(vector_size)
+            self._update_collection_settings()
+
+    def _check_vector_size(self, vector_size: Optional[int]):
+        existing = self.client.get_collection(self.collection_name).config.params.vectors.size
+        if vector_size is not None and existing != vector_size:
+            raise ValueError(
+                f"Collection {self.collection_name} stores {existing}-dimensional vectors but the "
+                f"embedding model produces {vector_size}; use another COLLECTION_NAME or re-embed"
+            )
+
+    def _update_collection_settings(self):
+        # Vector storage (RAM vs disk) is fixed at creation; HNSW and
+        # quantization settings can be changed on an existing collection.
+        config = self.client.get_collection(self.collection_name).config
+        wanted_hnsw = hnsw_config()
+        hnsw_changed = (config.hnsw_config.m, config.hnsw_config.ef_construct, bool(config.hnsw_config.on_disk)) != \
+            (wanted_hnsw.m, wanted_hnsw.ef_construct, wanted_hnsw.on_disk)
+        
+        wanted_quantization = quantization_config()
+        quantization_changed = quantization_settings(config.quantization_config) != \
+            quantization_settings(wanted_quantization)
+        
+        if hnsw_changed or quantization_changed:
+            self.client.update_collection(
+                collection_name=self.collection_name,
+                hnsw_config=wanted_hnsw if hnsw_changed else None,
+                quantization_config=(wanted_quantization or models.Disabled.DISABLED) if quantization_changed else None
             )
 
+    def _ensure_payload_indexes(self):
+        payload_schema = self.client.get_collection(self.collection_name).payload_schema or {}
+        for field_name, field_schema in PAYLOAD_INDEXES.items():
+            if field_name not in payload_schema:
+                self.client.create_payload_index(
+                    collection_name=self.collection_name,
+                    field_name=field_name,
+                    field_schema=field_schema
+                )
+
     def add_points(self, points: List[PointStruct]):
-        self.client.upsert(
-            collection_name=self.collection_name,
-            points=points
-        )
+        with metrics.span("qdrant_upsert"):
+            self.client.upsert(
+                collection_name=self.collection_name,
+                points=points
+            )
 
     def search(self, query_vector: List[float], filter: Optional[Filter] = None, limit: int = 3):
-        return self.client.search(
+        with metrics.span("qdrant_search"):
+            return self.client.search(
+                collection_name=self.collection_name,
+                query_vector=query_vector,
+                query_filter=filter,
+                search_params=self.search_params,
+                limit=limit
+            )
+
+    def retrieve(self, point_ids: List, with_payload=True, with_vectors: bool = False) -> List[models.Record]:
+        with metrics.span("qdrant_retrieve"):
+            return self.client.retrieve(
+                collection_name=self.collection_name,
+                ids=point_ids,
+                with_payload=with_payload,
+                with_vectors=with_vectors
+            )
+
+    def last_point(self, filter: Filter, order_key: str) -> Optional[models.Record]:
+        points, _ = self.client.scroll(
             collection_name=self.collection_name,
-            query_vector=query_vector,
-            query_filter=filter,
-            limit=limit
+            scroll_filter=filter,
+            limit=1,
+            with_payload=[order_key],
+            with_vectors=False,
+            order_by=models.OrderBy(key=order_key, direction=models.Direction.DESC)
         )
+        return points[0] if points else None
 
     def search_by_metadata(self, filter: Filter, limit: int = 100):
         return self.client.scroll(
@@ -43,8 +207,37 @@ class QdrantDB:
             limit=limit
         )[0]
 
+    def scroll_ordered(self, filter: Filter, order_key: str = "timestamp_epoch",
+                       batch_size: int = 256) -> Iterator[models.Record]:
+        start_from = None
+        seen_at_boundary = set()
+        while True:
+            points, _ = self.client.scroll(
+                collection_name=self.collection_name,
+                scroll_filter=filter,
+                limit=batch_size,
+                with_payload=True,
+                with_vectors=False,
+                order_by=models.OrderBy(key=order_key, direction=models.Direction.ASC,
+                                        start_from=start_from)
+            )
+            fresh, start_from, seen_at_boundary, batch_size = next_scroll_cursor(
+                points, order_key, start_from, seen_at_boundary, batch_size
+            )
+            for point in fresh:
+                yield point
+            if batch_size is None:
+                return
+
     def delete_points(self, points_selector: Filter):
         self.client.delete(
             collection_name=self.collection_name,
             points_selector=points_selector
+        )
+
+    def set_payload(self, payload: dict, point_ids: List):
+        self.client.set_payload(
+            collection_name=self.collection_name,
+            payload=payload,
+            points=point_ids
         )
\ No newline at end of file
@@ -0,0 +1,39 @@
+from typing import Optional, Tuple
+from rag.async_rag import AsyncRAG
+from handlers.rag_handler import rag_instance
+
+async_rag_instance = AsyncRAG(rag_instance)
+
+async def query_handler_function(question: str, course_title: str, lecture_title: str,
+                                 segment_id: str = None, prefer_recent: bool = True,
+                                 limit: int = 3) -> dict:
+    return await async_rag_instance.query(
+        question,
+        course_title,
+        lecture_title,
+        segment_id=segment_id,
+        prefer_recent=prefer_recent,
+        limit=limit
+    )
+
+def query_stream_handler(question: str, course_title: str, lecture_title: str,
+                         segment_id: str = None, prefer_recent: bool = True,
+                         limit: int = 3):
+    return async_rag_instance.query_stream(
+        question,
+        course_title,
+        lecture_title,
+        segment_id=segment_id,
+        prefer_recent=prefer_recent,
+        limit=limit
+    )
+
+async def get_complete_lecture_handler(course_title: str, lecture_title: str, since_chunk: Optional[Tuple[str, int]] = None,
+                                       if_none_match: Optional[str] = None) -> dict:
+    return await async_rag_instance.get_complete_lecture(course_title, lecture_title, since_chunk, if_none_match)
+
+async def stream_complete_lecture_handler(course_title: str, lecture_title: str, stream_format: str):
+    return await async_rag_instance.stream_complete_lecture(course_title, lecture_title, stream_format)
+
+async def shutdown_handler():
+    await async_rag_instance.close()
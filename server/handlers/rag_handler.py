@@ -1,5 +1,9 @@
+import json
+import math
+from typing import List, Optional, Tuple
 from rag.rag import RAG
 from rag.lecture_tracker import LectureTracker
+from utils.metrics import metrics
 
 rag_instance = RAG()
 lecture_tracker = LectureTracker(rag_instance)
@@ -7,6 +11,28 @@ lecture_tracker = LectureTracker(rag_instance)
 def add_lecture_handler(course_title: str, lecture_title: str, content: str) -> dict:
     return lecture_tracker.add_or_update_lecture(course_title, lecture_title, content)
 
+def parse_bulk_lecture_items(body: bytes, mimetype: str) -> List:
+    if mimetype in ('application/x-ndjson', 'application/jsonl'):
+        items = []
+        for line in body.decode('utf-8').splitlines():
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError as e:
+                items.append(ValueError(f"Invalid JSON: {str(e)}"))
+        return items
+
+    data = json.loads(body or b'null')
+    if isinstance(data, dict) and isinstance(data.get('items'), list):
+        return data['items']
+    if not isinstance(data, list):
+        raise ValueError("Expected a JSON array of transcript pieces or an NDJSON body")
+    return data
+
+def add_lectures_bulk_handler(items: List) -> dict:
+    return lecture_tracker.add_lectures_bulk(items)
+
 def query_handler_function(question: str, course_title: str, lecture_title: str, 
                          segment_id: str = None, prefer_recent: bool = True, 
                          limit: int = 3) -> dict:
@@ -19,20 +45,60 @@ def query_handler_function(question: str, course_title: str, lecture_title: str,
         limit=limit
     )
 
-def finalize_lecture_handler(course_title: str, lecture_title: str) -> dict:
-    return lecture_tracker.finalize_lecture(course_title, lecture_title)
+def query_stream_handler(question: str, course_title: str, lecture_title: str,
+                         segment_id: str = None, prefer_recent: bool = True,
+                         limit: int = 3):
+    return rag_instance.query_stream(
+        question,
+        course_title,
+        lecture_title,
+        segment_id=segment_id,
+        prefer_recent=prefer_recent,
+        limit=limit
+    )
+
+def get_query_stats_handler() -> dict:
+    return rag_instance.get_query_stats()
+
+def parse_finalize_timeout(value) -> Optional[float]:
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float)) \
+            or not math.isfinite(value) or value < 0:
+        raise ValueError("timeout must be a non-negative number of seconds")
+    return float(value)
+
+def finalize_lecture_handler(course_title: str, lecture_title: str,
+                             timeout: float = None) -> dict:
+    return lecture_tracker.finalize_lecture(course_title, lecture_title, timeout=timeout)
 
 def get_lecture_status_handler(course_title: str, lecture_title: str) -> dict:
     return lecture_tracker.get_lecture_status(course_title, lecture_title)
 
+def get_lecture_summary_handler(course_title: str, lecture_title: str, segment_id: str = None) -> dict:
+    return rag_instance.get_lecture_summary(course_title, lecture_title, segment_id)
+
 def get_session_stats_handler(session_key: str) -> dict:
     return lecture_tracker.get_session_stats(session_key)
 
+def get_ingest_stats_handler() -> dict:
+    return lecture_tracker.get_ingest_stats()
+
+def get_cache_stats_handler() -> dict:
+    return rag_instance.get_cache_stats()
+
+def get_metrics_handler() -> str:
+    return metrics.render()
+
 def cleanup_session_handler(session_key: str) -> dict:
     return lecture_tracker.cleanup_session(session_key)
 
 def recover_session_handler(session_key: str) -> dict:
     return lecture_tracker.recover_session(session_key)
 
-def get_complete_lecture_handler(course_title: str, lecture_title: str) -> dict:
-    return rag_instance.get_complete_lecture(course_title, lecture_title)
\ No newline at end of file
+def get_complete_lecture_handler(course_title: str, lecture_title: str, since_chunk: Optional[Tuple[str, int]] = None,
+                                 if_none_match: Optional[str] = None) -> dict:
+    return rag_instance.get_complete_lecture(course_title, lecture_title, since_chunk, if_none_match)
+
+def stream_complete_lecture_handler(course_title: str, lecture_title: str, stream_format: str):
+    return rag_instance.stream_complete_lecture(course_title, lecture_title, stream_format)
\ No newline at end of file
@@ -0,0 +1,197 @@
+import time
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+from database.async_qdrant_db import AsyncQdrantDB
+from config.config import Config
+from .rag import RAG, _elapsed_ms, _openai_limits
+from .lecture_stream import LectureStreamEncoder
+from utils.metrics import metrics
+
+class AsyncRAG:
+    # Serves the read path with async clients while sharing caches, the
+    # recent-chunk store and session memory with the synchronous RAG that
+    # the ingest workers write through.
+    def __init__(self, rag_instance: RAG):
+        self.rag = rag_instance
+        self.db = AsyncQdrantDB(Config.COLLECTION_NAME)
+        self.openai = AsyncOpenAI(
+            api_key=Config.OPENAI_API_KEY,
+            base_url=Config.OPENAI_BASE_URL,
+            timeout=Config.OPENAI_TIMEOUT,
+            http_client=DefaultAsyncHttpxClient(limits=_openai_limits())
+        )
+        self.rag.embedder.bind_async(self.openai)
+
+    async def _get_embedding(self, text: str) -> List[float]:
+        return (await self._get_embeddings([text]))[0]
+
+    async def _get_embeddings(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        embeddings, missing = self.rag._lookup_embeddings(texts)
+        if not missing:
+            return embeddings
+
+        started = time.perf_counter()
+        fetched = await self._request_embeddings(missing)
+        return self.rag._fill_embeddings(texts, embeddings, missing, fetched, time.perf_counter() - started)
+
+    async def _request_embeddings(self, texts: List[str]) -> List[List[float]]:
+        try:
+            with metrics.span("embedding"):
+                return await self.rag.embedder.aembed(texts)
+        except Exception as e:
+            raise Exception(f"Failed to generate embedding: {str(e)}")
+
+    async def _summary_points(self, ids: List[str]) -> list:
+        return await self.db.retrieve(ids) if ids else []
+
+    async def query(self, question: str, course_title: str, lecture_title: str,
+                    segment_id: str = None, prefer_recent: bool = True, limit: int = 3) -> dict:
+        session_key = f"{course_title}_{lecture_title}_{datetime.now().date()}"
+        self.rag._track_session(session_key, course_title, lecture_title)
+        result, shared = await self.rag.query_flights.ado(
+            self.rag._flight_key(question, session_key, segment_id, prefer_recent, limit),
+            lambda: self._query(question, course_title, lecture_title, segment_id, prefer_recent, limit)
+        )
+        return self.rag._flight_result(result, shared)
+
+    async def _query(self, question: str, course_title: str, lecture_title: str,
+                     segment_id: str = None, prefer_recent: bool = True, limit: int = 3) -> dict:
+        try:
+            query = self.rag._begin_query(question, course_title, lecture_title, segment_id, prefer_recent, limit)
+            if self.rag._route_query(query, await self._summary_points(query.summary_ids)):
+                cached = self.rag._cached_answer(query, await self._get_embedding(question))
+                if cached is not None:
+                    return cached
+                recent_results = self.rag._recent_results(query)
+                search = self.rag._db_search(query, recent_results)
+                db_results = await self.db.search(**search) if search else []
+                self.rag._combine_query_results(query, recent_results, db_results)
+
+            messages, temperature = self.rag._prepare_answer(query)
+            response = await self._complete(messages, temperature)
+            return self.rag._record_retrieval(self.rag._shape_answer(query, response), query.retrieval)
+        except Exception as e:
+            return {"status": "error", "message": f"Query failed: {str(e)}"}
+
+    async def query_stream(self, question: str, course_title: str, lecture_title: str,
+                           segment_id: str = None, prefer_recent: bool = True,
+                           limit: int = 3) -> AsyncIterator[Tuple[str, dict]]:
+        started = time.perf_counter()
+        timings = {}
+        try:
+            query = self.rag._begin_query(question, course_title, lecture_title, segment_id, prefer_recent, limit)
+            self.rag._track_session(query.session_key, course_title, lecture_title)
+
+            stage = time.perf_counter()
+            needs_dense = self.rag._route_query(query, await self._summary_points(query.summary_ids))
+            timings['lexical_ms'] = _elapsed_ms(stage)
+            if needs_dense:
+                stage = time.perf_counter()
+                query_embedding = await self._get_embedding(question)
+                timings['embedding_ms'] = _elapsed_ms(stage)
+                cached = self.rag._cached_answer(query, query_embedding)
+                if cached is not None:
+                    for event in self.rag._cached_events(cached, started, timings):
+                        yield event
+                    return
+
+                stage = time.perf_counter()
+                recent_results = self.rag._recent_results(query)
+                search = self.rag._db_search(query, recent_results)
+                db_results = await self.db.search(**search) if search else []
+                self.rag._combine_query_results(query, recent_results, db_results)
+                timings['retrieval_ms'] = _elapsed_ms(stage)
+
+            messages, temperature = self.rag._prepare_answer(query)
+            yield "sources", self.rag._sources_skeleton(query, started, timings)
+
+            stage = time.perf_counter()
+            pieces = []
+            async for delta in self._stream_chat_completion(messages, temperature):
+                yield self.rag._token_event(delta, pieces, started, stage, timings)
+            yield "done", self.rag._finish_stream(query, pieces, started, stage, timings)
+        except Exception as e:
+            yield "error", {"status": "error", "message": f"Query failed: {str(e)}"}
+
+    async def _stream_chat_completion(self, messages: List[Dict], temperature: float) -> AsyncIterator[str]:
+        stream = await self.openai.chat.completions.create(
+            model=Config.LLM_MODEL,
+            messages=messages,
+            temperature=temperature,
+            stream=True
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    async def _complete(self, messages: List[Dict], temperature: float) -> str:
+        with metrics.span("llm_completion"):
+            response = await self.openai.chat.completions.create(
+                model=Config.LLM_MODEL,
+                messages=messages,
+                temperature=temperature
+            )
+        return response.choices[0].message.content
+
+    async def _iter_lecture_chunks(self, course_title: str, lecture_title: str) -> AsyncIterator[Dict]:
+        points = self.db.scroll_ordered(
+            filter=self.rag._lecture_filter(course_title, lecture_title),
+            order_key="timestamp_epoch",
+            batch_size=Config.LECTURE_EXPORT_BATCH_SIZE
+        )
+        async for point in points:
+            yield self.rag._chunk_from_point(point)
+
+    async def get_complete_lecture(self, course_title: str, lecture_title: str,
+                                   since_chunk: Optional[Tuple[str, int]] = None,
+                                   if_none_match: Optional[str] = None) -> dict:
+        try:
+            transcripts = self.rag.transcripts
+            if not transcripts.enabled:
+                chunks = [chunk async for chunk in self._iter_lecture_chunks(course_title, lecture_title)]
+                return self.rag._assemble_lecture(course_title, lecture_title, chunks)
+            transcript = transcripts.get(course_title, lecture_title)
+            if transcript is None:
+                transcript = transcripts.start_loading(course_title, lecture_title)
+                try:
+                    chunks = [chunk async for chunk in self._iter_lecture_chunks(course_title, lecture_title)]
+                except Exception:
+                    transcripts.discard(course_title, lecture_title)
+                    raise
+                transcripts.finish_loading(transcript, chunks)
+            return self.rag._transcript_response(course_title, lecture_title, transcript,
+                                                 since_chunk, if_none_match)
+        except Exception as e:
+            return {"status": "error", "message": f"Failed to retrieve lecture content: {str(e)}"}
+
+    async def stream_complete_lecture(self, course_title: str, lecture_title: str,
+                                      stream_format: str = "ndjson") -> Optional[AsyncIterator[str]]:
+        chunks = self._iter_lecture_chunks(course_title, lecture_title)
+        first = await anext(chunks, None)
+        if first is None:
+            return None
+
+        encoder = LectureStreamEncoder(stream_format, {
+            "course_title": course_title,
+            "lecture_title": lecture_title
+        })
+        return self._encode_lecture_stream(encoder, first, chunks)
+
+    async def _encode_lecture_stream(self, encoder: LectureStreamEncoder, first: Dict,
+                                     chunks: AsyncIterator[Dict]) -> AsyncIterator[str]:
+        yield encoder.header()
+        try:
+            yield encoder.encode(first)
+            async for chunk in chunks:
+                yield encoder.encode(chunk)
+        except Exception as e:
+            yield encoder.footer(error=f"Failed to retrieve lecture content: {str(e)}")
+            return
+        yield encoder.footer()
+
+    async def close(self):
+        await self.db.close()
+        await self.openai.close()
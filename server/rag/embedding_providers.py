@@ -0,0 +1,163 @@
+import asyncio
+import hashlib
+import os
+import re
+from abc import ABC, abstractmethod
+from typing import List
+import numpy as np
+
+# EMBEDDING_MODEL selects the provider:
+#   hashing[:<dim>]   feature-hashing baseline; no model, no network (tests, offline runs)
+#   onnx:<model dir>  local CPU sentence-embedding model exported to ONNX, e.g.
+#                     all-MiniLM-L6-v2; the directory holds model.onnx and
+#                     tokenizer.json. Needs the onnxruntime and tokenizers packages.
+#   anything else     an OpenAI embeddings model name
+# The Qdrant collection is created with the provider's dimension.
+
+OPENAI_DIMENSIONS = {
+    "text-embedding-ada-002": 1536,
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072
+}
+HASHING_DIMENSION = 384
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+class EmbeddingProvider(ABC):
+    name = "base"
+    dimension = 0
+
+    @abstractmethod
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        ...
+
+    async def aembed(self, texts: List[str]) -> List[List[float]]:
+        # Local models are CPU-bound; keep them off the event loop
+        return await asyncio.to_thread(self.embed, texts)
+
+    def bind_async(self, async_client):
+        pass
+
+
+class OpenAIEmbeddingProvider(EmbeddingProvider):
+    def __init__(self, model: str, client, batch_size: int, dimension: int = 0):
+        self.name = model
+        self.client = client
+        self.async_client = None
+        self.batch_size = batch_size
+        self.dimension = dimension or OPENAI_DIMENSIONS.get(model, 1536)
+        # text-embedding-3 models can return shortened vectors
+        self.request_dimensions = dimension if dimension and model.startswith("text-embedding-3") else None
+
+    def _options(self) -> dict:
+        return {"dimensions": self.request_dimensions} if self.request_dimensions else {}
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        embeddings = []
+        for start in range(0, len(texts), self.batch_size):
+            response = self.client.embeddings.create(
+                model=self.name,
+                input=texts[start:start + self.batch_size],
+                **self._options()
+            )
+            embeddings.extend(item.embedding for item in sorted(response.data, key=lambda item: item.index))
+        return embeddings
+
+    def bind_async(self, async_client):
+        self.async_client = async_client
+
+    async def aembed(self, texts: List[str]) -> List[List[float]]:
+        if self.async_client is None:
+            return await super().aembed(texts)
+        batches = await asyncio.gather(*(
+            self.async_client.embeddings.create(
+                model=self.name,
+                input=texts[start:start + self.batch_size],
+                **self._options()
+            )
+            for start in range(0, len(texts), self.batch_size)
+        ))
+        return [item.embedding for response in batches
+                for item in sorted(response.data, key=lambda item: item.index)]
+
+
+class HashingEmbeddingProvider(EmbeddingProvider):
+    # Signed feature hashing of word unigrams and bigrams. Texts sharing
+    # words land close together, which is enough to exercise retrieval
+    # without a model.
+    def __init__(self, dimension: int = HASHING_DIMENSION):
+        self.name = f"hashing:{dimension}"
+        self.dimension = dimension
+
+    def _features(self, text: str) -> List[str]:
+        words = TOKEN_PATTERN.findall(text.lower())
+        return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                digest = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+                vectors[row, digest % self.dimension] += 1.0 if (digest >> 63) else -1.0
+        return _normalize(vectors).tolist()
+
+
+class OnnxEmbeddingProvider(EmbeddingProvider):
+    def __init__(self, model_dir: str, batch_size: int, max_tokens: int = 256, threads: int = 0):
+        try:
+            import onnxruntime
+            from tokenizers import Tokenizer
+        except ImportError as e:
+            raise ImportError("onnx embeddings need the onnxruntime and tokenizers packages") from e
+
+        options = onnxruntime.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(
+            os.path.join(model_dir, "model.onnx"), options, providers=["CPUExecutionProvider"]
+        )
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=max_tokens)
+        self.tokenizer.enable_padding()
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+        self.name = f"onnx:{os.path.basename(os.path.normpath(model_dir))}"
+        self.batch_size = batch_size
+        self.dimension = len(self._embed_batch(["dimension probe"])[0])
+
+    def _embed_batch(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([encoding.ids for encoding in encodings], dtype=np.int64)
+        attention_mask = np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            feeds["token_type_ids"] = np.zeros_like(input_ids)
+        output = self.session.run(None, feeds)[0]
+        if output.ndim == 3:
+            # Token embeddings; mean-pool over the real (unpadded) tokens
+            mask = attention_mask[:, :, None].astype(np.float32)
+            output = (output * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+        return _normalize(output.astype(np.float32))
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        embeddings = []
+        for start in range(0, len(texts), self.batch_size):
+            embeddings.extend(self._embed_batch(texts[start:start + self.batch_size]).tolist())
+        return embeddings
+
+
+def create_embedding_provider(model: str, openai_client=None, batch_size: int = 256,
+                              dimension: int = 0, max_tokens: int = 256,
+                              threads: int = 0) -> EmbeddingProvider:
+    if model == "hashing" or model.startswith("hashing:"):
+        _, _, size = model.partition(":")
+        return HashingEmbeddingProvider(int(size) if size else dimension or HASHING_DIMENSION)
+    if model.startswith("onnx:"):
+        return OnnxEmbeddingProvider(model[len("onnx:"):], batch_size, max_tokens, threads)
+    if openai_client is None:
+        raise ValueError(f"Embedding model {model} needs an OpenAI client")
+    return OpenAIEmbeddingProvider(model, openai_client, batch_size, dimension)
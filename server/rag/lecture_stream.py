@@ -0,0 +1,56 @@
+import json
+from typing import Dict, Optional
+
+STREAM_MIMETYPES = {
+    "ndjson": "application/x-ndjson",
+    "json": "application/json"
+}
+STREAM_FORMATS = tuple(STREAM_MIMETYPES)
+
+class LectureStreamEncoder:
+    def __init__(self, stream_format: str, lecture_info: dict):
+        self.stream_format = stream_format
+        self.lecture_info = lecture_info
+        self.current_segment = None
+        self.total_segments = 0
+        self.total_chunks = 0
+
+    def header(self) -> str:
+        if self.stream_format == "json":
+            return '{"status": "success", "lecture_info": ' + json.dumps(self.lecture_info) + ', "chunks": ['
+        return json.dumps({"type": "lecture_info", **self.lecture_info}) + "\n"
+
+    def encode(self, chunk: Dict) -> str:
+        lines = []
+        if chunk['segment_id'] != self.current_segment:
+            self.current_segment = chunk['segment_id']
+            self.total_segments += 1
+            if self.stream_format == "ndjson":
+                lines.append(json.dumps({
+                    "type": "segment",
+                    "segment_id": self.current_segment,
+                    "timestamp": chunk['timestamp']
+                }) + "\n")
+
+        if self.stream_format == "json":
+            lines.append(("," if self.total_chunks else "") + json.dumps(chunk))
+        else:
+            lines.append(json.dumps({"type": "chunk", **chunk}) + "\n")
+        self.total_chunks += 1
+        return "".join(lines)
+
+    def footer(self, error: Optional[str] = None) -> str:
+        if self.stream_format == "json":
+            return "], " + json.dumps({
+                "total_segments": self.total_segments,
+                "total_chunks": self.total_chunks,
+                "complete": error is None,
+                "error": error
+            })[1:]
+        if error is not None:
+            return json.dumps({"type": "error", "message": error}) + "\n"
+        return json.dumps({
+            "type": "summary",
+            "total_segments": self.total_segments,
+            "total_chunks": self.total_chunks
+        }) + "\n"
@@ -0,0 +1,233 @@
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from qdrant_client.models import PointStruct
+from config.config import Config
+from utils.metrics import metrics
+from .rag import RAG, content_hash, summary_point_id
+
+SUMMARY_SYSTEM_MESSAGE = """You maintain a running summary of {scope} of a live lecture transcript.
+        Merge the new transcript into the existing summary so that it covers everything said so far, in the order it was taught.
+        Keep definitions, names, formulas and examples; drop filler and repetition.
+        Use only what the transcript says. Stay under {max_words} words and reply with the summary only."""
+
+
+def _is_covered(ranges: List[List[int]], chunk_number: int) -> bool:
+    return any(start <= chunk_number <= end for start, end in ranges)
+
+
+def _add_to_ranges(ranges: List[List[int]], chunk_numbers: List[int]) -> List[List[int]]:
+    # Merged, sorted [start, end] ranges of chunk numbers
+    merged: List[List[int]] = []
+    for start, end in sorted([list(r) for r in ranges] + [[n, n] for n in chunk_numbers]):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+class _Summary:
+    # One rolling summary: the text so far, the chunk numbers folded into it
+    # (as ranges, since chunks can be committed out of order) and the chunks
+    # received since
+    __slots__ = ('level', 'segment_id', 'text', 'covered', 'chunks', 'loaded',
+                 'pending', 'pending_chars', 'pending_since')
+
+    def __init__(self, level: str, segment_id: Optional[str]):
+        self.level = level
+        self.segment_id = segment_id
+        self.text = ""
+        self.covered: List[List[int]] = []
+        self.chunks = 0
+        self.loaded = False
+        self.pending: List[Dict] = []
+        self.pending_chars = 0
+        self.pending_since = 0.0
+
+
+class LectureSummarizer:
+    # Keeps a summary per session and per client-named segment up to date as
+    # chunks are committed. New text is folded into the previous summary, so
+    # each update costs one completion over the new chunks only. Summaries
+    # are stored as their own points (payload kind="summary") under ids
+    # derived from the session and segment, which is also how queries and a
+    # restarted process find them again.
+    def __init__(self, rag_instance: RAG,
+                 interval_seconds: float = Config.SUMMARY_INTERVAL_SECONDS,
+                 min_new_chars: int = Config.SUMMARY_MIN_NEW_CHARS,
+                 max_delay_seconds: float = Config.SUMMARY_MAX_DELAY_SECONDS,
+                 max_input_chars: int = Config.SUMMARY_MAX_INPUT_CHARS,
+                 max_words: int = Config.SUMMARY_MAX_WORDS):
+        self.rag_instance = rag_instance
+        self.interval_seconds = interval_seconds
+        self.min_new_chars = min_new_chars
+        self.max_delay_seconds = max_delay_seconds
+        self.max_input_chars = max(1000, max_input_chars)
+        self.max_words = max_words
+        self._sessions: Dict[str, Dict[Optional[str], _Summary]] = {}
+        self._forced = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self.stats_counts = {'updates': 0, 'completions': 0, 'chunks_summarized': 0, 'failures': 0}
+
+    def start(self):
+        threading.Thread(target=self._worker, name="lecture-summarizer", daemon=True).start()
+
+    def add_chunks(self, chunks: List[Dict]):
+        now = time.monotonic()
+        with self._lock:
+            for chunk_data in chunks:
+                session = self._sessions.setdefault(chunk_data['session_key'], {})
+                targets = [None]
+                # Generated segment ids cover a single chunk; those chunks only
+                # feed the session summary
+                if not chunk_data.get('auto_segment'):
+                    targets.append(chunk_data['segment_id'])
+                for segment_id in targets:
+                    summary = session.get(segment_id)
+                    if summary is None:
+                        summary = session[segment_id] = _Summary(
+                            "session" if segment_id is None else "segment", segment_id
+                        )
+                    if not summary.pending:
+                        summary.pending_since = now
+                    summary.pending.append(chunk_data)
+                    summary.pending_chars += len(chunk_data['content'])
+            self._wake.notify()
+
+    def request(self, session_key: str):
+        # Summarize whatever is pending for the session on the next pass,
+        # regardless of size (used when a lecture is finalized)
+        with self._lock:
+            self._forced.add(session_key)
+            self._wake.notify()
+
+    def drop_session(self, session_key: str):
+        with self._lock:
+            self._sessions.pop(session_key, None)
+            self._forced.discard(session_key)
+
+    def _due(self) -> List[Tuple[str, _Summary, List[Dict]]]:
+        now = time.monotonic()
+        due = []
+        with self._lock:
+            for session_key, session in self._sessions.items():
+                forced = session_key in self._forced
+                for summary in session.values():
+                    if summary.pending and (forced or summary.pending_chars >= self.min_new_chars
+                                            or now - summary.pending_since >= self.max_delay_seconds):
+                        due.append((session_key, summary, summary.pending))
+                        summary.pending = []
+                        summary.pending_chars = 0
+            self._forced.clear()
+        return due
+
+    def _requeue(self, summary: _Summary, chunks: List[Dict]):
+        with self._lock:
+            summary.pending = chunks + summary.pending
+            summary.pending_chars = sum(len(chunk_data['content']) for chunk_data in summary.pending)
+            summary.pending_since = time.monotonic()
+
+    def _worker(self):
+        while True:
+            with self._wake:
+                self._wake.wait(timeout=self.interval_seconds)
+            for session_key, summary, chunks in self._due():
+                try:
+                    with metrics.span("summary_update"):
+                        self._update(session_key, summary, chunks)
+                except Exception as e:
+                    self._requeue(summary, chunks)
+                    self.stats_counts['failures'] += 1
+                    metrics.errors.inc("summary")
+                    self.rag_instance.session_store.log_error(session_key, f"Failed to update summary: {str(e)}")
+                    print(f"Error updating summary: {str(e)}")
+
+    def _load(self, session_key: str, summary: _Summary):
+        points = self.rag_instance.db.retrieve([summary_point_id(session_key, summary.segment_id)])
+        if points:
+            payload = points[0].payload or {}
+            summary.text = payload.get('text', "")
+            through = payload.get('summarized_through', 0)
+            # Summaries stored before ranges were kept covered 1..through
+            summary.covered = payload.get('summarized_ranges') or ([[1, through]] if through else [])
+            summary.chunks = payload.get('summarized_chunks', 0)
+        summary.loaded = True
+
+    def _update(self, session_key: str, summary: _Summary, chunks: List[Dict]):
+        if not summary.loaded:
+            self._load(session_key, summary)
+        # Retried or replayed chunks may already be part of the summary
+        new = {}
+        for chunk_data in chunks:
+            if not _is_covered(summary.covered, chunk_data['chunk_number']):
+                new.setdefault(chunk_data['chunk_number'], chunk_data)
+        chunks = [new[chunk_number] for chunk_number in sorted(new)]
+        if not chunks:
+            return
+
+        text = summary.text
+        piece = []
+        piece_chars = 0
+        for chunk_data in chunks:
+            if piece and piece_chars + len(chunk_data['content']) > self.max_input_chars:
+                text = self._fold(summary.level, text, piece)
+                piece, piece_chars = [], 0
+            piece.append(chunk_data['content'])
+            piece_chars += len(chunk_data['content'])
+        text = self._fold(summary.level, text, piece)
+
+        covered = _add_to_ranges(summary.covered, list(new))
+        latest = max(chunks, key=lambda chunk_data: chunk_data['timestamp'])
+        self._store(session_key, summary, text, latest, covered, summary.chunks + len(chunks))
+        summary.text = text
+        summary.covered = covered
+        summary.chunks += len(chunks)
+        self.stats_counts['updates'] += 1
+        self.stats_counts['chunks_summarized'] += len(chunks)
+
+    def _fold(self, level: str, previous: str, texts: List[str]) -> str:
+        scope = "one segment" if level == "segment" else "the whole session"
+        response = self.rag_instance.openai.chat.completions.create(
+            model=Config.SUMMARY_MODEL,
+            messages=[
+                {"role": "system", "content": SUMMARY_SYSTEM_MESSAGE.format(scope=scope, max_words=self.max_words)},
+                {"role": "user", "content": f"Existing summary:\n{previous or '(nothing yet)'}\n\n"
+                                            f"New transcript:\n{' '.join(texts)}"}
+            ],
+            temperature=0.2
+        )
+        self.stats_counts['completions'] += 1
+        return response.choices[0].message.content.strip()
+
+    def _store(self, session_key: str, summary: _Summary, text: str, last: Dict,
+               covered: List[List[int]], chunk_count: int):
+        payload = {
+            "kind": "summary",
+            "summary_level": summary.level,
+            "course_title": last['course_title'],
+            "lecture_title": last['lecture_title'],
+            "text": text,
+            "content_hash": content_hash(text),
+            "timestamp": last['timestamp'],
+            "timestamp_epoch": datetime.fromisoformat(last['timestamp']).timestamp(),
+            "summarized_through": covered[-1][1],
+            "summarized_ranges": covered,
+            "summarized_chunks": chunk_count
+        }
+        if summary.segment_id is not None:
+            payload["segment_id"] = summary.segment_id
+        self.rag_instance.db.add_points([PointStruct(
+            id=summary_point_id(session_key, summary.segment_id),
+            vector=self.rag_instance._get_embedding(text),
+            payload=payload
+        )])
+
+    def stats(self) -> dict:
+        with self._lock:
+            pending = sum(len(summary.pending) for session in self._sessions.values()
+                          for summary in session.values())
+            tracked = sum(len(session) for session in self._sessions.values())
+        return dict(self.stats_counts, summaries_tracked=tracked, pending_chunks=pending)
@@ -1,31 +1,92 @@
 import threading
 import time
 import uuid
-from datetime import datetime
+import zlib
+from contextlib import ExitStack, contextmanager
+from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 from collections import defaultdict
-from queue import Queue
+from queue import Queue, Empty
 from .rag import RAG
+from .lecture_summarizer import LectureSummarizer
 from config.config import Config
+from utils.ingest_log import IngestLog
+from utils.session_store import CACHE_STATUS, SessionRecord
+from utils.text_chunker import StreamingChunker
+from utils.metrics import metrics
 
 class LectureTracker:
     def __init__(self, rag_instance: RAG, 
                  buffer_size: int = Config.BUFFER_SIZE,
-                 update_interval: int = Config.UPDATE_INTERVAL):
+                 update_interval: int = Config.UPDATE_INTERVAL,
+                 batch_size: int = Config.INGEST_BATCH_SIZE,
+                 batch_wait_ms: int = Config.INGEST_BATCH_WAIT_MS,
+                 num_workers: int = Config.INGEST_WORKERS,
+                 idle_flush_seconds: float = Config.CHUNK_IDLE_FLUSH_SECONDS):
         self.rag_instance = rag_instance
         self.buffer_size = buffer_size
         self.update_interval = update_interval
+        self.batch_size = max(1, batch_size)
+        self.batch_wait_ms = max(0, batch_wait_ms)
+        self.num_workers = max(1, num_workers)
+        self.idle_flush_seconds = idle_flush_seconds
         
-        self.content_buffers: Dict[str, List[str]] = defaultdict(list)
-        self.active_lectures: Dict[str, Dict] = {}
-        self.processing_queue: Queue = Queue()
+        # Live fragments are aggregated per session into CHUNK_SIZE chunks
+        # before they are embedded; a buffer holds one segment at a time
+        self.content_buffers: Dict[str, StreamingChunker] = {}
+        self.buffer_segments: Dict[str, Optional[str]] = {}
+        # Per-session state (status, counters, backups, error logs) lives in
+        # the RAG's bounded session store
+        self.sessions = rag_instance.session_store
+        self.sessions.add_eviction_guard(
+            lambda session_key: session_key not in self._pending and not self._has_buffered(session_key)
+        )
+        self.sessions.add_eviction_listener(self._forget_session)
+        self.summarizer = LectureSummarizer(rag_instance) if Config.SUMMARY_ENABLED else None
+        if self.summarizer is not None:
+            self.sessions.add_eviction_listener(self.summarizer.drop_session)
+        # One queue and one worker per shard; a session always maps to the
+        # same shard so its chunks are committed in order.
+        self.shard_queues: List[Queue] = [Queue() for _ in range(self.num_workers)]
         
-        self.chunk_counters: Dict[str, int] = defaultdict(int)
-        self.last_processed: Dict[str, datetime] = {}
-        self.lecture_metadata: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        # Held from numbering a session's chunks until they are logged and
+        # enqueued, so they reach the shard queue in chunk order. Taken
+        # before self._lock, never while holding it. An entry lives while any
+        # thread holds or waits on it, independent of the session record.
+        self._session_locks: Dict[str, threading.Lock] = {}
+        self._session_lock_users: Dict[str, int] = defaultdict(int)
+        # Chunks enqueued but not yet committed (or failed), per session
+        self._pending: Dict[str, int] = defaultdict(int)
+        self._pending_changed = threading.Condition(self._lock)
+        self._stats_lock = threading.Lock()
+        self.ingest_stats = {
+            'started_at': time.monotonic(),
+            'fragments': 0,
+            'chunks_created': 0,
+            'chunks': 0,
+            'batches': 0,
+            'failed_chunks': 0,
+            'retried_chunks': 0,
+            'dead_lettered_chunks': 0,
+            'skipped_chunks': 0,
+            'busy_seconds': 0.0,
+            'last_batch_size': 0,
+            'last_batch_seconds': 0.0
+        }
+        self.worker_stats = [
+            {'chunks': 0, 'batches': 0, 'busy_seconds': 0.0}
+            for _ in range(self.num_workers)
+        ]
         
-        self.backup_content: Dict[str, List[Dict]] = defaultdict(list)
-        self.error_logs: Dict[str, List[str]] = defaultdict(list)
+        self.ingest_log = IngestLog(
+            Config.INGEST_LOG_DIR,
+            segment_bytes=Config.INGEST_LOG_SEGMENT_BYTES,
+            fsync=Config.INGEST_LOG_FSYNC,
+            target_ms=Config.INGEST_LOG_TARGET_MS
+        ) if Config.INGEST_LOG_DIR else None
+        self.replayed_chunks = self._replay_ingest_log()
+        self._register_metrics()
         
         self._start_background_processors()
 
@@ -39,120 +100,572 @@ class LectureTracker:
         )
         update_thread.start()
         
-        process_thread = threading.Thread(
-            target=self._process_queue_worker,
-            daemon=True
+        for shard in range(self.num_workers):
+            process_thread = threading.Thread(
+                target=self._process_queue_worker,
+                args=(shard,),
+                name=f"ingest-worker-{shard}",
+                daemon=True
+            )
+            process_thread.start()
+        
+        if self.summarizer is not None:
+            self.summarizer.start()
+        
+        if self.idle_flush_seconds > 0:
+            flush_thread = threading.Thread(
+                target=self._idle_flush_worker,
+                name="ingest-idle-flush",
+                daemon=True
+            )
+            flush_thread.start()
+
+    def _register_metrics(self):
+        metrics.gauge("ingest_queue_depth", "Chunks waiting in each ingest shard queue",
+                      lambda: {str(shard): queue.qsize() for shard, queue in enumerate(self.shard_queues)}, "shard")
+        metrics.gauge("ingest_pending_chunks", "Chunks enqueued but not yet committed",
+                      lambda: sum(list(self._pending.values())))
+        metrics.gauge("buffered_sessions", "Sessions with transcript text waiting to fill a chunk",
+                      lambda: sum(1 for chunker in list(self.content_buffers.values()) if chunker.has_content))
+        metrics.gauge("sessions", "Tracked lecture sessions by status",
+                      lambda: self.sessions.stats()["by_status"], "status")
+        metrics.counter_callback("ingest_chunks_total", "Chunks handled by the ingest workers",
+                                 lambda: {"stored": self.ingest_stats['chunks'] - self.ingest_stats['skipped_chunks'],
+                                          "already_stored": self.ingest_stats['skipped_chunks'],
+                                          "failed": self.ingest_stats['failed_chunks'],
+                                          "dead_lettered": self.ingest_stats['dead_lettered_chunks']}, "result")
+
+    def _shard_for(self, session_key: str) -> int:
+        return zlib.crc32(session_key.encode('utf-8')) % self.num_workers
+
+    def _enqueue(self, chunk_data: Dict):
+        with self._lock:
+            self._pending[chunk_data['session_key']] += 1
+        self.shard_queues[self._shard_for(chunk_data['session_key'])].put((time.perf_counter(), chunk_data))
+
+    def _log_chunks(self, chunks: List[Dict]):
+        if self.ingest_log is None:
+            return
+        for chunk_data, log_id in zip(chunks, self.ingest_log.append_many(chunks)):
+            chunk_data['log_id'] = log_id
+
+    def _replay_ingest_log(self) -> int:
+        if self.ingest_log is None:
+            return 0
+        pending = self.ingest_log.replay()
+        records = {}
+        for _, chunk_data in pending:
+            if chunk_data['session_key'] not in records:
+                records[chunk_data['session_key']] = self._session_record(
+                    chunk_data['session_key'], chunk_data['course_title'], chunk_data['lecture_title'],
+                    datetime.fromisoformat(chunk_data['timestamp'])
+                )
+        with self._lock:
+            for log_id, chunk_data in pending:
+                chunk_data['log_id'] = log_id
+                self._restore_chunk(records[chunk_data['session_key']], chunk_data)
+        for _, chunk_data in pending:
+            self._enqueue(chunk_data)
+        return len(pending)
+
+    def _restore_chunk(self, record: SessionRecord, chunk_data: Dict):
+        timestamp = datetime.fromisoformat(chunk_data['timestamp'])
+        record.last_update = max(record.last_update, timestamp)
+        record.chunk_count = max(record.chunk_count, chunk_data['chunk_number'])
+        record.backup.append(chunk_data)
+
+    def _session_record(self, session_key: str, course_title: str, lecture_title: str,
+                        current_time: datetime) -> SessionRecord:
+        record = self.sessions.get(session_key)
+        if record is not None and record.status == 'active':
+            return record
+        # Point ids derive from chunk numbers, so a session that restarts
+        # (process restart, eviction, or a record the RAG created for a bulk
+        # upload or query) continues numbering where the collection left off
+        # instead of overwriting earlier chunks. This reads the collection,
+        # so callers hold the session lock but not self._lock.
+        error = None
+        try:
+            last_chunk_number = self.rag_instance.last_chunk_number(
+                course_title, lecture_title, current_time.date()
+            )
+        except Exception as e:
+            last_chunk_number = 0
+            error = f"Failed to resume chunk numbering: {str(e)}"
+        record = self.sessions.get_or_create(session_key, course_title, lecture_title, current_time)
+        with self._lock:
+            record.chunk_count = max(record.chunk_count, last_chunk_number)
+            record.status = 'active'
+            record.end_time = None
+        if error is not None:
+            self.sessions.log_error(session_key, error)
+        return record
+
+    def _forget_session(self, session_key: str):
+        self.content_buffers.pop(session_key, None)
+        self.buffer_segments.pop(session_key, None)
+
+    @contextmanager
+    def _session_lock(self, session_key: str):
+        with self._lock:
+            lock = self._session_locks.get(session_key)
+            if lock is None:
+                lock = self._session_locks[session_key] = threading.Lock()
+            self._session_lock_users[session_key] += 1
+        try:
+            with lock:
+                yield
+        finally:
+            with self._lock:
+                self._session_lock_users[session_key] -= 1
+                if not self._session_lock_users[session_key]:
+                    del self._session_lock_users[session_key]
+                    del self._session_locks[session_key]
+
+    def _has_buffered(self, session_key: str) -> bool:
+        chunker = self.content_buffers.get(session_key)
+        return chunker is not None and chunker.has_content
+
+    def _new_chunker(self) -> StreamingChunker:
+        return StreamingChunker(
+            chunk_size=Config.CHUNK_SIZE,
+            overlap=Config.CHUNK_OVERLAP,
+            snap_to_sentence=Config.CHUNK_SNAP_TO_SENTENCE,
+            max_chunk_size=self.buffer_size
         )
-        process_thread.start()
+
+    def _buffer_fragment(self, session_key: str, record: SessionRecord, content: str,
+                         segment_id: Optional[str], current_time: datetime) -> tuple:
+        # A fragment that only fills the buffer still means the lecture is live
+        record.touch()
+        record.last_update = max(record.last_update, current_time)
+        segment_id = segment_id or None
+        
+        chunks = []
+        chunker = self.content_buffers.get(session_key)
+        if chunker is None:
+            chunker = self.content_buffers[session_key] = self._new_chunker()
+        elif chunker.has_content and self.buffer_segments.get(session_key) != segment_id:
+            chunks.extend(self._flush_buffer(session_key, current_time))
+        self.buffer_segments[session_key] = segment_id
+        
+        for text in chunker.feed(content):
+            chunks.append(self._register_chunk(session_key, record, text, segment_id, current_time))
+        with self._stats_lock:
+            self.ingest_stats['fragments'] += 1
+            self.ingest_stats['chunks_created'] += len(chunks)
+        return chunks, chunker.buffered_chars
+
+    def _flush_buffer(self, session_key: str, current_time: datetime) -> List[Dict]:
+        chunker = self.content_buffers.get(session_key)
+        record = self.sessions.get(session_key)
+        if chunker is None or record is None:
+            return []
+        text = chunker.flush()
+        if text is None:
+            return []
+        with self._stats_lock:
+            self.ingest_stats['chunks_created'] += 1
+        return [self._register_chunk(session_key, record, text,
+                                     self.buffer_segments.get(session_key), current_time)]
+
+    def _submit(self, chunks: List[Dict]):
+        self._log_chunks(chunks)
+        for chunk_data in chunks:
+            self._enqueue(chunk_data)
+
+    def _idle_flush_worker(self):
+        while True:
+            time.sleep(min(1.0, max(0.05, self.idle_flush_seconds / 2)))
+            try:
+                self.flush_idle_buffers()
+            except Exception as e:
+                metrics.errors.inc("idle_flush")
+                print(f"Error in idle flush: {str(e)}")
+
+    def flush_idle_buffers(self) -> int:
+        now = time.monotonic()
+        with self._lock:
+            idle = [session_key for session_key, chunker in self.content_buffers.items()
+                    if chunker.has_content and now - chunker.last_fed >= self.idle_flush_seconds]
+        flushed = 0
+        for session_key in idle:
+            with self._session_lock(session_key):
+                with self._lock:
+                    chunker = self.content_buffers.get(session_key)
+                    if chunker is None or now - chunker.last_fed < self.idle_flush_seconds:
+                        continue
+                    chunks = self._flush_buffer(session_key, datetime.now())
+                self._submit(chunks)
+            flushed += len(chunks)
+        return flushed
+
+    def _pending_total(self) -> int:
+        return sum(shard_queue.qsize() for shard_queue in self.shard_queues)
 
     def add_or_update_lecture(self, course_title: str, lecture_title: str, 
                             content: str, segment_id: Optional[str] = None) -> dict:
         try:
             current_time = datetime.now()
             session_key = f"{course_title}_{lecture_title}_{current_time.date()}"
-            
-            if session_key not in self.active_lectures:
-                self.active_lectures[session_key] = {
-                    'course_title': course_title,
-                    'lecture_title': lecture_title,
-                    'start_time': current_time,
-                    'last_update': current_time,
-                    'status': 'active'
-                }
-            else:
-                self.active_lectures[session_key]['last_update'] = current_time
-            
-            if not segment_id:
-                segment_id = self._generate_segment_id(session_key)
-            
-            self.chunk_counters[session_key] += 1
-            chunk_data = {
-                'content': content,
-                'timestamp': current_time.isoformat(),
-                'chunk_number': self.chunk_counters[session_key],
-                'segment_id': segment_id,
-                'course_title': course_title,
-                'lecture_title': lecture_title,
-                'session_key': session_key
-            }
-            
-            self.backup_content[session_key].append(chunk_data)
-            if len(self.backup_content[session_key]) > 100:
-                self.backup_content[session_key].pop(0)
-            
-            self.processing_queue.put(chunk_data)
+            with self._session_lock(session_key):
+                record = self._session_record(session_key, course_title, lecture_title, current_time)
+                with self._lock:
+                    chunks, buffered_chars = self._buffer_fragment(
+                        session_key, record, content, segment_id, current_time
+                    )
+                self._submit(chunks)
             
             return {
                 "status": "success",
                 "session_key": session_key,
-                "segment_id": segment_id,
-                "chunk_number": self.chunk_counters[session_key]
+                "segment_id": chunks[-1]['segment_id'] if chunks else segment_id,
+                "chunk_number": chunks[-1]['chunk_number'] if chunks else None,
+                "chunks_flushed": len(chunks),
+                "buffered_chars": buffered_chars
             }
             
         except Exception as e:
             error_msg = f"Error adding lecture content: {str(e)}"
-            self.error_logs[session_key].append(error_msg)
+            self.sessions.log_error(f"{course_title}_{lecture_title}_{datetime.now().date()}", error_msg)
             return {"status": "error", "message": error_msg}
 
-    def _process_queue_worker(self):
+    def add_lectures_bulk(self, items: List) -> dict:
+        results = []
+        accepted = 0
+        chunks = []
+        current_time = datetime.now()
+        sessions = {
+            f"{item['course_title']}_{item['lecture_title']}_{current_time.date()}": item
+            for item in items
+            if isinstance(item, dict) and all(item.get(field) for field in ('course_title', 'lecture_title', 'content'))
+        }
+        with ExitStack() as session_locks:
+            records = {}
+            for session_key in sorted(sessions):
+                session_locks.enter_context(self._session_lock(session_key))
+                records[session_key] = self._session_record(
+                    session_key, sessions[session_key]['course_title'],
+                    sessions[session_key]['lecture_title'], current_time
+                )
+            with self._lock:
+                for index, item in enumerate(items):
+                    try:
+                        if isinstance(item, Exception):
+                            raise item
+                        if not isinstance(item, dict):
+                            raise ValueError("Item must be a JSON object")
+                        missing = [field for field in ('course_title', 'lecture_title', 'content') if not item.get(field)]
+                        if missing:
+                            raise ValueError(f"Missing required field: {', '.join(missing)}")
+                    
+                        session_key = f"{item['course_title']}_{item['lecture_title']}_{current_time.date()}"
+                        flushed, buffered_chars = self._buffer_fragment(
+                            session_key, records[session_key], item['content'],
+                            item.get('segment_id'), current_time
+                        )
+                        accepted += 1
+                        chunks.extend(flushed)
+                        results.append({
+                            "index": index,
+                            "status": "success",
+                            "session_key": session_key,
+                            "segment_id": flushed[-1]['segment_id'] if flushed else item.get('segment_id'),
+                            "chunk_number": flushed[-1]['chunk_number'] if flushed else None,
+                            "chunks_flushed": len(flushed),
+                            "buffered_chars": buffered_chars
+                        })
+                    except Exception as e:
+                        results.append({"index": index, "status": "error", "message": str(e)})
+            
+            try:
+                self._submit(chunks)
+            except Exception as e:
+                return {"status": "error", "message": f"Error writing ingest log: {str(e)}"}
+        
+        if not results:
+            status = "error"
+        elif accepted == len(results):
+            status = "success"
+        else:
+            status = "partial" if accepted else "error"
+        return {
+            "status": status,
+            "accepted": accepted,
+            "rejected": len(results) - accepted,
+            "chunks_flushed": len(chunks),
+            "results": results
+        }
+
+    def _register_chunk(self, session_key: str, record: SessionRecord, content: str,
+                        segment_id: Optional[str], current_time: datetime) -> Dict:
+        record.touch()
+        # Keep timestamps strictly increasing within a session so they
+        # can be used to order chunks, even for a bulk request
+        if record.chunk_count and current_time <= record.last_update:
+            current_time = record.last_update + timedelta(microseconds=1)
+        record.last_update = current_time
+        
+        auto_segment = not segment_id
+        if auto_segment:
+            segment_id = self._generate_segment_id(session_key)
+        
+        record.chunk_count += 1
+        chunk_data = {
+            'content': content,
+            'timestamp': current_time.isoformat(),
+            'chunk_number': record.chunk_count,
+            'segment_id': segment_id,
+            'auto_segment': auto_segment,
+            'course_title': record.course_title,
+            'lecture_title': record.lecture_title,
+            'session_key': session_key
+        }
+        
+        record.backup.append(chunk_data)
+        return chunk_data
+
+    def _next_batch(self, shard_queue: Queue) -> List[Dict]:
+        # Queue items are (enqueued_at, chunk_data)
+        batch = [shard_queue.get()]
+        deadline = time.monotonic() + self.batch_wait_ms / 1000.0
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(shard_queue.get(timeout=remaining))
+                else:
+                    batch.append(shard_queue.get_nowait())
+            except Empty:
+                break
+        dequeued_at = time.perf_counter()
+        for enqueued_at, _ in batch:
+            metrics.observe("queue_wait", dequeued_at - enqueued_at)
+        return [chunk_data for _, chunk_data in batch]
+
+    def _process_queue_worker(self, shard: int):
+        shard_queue = self.shard_queues[shard]
         while True:
+            batch = []
             try:
-                if not self.processing_queue.empty():
-                    chunk_data = self.processing_queue.get()
-                    self.rag_instance.add_lecture_chunk_to_db(chunk_data)
-                    self.last_processed[chunk_data['session_key']] = datetime.now()
-                time.sleep(1)
+                batch = self._next_batch(shard_queue)
+                failure = self._store_batch(shard, batch)
+                # Retry here rather than requeueing, so the shard (and every
+                # session on it) waits for this batch and commits stay in
+                # chunk order. The chunks stay pending meanwhile.
+                attempts = 1
+                while failure is not None and attempts < Config.INGEST_MAX_ATTEMPTS:
+                    self._log_batch_error(batch, failure)
+                    with self._stats_lock:
+                        self.ingest_stats['retried_chunks'] += len(batch)
+                    time.sleep(Config.INGEST_RETRY_BACKOFF_SECONDS * 2 ** (attempts - 1))
+                    failure = self._store_batch(shard, batch)
+                    attempts += 1
+                if failure is not None:
+                    self._log_batch_error(batch, failure)
+                    self._dead_letter(batch, attempts)
             except Exception as e:
+                metrics.errors.inc("ingest_worker")
                 print(f"Error in queue processing: {str(e)}")
+            finally:
+                self._mark_processed(batch)
+
+    def _store_batch(self, shard: int, batch: List[Dict]) -> Optional[str]:
+        # Returns the failure message, or None once the batch is committed
+        try:
+            with metrics.span("ingest_batch") as span:
+                result = self.rag_instance.add_lecture_chunks_to_db(batch)
+        except Exception as e:
+            metrics.errors.inc("ingest_worker")
+            print(f"Error in queue processing: {str(e)}")
+            return str(e)
+        self._record_batch(shard, len(batch), time.perf_counter() - span.started,
+                           result['status'] == 'success', result.get('chunks_skipped', 0))
+        if result['status'] != 'success':
+            metrics.errors.inc("ingest", amount=len(batch))
+            return result['message']
+        
+        if self.ingest_log is not None:
+            self.ingest_log.commit([chunk_data.get('log_id') for chunk_data in batch])
+        if self.summarizer is not None:
+            self.summarizer.add_chunks(batch)
+        
+        processed_at = datetime.now()
+        for chunk_data in batch:
+            record = self.sessions.get(chunk_data['session_key'])
+            if record is not None:
+                record.last_processed = processed_at
+        return None
+
+    def _log_batch_error(self, batch: List[Dict], message: str):
+        for session_key in {chunk_data['session_key'] for chunk_data in batch}:
+            self.sessions.log_error(session_key, message)
+
+    def _dead_letter(self, batch: List[Dict], attempts: int):
+        # Moved to the ingest log's dead-letter file so its segments can still
+        # be compacted; the session backup keeps them for recover_session.
+        try:
+            if self.ingest_log is not None:
+                self.ingest_log.dead_letter([(chunk_data.get('log_id'), chunk_data) for chunk_data in batch])
+        except Exception as e:
+            print(f"Error writing dead-letter log: {str(e)}")
+        for chunk_data in batch:
+            self.sessions.log_error(
+                chunk_data['session_key'],
+                f"Gave up on chunk {chunk_data['chunk_number']} after {attempts} attempts"
+            )
+        with self._stats_lock:
+            self.ingest_stats['dead_lettered_chunks'] += len(batch)
+
+    def _mark_processed(self, batch: List[Dict]):
+        if not batch:
+            return
+        with self._pending_changed:
+            for chunk_data in batch:
+                session_key = chunk_data['session_key']
+                self._pending[session_key] -= 1
+                if self._pending[session_key] <= 0:
+                    del self._pending[session_key]
+            self._pending_changed.notify_all()
+
+    def _buffered_chars(self, session_key: str) -> int:
+        with self._lock:
+            chunker = self.content_buffers.get(session_key)
+            return chunker.buffered_chars if chunker is not None else 0
+
+    def pending_chunks(self, session_key: str) -> int:
+        with self._lock:
+            return self._pending.get(session_key, 0)
+
+    def _record_batch(self, shard: int, batch_size: int, seconds: float, succeeded: bool,
+                      skipped: int = 0):
+        with self._stats_lock:
+            worker = self.worker_stats[shard]
+            worker['batches'] += 1
+            worker['busy_seconds'] += seconds
+            if succeeded:
+                worker['chunks'] += batch_size
+
+            self.ingest_stats['batches'] += 1
+            self.ingest_stats['busy_seconds'] += seconds
+            self.ingest_stats['last_batch_size'] = batch_size
+            self.ingest_stats['last_batch_seconds'] = seconds
+            if succeeded:
+                self.ingest_stats['chunks'] += batch_size
+                self.ingest_stats['skipped_chunks'] += skipped
+            else:
+                self.ingest_stats['failed_chunks'] += batch_size
+
+    def get_ingest_stats(self) -> dict:
+        with self._stats_lock:
+            stats = dict(self.ingest_stats)
+        uptime = time.monotonic() - stats['started_at']
+        return {
+            "status": "success",
+            "batch_size": self.batch_size,
+            "batch_wait_ms": self.batch_wait_ms,
+            "fragments_received": stats['fragments'],
+            "chunks_created": stats['chunks_created'],
+            "fragments_per_chunk": stats['fragments'] / stats['chunks_created'] if stats['chunks_created'] else 0.0,
+            "buffered_sessions": sum(1 for chunker in list(self.content_buffers.values()) if chunker.has_content),
+            "chunks_processed": stats['chunks'],
+            "chunks_failed": stats['failed_chunks'],
+            "chunks_retried": stats['retried_chunks'],
+            "chunks_dead_lettered": stats['dead_lettered_chunks'],
+            "chunks_already_stored": stats['skipped_chunks'],
+            "batches": stats['batches'],
+            "avg_batch_size": stats['chunks'] / stats['batches'] if stats['batches'] else 0.0,
+            "chunks_per_sec": stats['chunks'] / stats['busy_seconds'] if stats['busy_seconds'] else 0.0,
+            "wall_chunks_per_sec": stats['chunks'] / uptime if uptime else 0.0,
+            "last_batch_chunks_per_sec": (
+                stats['last_batch_size'] / stats['last_batch_seconds']
+                if stats['last_batch_seconds'] else 0.0
+            ),
+            "pending_chunks": self._pending_total(),
+            "shards": self._shard_stats(),
+            "workers": self._worker_utilization(),
+            "replayed_chunks": self.replayed_chunks,
+            "summaries": self.summarizer.stats() if self.summarizer is not None else None,
+            "ingest_log": self.ingest_log.stats() if self.ingest_log is not None else None
+        }
+
+    def _worker_utilization(self) -> List[dict]:
+        with self._stats_lock:
+            uptime = time.monotonic() - self.ingest_stats['started_at']
+            workers = [dict(worker) for worker in self.worker_stats]
+        return [
+            {
+                "worker": shard,
+                "chunks": worker['chunks'],
+                "batches": worker['batches'],
+                "busy_seconds": worker['busy_seconds'],
+                "utilization": worker['busy_seconds'] / uptime if uptime else 0.0
+            }
+            for shard, worker in enumerate(workers)
+        ]
+
+    def _shard_stats(self) -> List[dict]:
+        return [
+            {"shard": shard, "queue_depth": shard_queue.qsize()}
+            for shard, shard_queue in enumerate(self.shard_queues)
+        ]
 
     def _periodic_update_worker(self):
         while True:
             try:
                 current_time = datetime.now()
-                for session_key, lecture_data in self.active_lectures.items():
-                    if lecture_data['status'] != 'active':
+                for session_key, record in self.sessions.items():
+                    if record.status != 'active':
                         continue
                         
-                    last_processed = self.last_processed.get(session_key, datetime.min)
+                    last_processed = record.last_processed or datetime.min
                     if (current_time - last_processed).seconds >= self.update_interval:
-                        self._check_lecture_status(session_key, current_time)
-                        
+                        self._check_lecture_status(record, current_time)
+                
+                self.sessions.evict_expired()
             except Exception as e:
+                metrics.errors.inc("periodic_update")
                 print(f"Error in periodic update: {str(e)}")
             time.sleep(self.update_interval)
 
-    def _check_lecture_status(self, session_key: str, current_time: datetime):
-        lecture_data = self.active_lectures[session_key]
-        last_update = lecture_data['last_update']
-        
-        if (current_time - last_update).seconds > (self.update_interval * 2):
-            lecture_data['status'] = 'inactive'
-            lecture_data['end_time'] = current_time
+    def _check_lecture_status(self, record: SessionRecord, current_time: datetime):
+        if (current_time - record.last_update).seconds > (self.update_interval * 2):
+            record.status = 'inactive'
+            record.end_time = current_time
+
+    def _lecture_record(self, session_key: str) -> Optional[SessionRecord]:
+        # Records the RAG creates for queries and bulk uploads only anchor its
+        # caches; they aren't lectures this tracker has seen.
+        record = self.sessions.get(session_key)
+        if record is None or record.status == CACHE_STATUS:
+            return None
+        return record
 
     def get_lecture_status(self, course_title: str, lecture_title: str) -> dict:
         current_date = datetime.now().date()
         session_key = f"{course_title}_{lecture_title}_{current_date}"
         
-        if session_key not in self.active_lectures:
+        record = self._lecture_record(session_key)
+        if record is None:
             return {"status": "not_found"}
             
-        lecture_data = self.active_lectures[session_key]
         return {
-            "status": lecture_data['status'],
-            "start_time": lecture_data['start_time'].isoformat(),
-            "last_update": lecture_data['last_update'].isoformat(),
-            "end_time": lecture_data.get('end_time', '').isoformat() if lecture_data.get('end_time') else None,
-            "total_chunks": self.chunk_counters[session_key]
+            "status": record.status,
+            "start_time": record.start_time.isoformat(),
+            "last_update": record.last_update.isoformat(),
+            "end_time": record.end_time.isoformat() if record.end_time else None,
+            "total_chunks": record.chunk_count
         }
 
     def recover_session(self, session_key: str) -> dict:
         try:
-            if session_key not in self.backup_content:
+            record = self._lecture_record(session_key)
+            if record is None or not record.backup:
                 return {"status": "error", "message": "No backup found for session"}
                 
-            backup_chunks = self.backup_content[session_key]
+            backup_chunks = list(record.backup)
             for chunk_data in backup_chunks:
-                self.processing_queue.put(chunk_data)
+                self._enqueue(chunk_data)
                 
             return {
                 "status": "success",
@@ -162,73 +675,103 @@ class LectureTracker:
         except Exception as e:
             return {"status": "error", "message": f"Recovery failed: {str(e)}"}
 
-    def finalize_lecture(self, course_title: str, lecture_title: str) -> dict:
+    def finalize_lecture(self, course_title: str, lecture_title: str,
+                         timeout: Optional[float] = None) -> dict:
+        if timeout is None:
+            timeout = Config.FINALIZE_TIMEOUT
         try:
             current_date = datetime.now().date()
             session_key = f"{course_title}_{lecture_title}_{current_date}"
             
-            if session_key not in self.active_lectures:
+            record = self._lecture_record(session_key)
+            if record is None:
                 return {"status": "error", "message": "No active session found"}
+            
+            with self._session_lock(session_key):
+                with self._lock:
+                    flushed = self._flush_buffer(session_key, datetime.now())
+                    self._forget_session(session_key)
+                self._submit(flushed)
                 
-            while not self.processing_queue.empty():
-                time.sleep(1)
+            with self._pending_changed:
+                drained = self._pending_changed.wait_for(
+                    lambda: self._pending.get(session_key, 0) == 0,
+                    timeout=timeout
+                )
+                pending = self._pending.get(session_key, 0)
+            
+            if not drained:
+                return {
+                    "status": "timeout",
+                    "message": f"Timed out after {timeout}s waiting for {pending} pending chunks",
+                    "pending_chunks": pending,
+                    "total_chunks": record.chunk_count
+                }
                 
-            self.active_lectures[session_key]['status'] = 'completed'
-            self.active_lectures[session_key]['end_time'] = datetime.now()
+            record.status = 'completed'
+            record.end_time = datetime.now()
+            record.touch()
+            if self.summarizer is not None:
+                self.summarizer.request(session_key)
             
             return {
                 "status": "success",
                 "message": "Lecture finalized successfully",
-                "total_chunks": self.chunk_counters[session_key]
+                "total_chunks": record.chunk_count
             }
         except Exception as e:
             error_msg = f"Failed to finalize lecture: {str(e)}"
-            self.error_logs[session_key].append(error_msg)
+            self.sessions.log_error(session_key, error_msg)
             return {"status": "error", "message": error_msg}
 
     def get_error_logs(self, session_key: str) -> List[str]:
-        return self.error_logs.get(session_key, [])
+        record = self.sessions.get(session_key)
+        return list(record.errors) if record is not None else []
 
     def clear_error_logs(self, session_key: str) -> None:
-        if session_key in self.error_logs:
-            self.error_logs[session_key] = []
+        record = self.sessions.get(session_key)
+        if record is not None:
+            record.errors.clear()
 
     def get_session_stats(self, session_key: str) -> dict:
-        if session_key not in self.active_lectures:
+        record = self._lecture_record(session_key)
+        if record is None:
             return {"status": "error", "message": "Session not found"}
             
-        lecture_data = self.active_lectures[session_key]
         return {
-            "status": lecture_data['status'],
-            "start_time": lecture_data['start_time'].isoformat(),
-            "last_update": lecture_data['last_update'].isoformat(),
-            "end_time": lecture_data.get('end_time', '').isoformat() if lecture_data.get('end_time') else None,
-            "total_chunks": self.chunk_counters[session_key],
-            "processed_chunks": len(self.backup_content.get(session_key, [])),
-            "pending_chunks": self.processing_queue.qsize(),
-            "has_errors": bool(self.error_logs.get(session_key, []))
+            "status": record.status,
+            "start_time": record.start_time.isoformat(),
+            "last_update": record.last_update.isoformat(),
+            "end_time": record.end_time.isoformat() if record.end_time else None,
+            "total_chunks": record.chunk_count,
+            "processed_chunks": len(record.backup),
+            "pending_chunks": self.pending_chunks(session_key),
+            "buffered_chars": self._buffered_chars(session_key),
+            "has_errors": bool(record.errors),
+            "shard": self._shard_for(session_key),
+            "ingest": {
+                "shards": self._shard_stats(),
+                "workers": self._worker_utilization()
+            }
         }
 
     def cleanup_session(self, session_key: str) -> dict:
         try:
-            if session_key not in self.active_lectures:
+            record = self._lecture_record(session_key)
+            if record is None:
                 return {"status": "error", "message": "Session not found"}
                 
-            if self.active_lectures[session_key]['status'] != 'completed':
+            if record.status != 'completed':
                 return {"status": "error", "message": "Cannot cleanup active session"}
                 
-            self.backup_content.pop(session_key, None)
-            self.error_logs.pop(session_key, None)
-            self.chunk_counters.pop(session_key, None)
-            self.last_processed.pop(session_key, None)
-            lecture_data = self.active_lectures.pop(session_key, None)
+            self.sessions.discard(session_key)
             
             return {
                 "status": "success",
                 "message": "Session cleaned up successfully",
-                "session_data": lecture_data
+                "session_data": record.to_dict()
             }
         except Exception as e:
             error_msg = f"Failed to cleanup session: {str(e)}"
-            self.error_logs[session_key].append(error_msg)
+            self.sessions.log_error(session_key, error_msg)
             return {"status": "error", "message": error_msg}
\ No newline at end of file
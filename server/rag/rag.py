@@ -1,302 +1,1005 @@
+import hashlib
+import itertools
+import re
+import threading
+import time
 import uuid
-from datetime import datetime
-from collections import defaultdict
-from typing import List, Dict
-from openai import OpenAI
+from datetime import datetime, timedelta
+from collections import defaultdict, deque
+from typing import Iterable, Iterator, List, Dict, Optional, Tuple
+import numpy as np
+import httpx
+from openai import OpenAI, DefaultHttpxClient
 from database.qdrant_db import QdrantDB
 from config.config import Config
+from utils.embedding_cache import EmbeddingCache
+from utils.semantic_cache import SemanticAnswerCache
+from utils.recent_chunk_store import RecentChunkStore
+from utils.session_store import CACHE_STATUS, SessionStore
+from utils.lexical_index import LexicalIndex, tokenize
+from utils.text_chunker import chunk_text
+from utils.context_assembler import ContextAssembler, parse_budgets
+from utils.metrics import metrics
+from utils.single_flight import SingleFlight, normalize_question
+from utils.transcript_store import MaterializedTranscript, TranscriptStore, etag_matches
+from .embedding_providers import create_embedding_provider
+from .lecture_stream import LectureStreamEncoder
 from qdrant_client.models import PointStruct, Filter, FieldCondition, MatchValue, Range
 
+CONTEXT_SYSTEM_MESSAGE = """You are an AI assistant specifically trained to answer questions based ONLY on the provided lecture content. 
+        Your knowledge is limited to the information given in the context. Follow these rules strictly:
+        1. Only use information explicitly stated in the provided context.
+        2. If the context doesn't contain relevant information to answer the question, say "I don't have enough information to answer that question based on the provided lecture content."
+        3. Do not use any external knowledge or make assumptions beyond what's in the context.
+        4. If asked about topics not covered in the context, state that the lecture content doesn't cover that topic.
+        5. Be precise and concise in your answers, citing specific parts of the context when possible.
+        6. If the question is ambiguous or unclear based on the context, ask for clarification.
+        7. Never claim to know more than what's provided in the context.
+        8. If the context contains conflicting information, point out the inconsistency without resolving it.
+        Remember, your role is to interpret and relay the information from the lecture content, not to provide additional knowledge or opinions."""
+
+STREAM_LATENCY_SAMPLES = 1000
+RETRIEVAL_PATHS = ("lexical", "hybrid", "dense", "cache", "summary")
+# Overview wording pulls in the rolling lecture summary. Only questions
+# about the lecture itself ("what has been covered so far?") are answered
+# from the summary alone; topic questions ("summarize the proof of
+# Theorem 2") still go through retrieval with the summary as one extra context.
+OVERVIEW_PATTERN = re.compile(
+    r"\b(summar(y|ies|ise|ize|ising|izing)|overview|recap|outline"
+    r"|covered|discussed|taught|talked about|gone over|learn(ed|t)"
+    r"|(key|main) (points|topics|ideas|takeaways))\b",
+    re.IGNORECASE
+)
+LECTURE_SCOPE_PATTERN = re.compile(
+    r"\b(so far|today|(this|the|today's) (lecture|class|session))\b",
+    re.IGNORECASE
+)
+
+GENERAL_TEMPERATURE = 0.7
+CONTEXT_TEMPERATURE = 0.3  # Lower temperature for more deterministic outputs
+
+# Fixed namespace so point ids derived from chunk coordinates are the same
+# in every process; writing a chunk again (batch retry, ingest-log replay,
+# recover_session) overwrites its point instead of adding a copy. A live
+# fragment POSTed twice is new transcript text and gets new chunk numbers.
+POINT_ID_NAMESPACE = uuid.UUID("5b0d2f4e-8c61-4a7e-9f13-6d2a9e4c1b70")
+
+def point_id(*parts) -> str:
+    return str(uuid.uuid5(POINT_ID_NAMESPACE, "\x1f".join(str(part) for part in parts)))
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def summary_point_id(session_key: str, segment_id: Optional[str] = None) -> str:
+    return point_id("summary", session_key, segment_id or "")
+
+def _not_summary() -> FieldCondition:
+    # Summary points share the collection with transcript chunks
+    return FieldCondition(key="kind", match=MatchValue(value="summary"))
+
+def _openai_limits() -> httpx.Limits:
+    return httpx.Limits(max_connections=Config.OPENAI_POOL_SIZE,
+                        max_keepalive_connections=Config.OPENAI_POOL_SIZE)
+
+def _cache_skipped() -> dict:
+    return {"hit": False, "similarity": None, "invalidated": 0}
+
+def _elapsed_ms(started: float) -> float:
+    return (time.perf_counter() - started) * 1000
+
+class _Query:
+    # One query's state between steps. RAG and AsyncRAG run the same steps
+    # and differ only in how they await the embedding, search and
+    # completion calls in between.
+    __slots__ = ('question', 'course_title', 'lecture_title', 'current_date', 'session_key',
+                 'segment_id', 'prefer_recent', 'limit', 'cache_scope', 'cache_version',
+                 'summary_ids', 'summary_results', 'lexical_results', 'query_embedding',
+                 'cache_info', 'retrieval', 'results', 'context_info')
+
+    def __init__(self, question: str, course_title: str, lecture_title: str,
+                 segment_id: Optional[str], prefer_recent: bool, limit: int):
+        self.question = question
+        self.course_title = course_title
+        self.lecture_title = lecture_title
+        self.current_date = datetime.now().date()
+        self.session_key = f"{course_title}_{lecture_title}_{self.current_date}"
+        self.segment_id = segment_id
+        self.prefer_recent = prefer_recent
+        self.limit = limit
+        self.cache_scope = (segment_id, prefer_recent, limit)
+        self.cache_version = 0
+        self.summary_ids: List[str] = []
+        self.summary_results: List[Dict] = []
+        self.lexical_results: List[Dict] = []
+        self.query_embedding: Optional[List[float]] = None
+        self.cache_info = _cache_skipped()
+        self.retrieval: Optional[str] = None
+        self.results: List[Dict] = []
+        self.context_info: Optional[dict] = None
+
 class RAG:
     def __init__(self):
-        self.db = QdrantDB(Config.COLLECTION_NAME)
-        self.openai = OpenAI(api_key=Config.OPENAI_API_KEY)
-        self.recent_chunks = []
-        self.max_recent_chunks = 10
-        self.session_memory = defaultdict(list)
+        # One pooled HTTP client shared by the ingest workers and request threads
+        self.openai = OpenAI(
+            api_key=Config.OPENAI_API_KEY,
+            base_url=Config.OPENAI_BASE_URL,
+            timeout=Config.OPENAI_TIMEOUT,
+            http_client=DefaultHttpxClient(limits=_openai_limits())
+        )
+        self.embedder = create_embedding_provider(
+            Config.EMBEDDING_MODEL,
+            openai_client=self.openai,
+            batch_size=Config.EMBEDDING_BATCH_SIZE,
+            dimension=Config.EMBEDDING_DIMENSION,
+            max_tokens=Config.EMBEDDING_MAX_TOKENS,
+            threads=Config.EMBEDDING_THREADS
+        )
+        # Vectors from different providers, or one model at different
+        # dimensions, must not share cache entries
+        self.embedding_cache_key = f"{self.embedder.name}/{self.embedder.dimension}"
+        self.db = QdrantDB(Config.COLLECTION_NAME, vector_size=self.embedder.dimension)
+        self.recent_store = RecentChunkStore(Config.RECENT_CHUNKS_PER_SESSION)
+        self.lexical_index = LexicalIndex(Config.LEXICAL_CHUNKS_PER_SESSION)
+        self.context_assembler = ContextAssembler(
+            Config.LLM_MODEL,
+            budget=parse_budgets(Config.CONTEXT_TOKEN_BUDGETS).get(Config.LLM_MODEL, Config.CONTEXT_TOKEN_BUDGET),
+            dedup_threshold=Config.CONTEXT_DEDUP_THRESHOLD
+        )
+        self.retrieval_counts = dict.fromkeys(RETRIEVAL_PATHS, 0)
+        self._retrieval_lock = threading.Lock()
+        self.stream_latencies = deque(maxlen=STREAM_LATENCY_SAMPLES)
+        self.embedding_cache = EmbeddingCache(
+            max_entries=Config.EMBEDDING_CACHE_SIZE,
+            disk_path=Config.EMBEDDING_CACHE_PATH
+        )
+        self.answer_cache = SemanticAnswerCache(
+            threshold=Config.ANSWER_CACHE_THRESHOLD,
+            max_entries_per_session=Config.ANSWER_CACHE_SIZE
+        )
+        self.query_flights = SingleFlight(Config.QUERY_COALESCING)
+        self.transcripts = TranscriptStore(Config.TRANSCRIPT_CACHE_LECTURES)
+        self.session_store = SessionStore(
+            ttl_seconds=Config.SESSION_TTL_SECONDS,
+            max_sessions=Config.SESSION_STORE_MAX_SESSIONS,
+            max_bytes=Config.SESSION_STORE_MAX_BYTES,
+            max_memory=Config.SESSION_MEMORY_SIZE
+        )
+        metrics.gauge("cache_entries", "Entries held by each in-memory cache", self._cache_sizes, "cache")
+        metrics.gauge("session_store_bytes", "Approximate memory held by per-session state",
+                      lambda: self.session_store.stats()["total_bytes"])
+        metrics.counter_callback("query_upstream_calls_saved_total",
+                                 "Queries answered by joining an identical in-flight query",
+                                 lambda: self.query_flights.stats()["upstream_calls_saved"])
+        self.session_store.add_eviction_listener(self.recent_store.drop_session)
+        self.session_store.add_eviction_listener(self.lexical_index.drop_session)
+        self.session_store.add_eviction_listener(self.answer_cache.drop_session)
 
     def _get_embedding(self, text: str) -> List[float]:
+        return self._get_embeddings([text])[0]
+
+    def _get_embeddings(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        embeddings, missing = self._lookup_embeddings(texts)
+        if not missing:
+            return embeddings
+
+        started = time.perf_counter()
+        fetched = self._request_embeddings(missing)
+        return self._fill_embeddings(texts, embeddings, missing, fetched, time.perf_counter() - started)
+
+    def _lookup_embeddings(self, texts: List[str]) -> Tuple[List[Optional[List[float]]], List[str]]:
+        if not self.embedding_cache.enabled:
+            return [None] * len(texts), list(dict.fromkeys(texts))
+
+        embeddings = self.embedding_cache.get_many(self.embedding_cache_key, texts)
+        missing = list(dict.fromkeys(
+            text for text, embedding in zip(texts, embeddings) if embedding is None
+        ))
+        if not missing:
+            self.embedding_cache.record_saved_call()
+        return embeddings, missing
+
+    def _fill_embeddings(self, texts: List[str], embeddings: List[Optional[List[float]]],
+                         missing: List[str], fetched: List[List[float]], seconds: float) -> List[List[float]]:
+        if self.embedding_cache.enabled:
+            self.embedding_cache.record_api_call(seconds)
+            self.embedding_cache.put_many(self.embedding_cache_key, missing, fetched)
+
+        by_text = dict(zip(missing, fetched))
+        return [
+            embedding if embedding is not None else by_text[text]
+            for text, embedding in zip(texts, embeddings)
+        ]
+
+    def _request_embeddings(self, texts: List[str]) -> List[List[float]]:
         try:
-            response = self.openai.embeddings.create(
-                model=Config.EMBEDDING_MODEL,
-                input=text
-            )
-            return response.data[0].embedding
+            with metrics.span("embedding"):
+                return self.embedder.embed(texts)
         except Exception as e:
             raise Exception(f"Failed to generate embedding: {str(e)}")
 
-    def add_chunk_to_recent(self, chunk: Dict[str, any]):
-        self.recent_chunks.append(chunk)
-        if len(self.recent_chunks) > self.max_recent_chunks:
-            self.recent_chunks.pop(0)
-
-    def _search_recent_chunks(self, course_title: str, lecture_title: str, 
-                            current_date: datetime.date, segment_id: str = None, 
-                            limit: int = 3) -> List[Dict]:
-        results = [
-            chunk for chunk in self.recent_chunks
-            if chunk['course_title'] == course_title and 
-               chunk['lecture_title'] == lecture_title and
-               datetime.fromisoformat(chunk['timestamp']).date() == current_date and
-               (segment_id is None or chunk.get('segment_id') == segment_id)
+    def get_cache_stats(self) -> dict:
+        return {
+            "status": "success",
+            "embedding_cache": self.embedding_cache.stats(),
+            "answer_cache": self.answer_cache.stats(),
+            "recent_store": self.recent_store.stats(),
+            "lexical_index": self.lexical_index.stats(),
+            "session_store": self.session_store.stats(),
+            "transcripts": self.transcripts.stats()
+        }
+
+    def _cache_sizes(self) -> dict:
+        return {
+            "embedding": self.embedding_cache.stats()["memory_entries"],
+            "answer": self.answer_cache.stats()["entries"],
+            "recent_chunks": self.recent_store.stats()["chunks"],
+            "lexical_chunks": self.lexical_index.stats()["chunks"],
+            "transcript_chunks": self.transcripts.stats()["chunks"]
+        }
+
+    def _track_session(self, session_key: str, course_title: str, lecture_title: str):
+        # The recent store, lexical index and answer cache drop a session's
+        # entries when the session store evicts it, so every key they hold
+        # needs a record there. Sessions the live tracker didn't start (bulk
+        # uploads, queries) get the cache status, which lets the TTL apply
+        # without the tracker treating them as lectures.
+        self.session_store.get_or_create(session_key, course_title, lecture_title,
+                                         datetime.now(), status=CACHE_STATUS)
+
+    def add_chunks_to_recent(self, session_key: str, chunks: List[Dict],
+                             embeddings: List[List[float]]):
+        if chunks:
+            self._track_session(session_key, chunks[0]['course_title'], chunks[0]['lecture_title'])
+        self.recent_store.add_many(session_key, chunks, embeddings)
+        self.lexical_index.add_many(session_key, chunks)
+
+    def _search_recent_chunks(self, session_key: str, query_embedding: List[float],
+                              segment_id: str = None, limit: int = 3) -> List[Dict]:
+        return [
+            dict(chunk, score=score)
+            for score, chunk in self.recent_store.search(session_key, query_embedding, segment_id, limit)
         ]
-        return results[:limit]
+
+    def _lexical_search(self, session_key: str, question: str,
+                        segment_id: str = None, limit: int = 3) -> Tuple[List[Dict], bool]:
+        # A strong lexical match answers the query without embedding it
+        query_terms = tokenize(question)
+        hits = self.lexical_index.search_terms(session_key, query_terms, segment_id, limit)
+        strong = False
+        if hits:
+            _, _, matched, relative = hits[0]
+            distinct_terms = len(set(query_terms))
+            strong = matched >= min(Config.LEXICAL_MIN_TERMS, distinct_terms) \
+                and matched / distinct_terms >= Config.LEXICAL_MIN_COVERAGE \
+                and relative >= Config.LEXICAL_MIN_SCORE
+        return [dict(chunk, score=score) for score, chunk, _, _ in hits], strong
+
+    def _summary_ids(self, question: str, session_key: str, segment_id: Optional[str]) -> List[str]:
+        # Without the summarizer there are no summary points to fetch
+        if not Config.SUMMARY_ENABLED or not OVERVIEW_PATTERN.search(question):
+            return []
+        # A segment question prefers that segment's summary, then the session's
+        ids = [summary_point_id(session_key)]
+        if segment_id:
+            ids.insert(0, summary_point_id(session_key, segment_id))
+        return ids
+
+    def _summary_points(self, ids: List[str]) -> list:
+        return self.db.retrieve(ids) if ids else []
+
+    def _with_summary(self, combined_results: List[Dict], summary_results: List[Dict]) -> List[Dict]:
+        # The summary has no score, so the context assembler ranks it last
+        # and drops it first when the budget is tight
+        return combined_results + summary_results[:1]
+
+    def _summary_results(self, ids: List[str], points: list) -> List[Dict]:
+        by_id = {str(point.id): point.payload for point in points if point.payload}
+        for payload in (by_id[summary_id] for summary_id in ids if summary_id in by_id):
+            return [{
+                "text": payload['text'],
+                "course_title": payload['course_title'],
+                "lecture_title": payload['lecture_title'],
+                "timestamp": payload['timestamp'],
+                "chunk_number": payload.get('summarized_through'),
+                "segment_id": payload.get('segment_id'),
+                "score": None,
+                "summary": payload['summary_level']
+            }]
+        return []
+
+    def _combine_results(self, lexical_results: List[Dict], recent_results: List[Dict],
+                         db_results: list, limit: int) -> Tuple[str, List[Dict]]:
+        dense_results = self._merge_results(recent_results, db_results, limit)
+        if not lexical_results:
+            return "dense", dense_results
+        return "hybrid", self._fuse_results(lexical_results, dense_results, limit)
+
+    def _fuse_results(self, lexical_results: List[Dict], dense_results: List[Dict],
+                      limit: int) -> List[Dict]:
+        # Reciprocal-rank fusion; dense results arrive in timestamp order
+        fused = {}
+        ranked_dense = sorted(dense_results, key=lambda r: r.get('score') or 0.0, reverse=True)
+        for results in (lexical_results, ranked_dense):
+            for rank, result in enumerate(results):
+                key = (result.get('segment_id'), result.get('chunk_number'), result['text'])
+                score, chunk = fused.get(key, (0.0, result))
+                fused[key] = (score + 1.0 / (Config.RRF_K + rank + 1), chunk)
+        top = sorted(fused.values(), key=lambda item: item[0], reverse=True)[:limit]
+        combined_results = [dict(chunk, score=score) for score, chunk in top]
+        combined_results.sort(key=lambda x: x['timestamp'])
+        return combined_results
+
+    def _record_retrieval(self, result: dict, retrieval: str) -> dict:
+        with self._retrieval_lock:
+            self.retrieval_counts[retrieval] += 1
+        result["retrieval"] = retrieval
+        return result
 
     def add_lecture_chunk_to_db(self, chunk_data: dict) -> dict:
+        result = self.add_lecture_chunks_to_db([chunk_data])
+        if result['status'] == 'success':
+            return {"status": "success", "message": "Chunk added successfully"}
+        return result
+
+    def _stored_hashes(self, point_ids: List[str]) -> Dict[str, str]:
+        points = self.db.retrieve(point_ids, with_payload=["content_hash"])
+        return {str(point.id): (point.payload or {}).get("content_hash") for point in points}
+
+    def add_lecture_chunks_to_db(self, chunks: List[dict]) -> dict:
         try:
-            embedding = self._get_embedding(chunk_data['content'])
-            point_id = str(uuid.uuid4())
-            
-            point = PointStruct(
-                id=point_id,
-                vector=embedding,
-                payload={
+            # Retries, recoveries and replays resend chunks that may already
+            # be stored; only new or changed content is embedded and written
+            by_id = {}
+            for chunk_data in chunks:
+                by_id[point_id(chunk_data['session_key'], chunk_data['segment_id'],
+                               chunk_data['chunk_number'])] = chunk_data
+            hashes = {chunk_id: content_hash(chunk_data['content']) for chunk_id, chunk_data in by_id.items()}
+            stored = self._stored_hashes(list(by_id))
+            fresh = [(chunk_id, chunk_data) for chunk_id, chunk_data in by_id.items()
+                     if stored.get(chunk_id) != hashes[chunk_id]]
+            skipped = len(chunks) - len(fresh)
+            if not fresh:
+                return {
+                    "status": "success",
+                    "message": f"All {len(chunks)} chunks already stored",
+                    "chunks_added": 0,
+                    "chunks_skipped": skipped
+                }
+
+            embeddings = self._get_embeddings([chunk_data['content'] for _, chunk_data in fresh])
+            points = []
+            for (chunk_id, chunk_data), embedding in zip(fresh, embeddings):
+                points.append(PointStruct(
+                    id=chunk_id,
+                    vector=embedding,
+                    payload={
+                        "course_title": chunk_data['course_title'],
+                        "lecture_title": chunk_data['lecture_title'],
+                        "text": chunk_data['content'],
+                        "content_hash": hashes[chunk_id],
+                        "timestamp": chunk_data['timestamp'],
+                        "timestamp_epoch": datetime.fromisoformat(chunk_data['timestamp']).timestamp(),
+                        "chunk_number": chunk_data['chunk_number'],
+                        "segment_id": chunk_data['segment_id']
+                    }
+                ))
+
+            self.db.add_points(points)
+            for session_key in {chunk_data['session_key'] for _, chunk_data in fresh}:
+                self.answer_cache.mark_updated(session_key)
+            transcript_chunks = defaultdict(list)
+            for _, chunk_data in fresh:
+                transcript_chunks[(chunk_data['course_title'], chunk_data['lecture_title'])].append({
+                    "segment_id": chunk_data['segment_id'],
+                    "chunk_number": chunk_data['chunk_number'],
+                    "timestamp": chunk_data['timestamp'],
+                    "text": chunk_data['content']
+                })
+            for (course_title, lecture_title), lecture_chunks in transcript_chunks.items():
+                self.transcripts.add_chunks(course_title, lecture_title, lecture_chunks)
+            recent_by_session = defaultdict(lambda: ([], []))
+            for (_, chunk_data), embedding in zip(fresh, embeddings):
+                recent_chunks, recent_embeddings = recent_by_session[chunk_data['session_key']]
+                recent_chunks.append({
+                    "text": chunk_data['content'],
                     "course_title": chunk_data['course_title'],
                     "lecture_title": chunk_data['lecture_title'],
-                    "text": chunk_data['content'],
                     "timestamp": chunk_data['timestamp'],
                     "chunk_number": chunk_data['chunk_number'],
                     "segment_id": chunk_data['segment_id']
-                }
-            )
-            
-            self.db.add_points([point])
-            self.add_chunk_to_recent({
-                "text": chunk_data['content'],
-                "course_title": chunk_data['course_title'],
-                "lecture_title": chunk_data['lecture_title'],
-                "timestamp": chunk_data['timestamp'],
-                "chunk_number": chunk_data['chunk_number'],
-                "segment_id": chunk_data['segment_id']
-            })
-            
-            return {"status": "success", "message": "Chunk added successfully"}
+                })
+                recent_embeddings.append(embedding)
+            for session_key, (recent_chunks, recent_embeddings) in recent_by_session.items():
+                self.add_chunks_to_recent(session_key, recent_chunks, recent_embeddings)
+
+            return {
+                "status": "success",
+                "message": f"Added {len(points)} chunks successfully",
+                "chunks_added": len(points),
+                "chunks_skipped": skipped
+            }
         except Exception as e:
-            return {"status": "error", "message": f"Failed to add chunk: {str(e)}"}
+            return {"status": "error", "message": f"Failed to add chunks: {str(e)}"}
 
     def add_lecture_to_db(self, course_title: str, lecture_title: str, content: str) -> dict:
         try:
-            chunks = self._chunk_text(content)
+            session_key = f"{course_title}_{lecture_title}_{datetime.now().date()}"
+            # Ids depend on the whole document, so posting the same lecture
+            # twice in a day is a no-op while different documents never collide
+            document_hash = content_hash(content)
+            chunks = [
+                (point_id(session_key, document_hash, position), position, chunk)
+                for position, chunk in self._chunk_text(content)
+            ]
+            stored = self._stored_hashes([chunk_id for chunk_id, _, _ in chunks])
+            chunks = [(chunk_id, position, chunk) for chunk_id, position, chunk in chunks
+                      if stored.get(chunk_id) != content_hash(chunk)]
+            if not chunks:
+                return {"status": "success", "message": "Lecture already stored."}
+
+            embeddings = self._get_embeddings([chunk for _, _, chunk in chunks])
+            started = datetime.now()
             points = []
-            for position, chunk in chunks:
-                embedding = self._get_embedding(chunk)
-                point_id = str(uuid.uuid4())
-                timestamp = datetime.now().isoformat()
+            recent_chunks = []
+            for (chunk_id, position, chunk), embedding in zip(chunks, embeddings):
+                # Distinct timestamps keep the chunks in order for exports
+                timestamp = started + timedelta(microseconds=position)
                 chunk_data = {
                     "course_title": course_title,
                     "lecture_title": lecture_title,
                     "text": chunk,
+                    "content_hash": content_hash(chunk),
                     "position": position,
-                    "timestamp": timestamp
+                    "timestamp": timestamp.isoformat(),
+                    "timestamp_epoch": timestamp.timestamp()
                 }
                 points.append(PointStruct(
-                    id=point_id,
+                    id=chunk_id,
                     vector=embedding,
                     payload=chunk_data
                 ))
-                self.add_chunk_to_recent(chunk_data)
+                recent_chunks.append(chunk_data)
             self.db.add_points(points)
+            self.add_chunks_to_recent(session_key, recent_chunks, embeddings)
+            self.answer_cache.mark_updated(session_key)
+            self.transcripts.add_chunks(course_title, lecture_title, [
+                self._chunk_from_point(point) for point in points
+            ])
             return {"status": "success", "message": "Lecture added successfully."}
         except Exception as e:
             return {"status": "error", "message": f"Failed to add lecture content: {str(e)}"}
 
+    def last_chunk_number(self, course_title: str, lecture_title: str, current_date: datetime.date) -> int:
+        point = self.db.last_point(
+            self._build_session_filter(course_title, lecture_title, current_date),
+            order_key="chunk_number"
+        )
+        return int(point.payload.get("chunk_number", 0)) if point is not None else 0
+
+    def _build_session_filter(self, course_title: str, lecture_title: str,
+                              current_date: datetime.date, segment_id: str = None) -> Filter:
+        day_start = datetime.combine(current_date, datetime.min.time())
+        filter_conditions = [
+            FieldCondition(key="course_title", match=MatchValue(value=course_title)),
+            FieldCondition(key="lecture_title", match=MatchValue(value=lecture_title)),
+            FieldCondition(key="timestamp_epoch", range=Range(
+                gte=day_start.timestamp(),
+                lt=(day_start + timedelta(days=1)).timestamp()
+            ))
+        ]
+        
+        if segment_id:
+            filter_conditions.append(
+                FieldCondition(key="segment_id", match=MatchValue(value=segment_id))
+            )
+        return Filter(must=filter_conditions, must_not=[_not_summary()])
+
     def query(self, question: str, course_title: str, lecture_title: str, 
           segment_id: str = None, prefer_recent: bool = True, limit: int = 3) -> dict:
+        current_date = datetime.now().date()
+        session_key = f"{course_title}_{lecture_title}_{current_date}"
+        self._track_session(session_key, course_title, lecture_title)
+        result, shared = self.query_flights.do(
+            self._flight_key(question, session_key, segment_id, prefer_recent, limit),
+            lambda: self._query(question, course_title, lecture_title, segment_id, prefer_recent, limit)
+        )
+        return self._flight_result(result, shared)
+
+    def _flight_key(self, question: str, session_key: str, segment_id: Optional[str],
+                    prefer_recent: bool, limit: int) -> tuple:
+        return (normalize_question(question), session_key, segment_id, prefer_recent, limit)
+
+    def _flight_result(self, result: dict, shared: bool) -> dict:
+        if not shared:
+            return result
+        # Followers get their own copy; the leader's dict may still be in use
+        return dict(result, coalesced=True)
+
+    def _query(self, question: str, course_title: str, lecture_title: str,
+               segment_id: str = None, prefer_recent: bool = True, limit: int = 3) -> dict:
+        try:
+            query = self._begin_query(question, course_title, lecture_title, segment_id, prefer_recent, limit)
+            if self._route_query(query, self._summary_points(query.summary_ids)):
+                cached = self._cached_answer(query, self._get_embedding(question))
+                if cached is not None:
+                    return cached
+                recent_results = self._recent_results(query)
+                search = self._db_search(query, recent_results)
+                db_results = self.db.search(**search) if search else []
+                self._combine_query_results(query, recent_results, db_results)
+
+            messages, temperature = self._prepare_answer(query)
+            response = self._complete(messages, temperature)
+            return self._record_retrieval(self._shape_answer(query, response), query.retrieval)
+        except Exception as e:
+            return {"status": "error", "message": f"Query failed: {str(e)}"}
+
+    def query_stream(self, question: str, course_title: str, lecture_title: str,
+                     segment_id: str = None, prefer_recent: bool = True,
+                     limit: int = 3) -> Iterator[Tuple[str, dict]]:
+        started = time.perf_counter()
+        timings = {}
         try:
-            current_date = datetime.now().date()
-            session_key = f"{course_title}_{lecture_title}_{current_date}"
-            recent_results = self._search_recent_chunks(
-                course_title, lecture_title, current_date, segment_id, limit
-            ) if prefer_recent else []
+            query = self._begin_query(question, course_title, lecture_title, segment_id, prefer_recent, limit)
+            self._track_session(query.session_key, course_title, lecture_title)
 
-            if len(recent_results) < limit:
+            stage = time.perf_counter()
+            needs_dense = self._route_query(query, self._summary_points(query.summary_ids))
+            timings['lexical_ms'] = _elapsed_ms(stage)
+            if needs_dense:
+                stage = time.perf_counter()
                 query_embedding = self._get_embedding(question)
-                filter_conditions = [
-                    FieldCondition(key="course_title", match=MatchValue(value=course_title)),
-                    FieldCondition(key="lecture_title", match=MatchValue(value=lecture_title))
-                ]
-                
-                if segment_id:
-                    filter_conditions.append(
-                        FieldCondition(key="segment_id", match=MatchValue(value=segment_id))
-                    )
-                
-                db_results = self.db.search(
-                    query_vector=query_embedding,  # Changed from vector to query_vector
-                    filter=Filter(must=filter_conditions),
-                    limit=limit - len(recent_results)
-                )
-                
-                # Filter results by date in memory
-                current_date_str = current_date.isoformat()
-                db_parsed = [
-                    {
-                        "text": hit.payload['text'],
-                        "course_title": hit.payload['course_title'],
-                        "lecture_title": hit.payload['lecture_title'],
-                        "timestamp": hit.payload['timestamp'],
-                        "chunk_number": hit.payload.get('chunk_number'),
-                        "segment_id": hit.payload.get('segment_id')
-                    } 
-                    for hit in db_results
-                    if hit.payload['timestamp'].split('T')[0] == current_date_str
-                ]
-                combined_results = recent_results + db_parsed
-            else:
-                combined_results = recent_results
-
-            if not combined_results:
-                response = self._generate_gpt_response(question)
-                return {
-                    "answer": response,
-                    "sources": [],
-                    "metadata": [],
-                    "from_gpt": True
-                }
+                timings['embedding_ms'] = _elapsed_ms(stage)
+                cached = self._cached_answer(query, query_embedding)
+                if cached is not None:
+                    yield from self._cached_events(cached, started, timings)
+                    return
 
-            combined_results.sort(key=lambda x: x['timestamp'])
-            contexts = [r['text'] for r in combined_results]
-            response = self._generate_gpt_response_with_contexts(question, contexts)
+                stage = time.perf_counter()
+                recent_results = self._recent_results(query)
+                search = self._db_search(query, recent_results)
+                db_results = self.db.search(**search) if search else []
+                self._combine_query_results(query, recent_results, db_results)
+                timings['retrieval_ms'] = _elapsed_ms(stage)
 
-            if response not in self.session_memory[session_key]:
-                self.session_memory[session_key].append(response)
+            messages, temperature = self._prepare_answer(query)
+            yield "sources", self._sources_skeleton(query, started, timings)
 
-            return {
-                "answer": response,
-                "sources": contexts,
-                "metadata": [{
-                    "timestamp": r['timestamp'],
-                    "chunk_number": r.get('chunk_number'),
-                    "segment_id": r.get('segment_id')
-                } for r in combined_results],
-                "from_gpt": False
-            }
+            stage = time.perf_counter()
+            pieces = []
+            for delta in self._stream_chat_completion(messages, temperature):
+                yield self._token_event(delta, pieces, started, stage, timings)
+            yield "done", self._finish_stream(query, pieces, started, stage, timings)
         except Exception as e:
-            return {"status": "error", "message": f"Query failed: {str(e)}"}
+            yield "error", {"status": "error", "message": f"Query failed: {str(e)}"}
 
-    def _generate_gpt_response(self, question: str) -> str:
-        messages = [
-            {"role": "system", "content": "You are a helpful teaching assistant."},
-            {"role": "user", "content": question}
-        ]
-        response = self.openai.chat.completions.create(
+    def _begin_query(self, question: str, course_title: str, lecture_title: str,
+                     segment_id: Optional[str], prefer_recent: bool, limit: int) -> _Query:
+        query = _Query(question, course_title, lecture_title, segment_id, prefer_recent, limit)
+        query.cache_version = self.answer_cache.version(query.session_key)
+        query.summary_ids = self._summary_ids(question, query.session_key, segment_id)
+        return query
+
+    def _route_query(self, query: _Query, summary_points: list) -> bool:
+        # Returns whether the query still needs dense retrieval. Questions
+        # about the lecture itself are answered from its summary alone, and
+        # a strong lexical match skips embedding the question.
+        query.summary_results = self._summary_results(query.summary_ids, summary_points)
+        if query.summary_results and LECTURE_SCOPE_PATTERN.search(query.question):
+            query.retrieval, query.results = "summary", query.summary_results
+            return False
+        query.lexical_results, lexical_strong = self._lexical_search(
+            query.session_key, query.question, query.segment_id, query.limit
+        )
+        if lexical_strong:
+            query.retrieval = "lexical"
+            query.results = sorted(query.lexical_results, key=lambda x: x['timestamp'])
+            return False
+        return True
+
+    def _cached_answer(self, query: _Query, query_embedding: List[float]) -> Optional[dict]:
+        query.query_embedding = query_embedding
+        cached, query.cache_info = self._lookup_cached_answer(query.session_key, query.cache_scope,
+                                                              query_embedding)
+        if cached is None:
+            return None
+        return self._record_retrieval(cached, "cache")
+
+    def _recent_results(self, query: _Query) -> List[Dict]:
+        if not query.prefer_recent:
+            return []
+        return self._search_recent_chunks(query.session_key, query.query_embedding,
+                                          query.segment_id, query.limit)
+
+    def _db_search(self, query: _Query, recent_results: List[Dict]) -> Optional[dict]:
+        # Arguments for the collection search, or None when the recent
+        # chunks already fill the limit
+        if len(recent_results) >= query.limit:
+            return None
+        return {
+            "query_vector": query.query_embedding,
+            "filter": self._build_session_filter(query.course_title, query.lecture_title,
+                                                 query.current_date, query.segment_id),
+            "limit": query.limit
+        }
+
+    def _combine_query_results(self, query: _Query, recent_results: List[Dict], db_results: list):
+        query.retrieval, query.results = self._combine_results(
+            query.lexical_results, recent_results, db_results, query.limit
+        )
+
+    def _prepare_answer(self, query: _Query) -> Tuple[List[Dict], float]:
+        if query.retrieval != "summary":
+            query.results = self._with_summary(query.results, query.summary_results)
+        if query.results:
+            # Deduplication and the token budget can leave nothing to use
+            query.results, query.context_info = self._assemble_context(query.question, query.results)
+        if not query.results:
+            return self._general_messages(query.question), GENERAL_TEMPERATURE
+        return self._context_messages(query.question, [r['text'] for r in query.results]), CONTEXT_TEMPERATURE
+
+    def _shape_answer(self, query: _Query, response: str, remember: bool = True) -> dict:
+        if not query.results:
+            return self._general_answer(response, query.cache_info)
+        return self._context_answer(query.session_key, query.cache_scope, query.cache_version,
+                                    query.query_embedding, response, query.results,
+                                    query.cache_info, query.context_info, remember=remember)
+
+    def _cached_events(self, cached: dict, started: float, timings: dict) -> List[Tuple[str, dict]]:
+        timings['sources_ms'] = _elapsed_ms(started)
+        events = [("sources", self._sources_event(cached))]
+        timings['ttfb_ms'] = _elapsed_ms(started)
+        events.append(("token", {"content": cached['answer']}))
+        events.append(("done", self._done_event(started, timings, cached['cache'], "cache")))
+        return events
+
+    def _sources_skeleton(self, query: _Query, started: float, timings: dict) -> dict:
+        # Sources go out before the answer; the answer is remembered and
+        # cached once the stream completes
+        skeleton = self._record_retrieval(self._shape_answer(query, "", remember=False), query.retrieval)
+        timings['sources_ms'] = _elapsed_ms(started)
+        return self._sources_event(skeleton)
+
+    def _token_event(self, delta: str, pieces: List[str], started: float, stage: float,
+                     timings: dict) -> Tuple[str, dict]:
+        if not pieces:
+            timings['llm_first_token_ms'] = _elapsed_ms(stage)
+            timings['ttfb_ms'] = _elapsed_ms(started)
+        pieces.append(delta)
+        return "token", {"content": delta}
+
+    def _finish_stream(self, query: _Query, pieces: List[str], started: float, stage: float,
+                       timings: dict) -> dict:
+        timings['llm_ms'] = _elapsed_ms(stage)
+        metrics.observe("llm_completion", timings['llm_ms'] / 1000)
+        self._shape_answer(query, "".join(pieces))
+        return self._done_event(started, timings, query.cache_info, query.retrieval)
+
+    def _stream_chat_completion(self, messages: List[Dict], temperature: float) -> Iterator[str]:
+        stream = self.openai.chat.completions.create(
             model=Config.LLM_MODEL,
             messages=messages,
-            temperature=0.7
+            temperature=temperature,
+            stream=True
         )
-        return response.choices[0].message.content
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
 
-    def _generate_gpt_response_with_contexts(self, question: str, contexts: List[str]) -> str:
-        system_message = """You are an AI assistant specifically trained to answer questions based ONLY on the provided lecture content. 
-        Your knowledge is limited to the information given in the context. Follow these rules strictly:
-        1. Only use information explicitly stated in the provided context.
-        2. If the context doesn't contain relevant information to answer the question, say "I don't have enough information to answer that question based on the provided lecture content."
-        3. Do not use any external knowledge or make assumptions beyond what's in the context.
-        4. If asked about topics not covered in the context, state that the lecture content doesn't cover that topic.
-        5. Be precise and concise in your answers, citing specific parts of the context when possible.
-        6. If the question is ambiguous or unclear based on the context, ask for clarification.
-        7. Never claim to know more than what's provided in the context.
-        8. If the context contains conflicting information, point out the inconsistency without resolving it.
-        Remember, your role is to interpret and relay the information from the lecture content, not to provide additional knowledge or opinions."""
+    def _sources_event(self, result: dict) -> dict:
+        return {
+            "sources": result['sources'],
+            "metadata": result['metadata'],
+            "from_gpt": result['from_gpt'],
+            "cache": result['cache'],
+            "retrieval": result.get('retrieval'),
+            "context": result.get('context')
+        }
 
-        context_message = "Context from lecture content:\n" + "\n".join(contexts)
+    def _done_event(self, started: float, timings: dict, cache_info: dict, retrieval: str) -> dict:
+        timings['total_ms'] = _elapsed_ms(started)
+        metrics.observe("query_stream", timings['total_ms'] / 1000)
+        self.stream_latencies.append((timings.get('ttfb_ms', timings['total_ms']), timings['total_ms']))
+        return {"timings": timings, "cache": cache_info, "retrieval": retrieval}
+
+    def _retrieval_stats(self) -> dict:
+        with self._retrieval_lock:
+            counts = dict(self.retrieval_counts)
+        return {
+            "paths": counts,
+            "embedding_calls_avoided": counts["lexical"] + counts["summary"],
+            "coalescing": self.query_flights.stats()
+        }
+
+    def get_query_stats(self) -> dict:
+        samples = list(self.stream_latencies)
+        if not samples:
+            return {"status": "success", "streamed_queries": 0, "retrieval": self._retrieval_stats()}
+        ttfb = np.array([sample[0] for sample in samples])
+        total = np.array([sample[1] for sample in samples])
+        return {
+            "status": "success",
+            "retrieval": self._retrieval_stats(),
+            "streamed_queries": len(samples),
+            "ttfb_p50_ms": float(np.percentile(ttfb, 50)),
+            "ttfb_p95_ms": float(np.percentile(ttfb, 95)),
+            "ttfb_p99_ms": float(np.percentile(ttfb, 99)),
+            "total_p50_ms": float(np.percentile(total, 50)),
+            "total_p95_ms": float(np.percentile(total, 95))
+        }
+
+    def _lookup_cached_answer(self, session_key: str, cache_scope: tuple,
+                              query_embedding: List[float]) -> Tuple[Optional[dict], dict]:
+        if not self.answer_cache.enabled:
+            return None, _cache_skipped()
+        cached, cache_info = self.answer_cache.lookup(session_key, cache_scope, query_embedding)
+        if cached is not None:
+            cached["cache"] = cache_info
+        return cached, cache_info
+
+    def _merge_results(self, recent_results: List[Dict], db_results: list, limit: int) -> List[Dict]:
+        db_parsed = [
+            {
+                "text": hit.payload['text'],
+                "course_title": hit.payload['course_title'],
+                "lecture_title": hit.payload['lecture_title'],
+                "timestamp": hit.payload['timestamp'],
+                "chunk_number": hit.payload.get('chunk_number'),
+                "segment_id": hit.payload.get('segment_id'),
+                "score": hit.score
+            } 
+            for hit in db_results
+        ]
+        seen = {(r.get('segment_id'), r.get('chunk_number'), r['text']) for r in recent_results}
+        db_parsed = [
+            r for r in db_parsed
+            if (r.get('segment_id'), r.get('chunk_number'), r['text']) not in seen
+        ]
+        combined_results = recent_results + db_parsed[:max(0, limit - len(recent_results))]
+        combined_results.sort(key=lambda x: x['timestamp'])
+        return combined_results
+
+    def _general_answer(self, response: str, cache_info: dict) -> dict:
+        return {
+            "answer": response,
+            "sources": [],
+            "metadata": [],
+            "from_gpt": True,
+            "cache": cache_info
+        }
+
+    def _context_answer(self, session_key: str, cache_scope: tuple, cache_version: int,
+                        query_embedding: List[float], response: str,
+                        combined_results: List[Dict], cache_info: dict,
+                        context_info: Optional[dict] = None, remember: bool = True) -> dict:
+        if remember:
+            self.session_store.remember(session_key, response)
+
+        result = {
+            "answer": response,
+            "sources": [r['text'] for r in combined_results],
+            "metadata": [{
+                "timestamp": r['timestamp'],
+                "chunk_number": r.get('chunk_number'),
+                "segment_id": r.get('segment_id'),
+                "score": r.get('score')
+            } for r in combined_results],
+            "from_gpt": False
+        }
+        if context_info is not None:
+            result["context"] = context_info
+        if remember and self.answer_cache.enabled and query_embedding is not None:
+            self.answer_cache.store(session_key, cache_scope, query_embedding, result, cache_version)
+        result["cache"] = cache_info
+        return result
 
-        messages = [
-            {"role": "system", "content": system_message},
+    def _general_messages(self, question: str) -> List[Dict]:
+        return [
+            {"role": "system", "content": "You are a helpful teaching assistant."},
+            {"role": "user", "content": question}
+        ]
+
+    def _assemble_context(self, question: str, combined_results: List[Dict]) -> Tuple[List[Dict], dict]:
+        return self.context_assembler.assemble(
+            combined_results, lambda contexts: self._context_messages(question, contexts)
+        )
+
+    def _context_messages(self, question: str, contexts: List[str]) -> List[Dict]:
+        context_message = "Context from lecture content:\n" + "\n".join(contexts)
+        return [
+            {"role": "system", "content": CONTEXT_SYSTEM_MESSAGE},
             {"role": "user", "content": context_message},
             {"role": "user",
              "content": f"Question: {question}\nAnswer only based on the above context, following the rules provided."}
         ]
 
-        response = self.openai.chat.completions.create(
-            model=Config.LLM_MODEL,
-            messages=messages,
-            temperature=0.3  # Lower temperature for more deterministic outputs
-        )
+    def _complete(self, messages: List[Dict], temperature: float) -> str:
+        with metrics.span("llm_completion"):
+            response = self.openai.chat.completions.create(
+                model=Config.LLM_MODEL,
+                messages=messages,
+                temperature=temperature
+            )
         return response.choices[0].message.content
 
-    def _chunk_text(self, text: str, chunk_size: int = 500) -> List[tuple]:
-        words = text.split()
-        chunks = []
-        current_chunks = []
-        current_size = 0
-        position = 0
-
-        for word in words:
-            current_chunks.append(word)
-            current_size += len(word) + 1
+    def _chunk_text(self, text: str, chunk_size: int = Config.CHUNK_SIZE) -> List[tuple]:
+        # Same chunker LectureTracker uses for live fragments
+        return list(enumerate(chunk_text(
+            text,
+            chunk_size=chunk_size,
+            overlap=Config.CHUNK_OVERLAP,
+            snap_to_sentence=Config.CHUNK_SNAP_TO_SENTENCE,
+            max_chunk_size=Config.BUFFER_SIZE
+        )))
+    
+    def _lecture_filter(self, course_title: str, lecture_title: str) -> Filter:
+        return Filter(
+            must=[
+                FieldCondition(key="course_title", match=MatchValue(value=course_title)),
+                FieldCondition(key="lecture_title", match=MatchValue(value=lecture_title))
+            ],
+            must_not=[_not_summary()]
+        )
 
-            if current_size >= chunk_size:
-                chunks.append((position, " ".join(current_chunks)))
-                current_chunks = []
-                current_size = 0
-                position += 1
+    def _chunk_from_point(self, point) -> Dict:
+        return {
+            "segment_id": point.payload.get('segment_id', 'default'),
+            "chunk_number": point.payload.get('chunk_number'),
+            "timestamp": point.payload['timestamp'],
+            "text": point.payload['text']
+        }
 
-        if current_chunks:
-            chunks.append((position, " ".join(current_chunks)))
+    def _iter_lecture_chunks(self, course_title: str, lecture_title: str) -> Iterator[Dict]:
+        points = self.db.scroll_ordered(
+            filter=self._lecture_filter(course_title, lecture_title),
+            order_key="timestamp_epoch",
+            batch_size=Config.LECTURE_EXPORT_BATCH_SIZE
+        )
+        for point in points:
+            yield self._chunk_from_point(point)
 
-        return chunks
-    
-    def get_complete_lecture(self, course_title: str, lecture_title: str) -> dict:
+    def get_lecture_summary(self, course_title: str, lecture_title: str, segment_id: str = None) -> dict:
         try:
-            # Get all content for this lecture - Remove collection_name parameter
-            results = self.db.search_by_metadata(
-                filter=Filter(
-                    must=[
-                        FieldCondition(key="course_title", match=MatchValue(value=course_title)),
-                        FieldCondition(key="lecture_title", match=MatchValue(value=lecture_title))
-                    ]
-                ),
-                limit=100  # Adjust based on your needs
-            )
-            
-            if not results:
-                return {
-                    "status": "error",
-                    "message": "No content found for this lecture"
-                }
+            session_key = f"{course_title}_{lecture_title}_{datetime.now().date()}"
+            points = self.db.retrieve([summary_point_id(session_key, segment_id)])
+            if not points:
+                return {"status": "error", "message": "No summary found for this lecture"}
+            payload = points[0].payload
+            return {
+                "status": "success",
+                "level": payload['summary_level'],
+                "segment_id": payload.get('segment_id'),
+                "summary": payload['text'],
+                "summarized_through": payload['summarized_through'],
+                "summarized_chunks": payload['summarized_chunks'],
+                "updated_at": payload['timestamp']
+            }
+        except Exception as e:
+            return {"status": "error", "message": f"Failed to retrieve lecture summary: {str(e)}"}
 
-            # Sort by timestamp and chunk number
-            sorted_results = sorted(
-                results,
-                key=lambda x: (
-                    datetime.fromisoformat(x.payload['timestamp']),
-                    x.payload.get('chunk_number', 0)
+    def get_complete_lecture(self, course_title: str, lecture_title: str,
+                             since_chunk: Optional[Tuple[str, int]] = None,
+                             if_none_match: Optional[str] = None) -> dict:
+        try:
+            if not self.transcripts.enabled:
+                return self._assemble_lecture(
+                    course_title, lecture_title, self._iter_lecture_chunks(course_title, lecture_title)
                 )
-            )
-
-            # Organize content by segments
-            segments = {}
-            for result in sorted_results:
-                segment_id = result.payload.get('segment_id', 'default')
-                if segment_id not in segments:
-                    segments[segment_id] = {
-                        'content': [],
-                        'timestamp': result.payload['timestamp'],
-                        'chunk_count': 0
-                    }
-                segments[segment_id]['content'].append(result.payload['text'])
-                segments[segment_id]['chunk_count'] += 1
+            transcript = self.transcripts.get(course_title, lecture_title)
+            if transcript is None:
+                transcript = self.transcripts.start_loading(course_title, lecture_title)
+                try:
+                    chunks = list(self._iter_lecture_chunks(course_title, lecture_title))
+                except Exception:
+                    self.transcripts.discard(course_title, lecture_title)
+                    raise
+                self.transcripts.finish_loading(transcript, chunks)
+            return self._transcript_response(course_title, lecture_title, transcript, since_chunk, if_none_match)
+        except Exception as e:
+            return {"status": "error", "message": f"Failed to retrieve lecture content: {str(e)}"}
 
-            # Create a formatted version of the complete lecture
-            formatted_content = []
-            for segment_id, data in segments.items():
-                formatted_content.append(f"\n--- Segment {segment_id} ---")
-                formatted_content.extend(data['content'])
+    def _transcript_response(self, course_title: str, lecture_title: str, transcript: MaterializedTranscript,
+                             since_chunk: Optional[Tuple[str, int]], if_none_match: Optional[str]) -> dict:
+        # Polls carry the ETag they last saw and get "not_modified" (304)
+        # until new chunks are committed. since_chunk is the cursor of a
+        # previous response and returns only chunks added after it; a cursor
+        # from an earlier generation (the transcript was evicted and rebuilt
+        # since) gets the full transcript with resync set, and the client
+        # replaces what it has.
+        etag = transcript.etag(transcript.version)
+        if etag_matches(if_none_match, etag):
+            self.transcripts.record_not_modified()
+            return {"status": "not_modified", "etag": etag}
 
+        if since_chunk is not None and since_chunk[0] == transcript.generation:
+            version, chunks = transcript.since(since_chunk[1])
+            if not version:
+                return {"status": "error", "message": "No content found for this lecture"}
             return {
                 "status": "success",
                 "lecture_info": {
                     "course_title": course_title,
-                    "lecture_title": lecture_title,
-                    "total_segments": len(segments),
-                    "total_chunks": sum(s['chunk_count'] for s in segments.values())
+                    "lecture_title": lecture_title
                 },
-                "complete_content": "\n".join(formatted_content),
-                "segments": segments
+                "version": version,
+                "etag": transcript.etag(version),
+                "since_chunk": transcript.cursor(since_chunk[1]),
+                "cursor": transcript.cursor(version),
+                "chunks": chunks
+            }
+
+        version, response = transcript.response(
+            lambda chunks: self._assemble_lecture(course_title, lecture_title, chunks)
+        )
+        if response['status'] != 'success':
+            return response
+        response = dict(response, version=version, cursor=transcript.cursor(version), etag=transcript.etag(version))
+        if since_chunk is not None:
+            response["resync"] = True
+        return response
+
+    def _assemble_lecture(self, course_title: str, lecture_title: str, chunks: Iterable[Dict]) -> dict:
+        # Organize content by segments, already in chunk order
+        segments = {}
+        for chunk in chunks:
+            segment_id = chunk['segment_id']
+            if segment_id not in segments:
+                segments[segment_id] = {
+                    'content': [],
+                    'timestamp': chunk['timestamp'],
+                    'chunk_count': 0
+                }
+            segments[segment_id]['content'].append(chunk['text'])
+            segments[segment_id]['chunk_count'] += 1
+
+        if not segments:
+            return {
+                "status": "error",
+                "message": "No content found for this lecture"
             }
+
+        # Create a formatted version of the complete lecture
+        formatted_content = []
+        for segment_id, data in segments.items():
+            formatted_content.append(f"\n--- Segment {segment_id} ---")
+            formatted_content.extend(data['content'])
+
+        return {
+            "status": "success",
+            "lecture_info": {
+                "course_title": course_title,
+                "lecture_title": lecture_title,
+                "total_segments": len(segments),
+                "total_chunks": sum(s['chunk_count'] for s in segments.values())
+            },
+            "complete_content": "\n".join(formatted_content),
+            "segments": segments
+        }
+
+    def stream_complete_lecture(self, course_title: str, lecture_title: str,
+                                stream_format: str = "ndjson") -> Optional[Iterator[str]]:
+        chunks = self._iter_lecture_chunks(course_title, lecture_title)
+        first = next(chunks, None)
+        if first is None:
+            return None
+
+        encoder = LectureStreamEncoder(stream_format, {
+            "course_title": course_title,
+            "lecture_title": lecture_title
+        })
+        return self._encode_lecture_stream(encoder, itertools.chain([first], chunks))
+
+    def _encode_lecture_stream(self, encoder: LectureStreamEncoder, chunks: Iterator[Dict]) -> Iterator[str]:
+        yield encoder.header()
+        try:
+            for chunk in chunks:
+                yield encoder.encode(chunk)
         except Exception as e:
-            return {"status": "error", "message": f"Failed to retrieve lecture content: {str(e)}"}
+            yield encoder.footer(error=f"Failed to retrieve lecture content: {str(e)}")
+            return
+        yield encoder.footer()
 
 # Add to QdrantDB class:
 def search_by_metadata(self, filter: Filter, limit: int = 100):
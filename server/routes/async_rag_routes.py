@@ -0,0 +1,291 @@
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+from handlers.rag_handler import (
+    add_lecture_handler,
+    parse_bulk_lecture_items,
+    add_lectures_bulk_handler,
+    parse_finalize_timeout,
+    finalize_lecture_handler,
+    get_lecture_status_handler,
+    get_lecture_summary_handler,
+    get_session_stats_handler,
+    get_ingest_stats_handler,
+    get_cache_stats_handler,
+    get_metrics_handler,
+    get_query_stats_handler,
+    cleanup_session_handler,
+    recover_session_handler
+)
+from handlers.async_rag_handler import (
+    query_handler_function,
+    query_stream_handler,
+    get_complete_lecture_handler,
+    stream_complete_lecture_handler
+)
+from rag.lecture_stream import STREAM_FORMATS, STREAM_MIMETYPES
+from utils.sse import SSE_HEADERS, format_sse
+from utils.transcript_store import parse_cursor
+from utils.metrics import CONTENT_TYPE
+
+# Same API as routes/rag_routes.py. Only the query and lecture-export paths
+# make network calls on the event loop; the rest reuse the in-memory
+# handlers. Handlers that can block (ingest-log writes, resuming chunk
+# numbering from Qdrant, waiting in finalize_lecture) run in a thread.
+
+def _server_error(e: Exception) -> JSONResponse:
+    return JSONResponse({
+        "status": "error",
+        "message": f"Server error: {str(e)}"
+    }, status_code=500)
+
+def _missing_field(e: KeyError) -> JSONResponse:
+    return JSONResponse({
+        "status": "error",
+        "message": f"Missing required field: {str(e)}"
+    }, status_code=400)
+
+async def add_lecture(request):
+    try:
+        data = await request.json()
+        response = await run_in_threadpool(
+            add_lecture_handler,
+            data['course_title'],
+            data['lecture_title'],
+            data['content']
+        )
+        status_code = 200 if response['status'] == 'success' else 500
+        return JSONResponse(response, status_code=status_code)
+    except KeyError as e:
+        return _missing_field(e)
+    except Exception as e:
+        return _server_error(e)
+
+async def add_lectures_bulk(request):
+    try:
+        mimetype = request.headers.get('content-type', '').split(';')[0].strip()
+        items = parse_bulk_lecture_items(await request.body(), mimetype)
+    except ValueError as e:
+        return JSONResponse({
+            "status": "error",
+            "message": f"Invalid request body: {str(e)}"
+        }, status_code=400)
+    try:
+        response = await run_in_threadpool(add_lectures_bulk_handler, items)
+        status_code = {"success": 200, "partial": 207}.get(response['status'], 400)
+        return JSONResponse(response, status_code=status_code)
+    except Exception as e:
+        return _server_error(e)
+
+async def query(request):
+    try:
+        data = await request.json()
+        response = await query_handler_function(
+            data['question'],
+            data['course_title'],
+            data['lecture_title'],
+            segment_id=data.get('segment_id'),
+            prefer_recent=data.get('prefer_recent', True),
+            limit=data.get('limit', 3)
+        )
+        status_code = 200 if 'answer' in response else 500
+        return JSONResponse(response, status_code=status_code)
+    except KeyError as e:
+        return _missing_field(e)
+    except Exception as e:
+        return _server_error(e)
+
+async def query_stream(request):
+    try:
+        data = await request.json()
+        events = query_stream_handler(
+            data['question'],
+            data['course_title'],
+            data['lecture_title'],
+            segment_id=data.get('segment_id'),
+            prefer_recent=data.get('prefer_recent', True),
+            limit=data.get('limit', 3)
+        )
+
+        async def body():
+            async for event, payload in events:
+                yield format_sse(event, payload)
+
+        return StreamingResponse(body(), media_type='text/event-stream', headers=SSE_HEADERS)
+    except KeyError as e:
+        return _missing_field(e)
+    except Exception as e:
+        return _server_error(e)
+
+async def get_query_stats(request):
+    try:
+        return JSONResponse(get_query_stats_handler(), status_code=200)
+    except Exception as e:
+        return _server_error(e)
+
+async def finalize_lecture(request):
+    try:
+        data = await request.json()
+        try:
+            timeout = parse_finalize_timeout(data.get('timeout'))
+        except ValueError as e:
+            return JSONResponse({
+                "status": "error",
+                "message": str(e)
+            }, status_code=400)
+        response = await run_in_threadpool(
+            finalize_lecture_handler,
+            data['course_title'],
+            data['lecture_title'],
+            timeout=timeout
+        )
+        status_code = {"success": 200, "timeout": 202}.get(response['status'], 500)
+        return JSONResponse(response, status_code=status_code)
+    except KeyError as e:
+        return _missing_field(e)
+    except Exception as e:
+        return _server_error(e)
+
+async def get_lecture_status(request):
+    try:
+        course_title = request.query_params.get('course_title')
+        lecture_title = request.query_params.get('lecture_title')
+
+        if not course_title or not lecture_title:
+            return JSONResponse({
+                "status": "error",
+                "message": "Missing course_title or lecture_title parameter"
+            }, status_code=400)
+
+        response = get_lecture_status_handler(course_title, lecture_title)
+        status_code = 200 if response['status'] != 'error' else 404
+        return JSONResponse(response, status_code=status_code)
+    except Exception as e:
+        return _server_error(e)
+
+async def get_lecture_summary(request):
+    try:
+        course_title = request.query_params.get('course_title')
+        lecture_title = request.query_params.get('lecture_title')
+
+        if not course_title or not lecture_title:
+            return JSONResponse({
+                "status": "error",
+                "message": "Missing course_title or lecture_title parameter"
+            }, status_code=400)
+
+        response = await run_in_threadpool(
+            get_lecture_summary_handler, course_title, lecture_title, request.query_params.get('segment_id')
+        )
+        status_code = 200 if response['status'] != 'error' else 404
+        return JSONResponse(response, status_code=status_code)
+    except Exception as e:
+        return _server_error(e)
+
+async def get_session_stats(request):
+    try:
+        response = get_session_stats_handler(request.path_params['session_key'])
+        status_code = 200 if response['status'] != 'error' else 404
+        return JSONResponse(response, status_code=status_code)
+    except Exception as e:
+        return _server_error(e)
+
+async def get_ingest_stats(request):
+    try:
+        return JSONResponse(get_ingest_stats_handler(), status_code=200)
+    except Exception as e:
+        return _server_error(e)
+
+async def get_cache_stats(request):
+    try:
+        return JSONResponse(get_cache_stats_handler(), status_code=200)
+    except Exception as e:
+        return _server_error(e)
+
+async def get_metrics(request):
+    try:
+        return Response(get_metrics_handler(), media_type=CONTENT_TYPE)
+    except Exception as e:
+        return _server_error(e)
+
+async def cleanup_session(request):
+    try:
+        response = cleanup_session_handler(request.path_params['session_key'])
+        status_code = 200 if response['status'] == 'success' else 500
+        return JSONResponse(response, status_code=status_code)
+    except Exception as e:
+        return _server_error(e)
+
+async def recover_session(request):
+    try:
+        response = recover_session_handler(request.path_params['session_key'])
+        status_code = 200 if response['status'] == 'success' else 500
+        return JSONResponse(response, status_code=status_code)
+    except Exception as e:
+        return _server_error(e)
+
+async def get_complete_lecture(request):
+    try:
+        course_title = request.query_params.get('course_title')
+        lecture_title = request.query_params.get('lecture_title')
+
+        if not course_title or not lecture_title:
+            return JSONResponse({
+                "status": "error",
+                "message": "Missing course_title or lecture_title parameter"
+            }, status_code=400)
+
+        stream_format = request.query_params.get('stream')
+        if stream_format:
+            if stream_format not in STREAM_FORMATS:
+                return JSONResponse({
+                    "status": "error",
+                    "message": "stream must be one of: " + ", ".join(STREAM_FORMATS)
+                }, status_code=400)
+            stream = await stream_complete_lecture_handler(course_title, lecture_title, stream_format)
+            if stream is None:
+                return JSONResponse({
+                    "status": "error",
+                    "message": "No content found for this lecture"
+                }, status_code=404)
+            return StreamingResponse(stream, media_type=STREAM_MIMETYPES[stream_format])
+
+        since_chunk = request.query_params.get('since_chunk')
+        if since_chunk is not None:
+            try:
+                since_chunk = parse_cursor(since_chunk)
+            except ValueError:
+                return JSONResponse({
+                    "status": "error",
+                    "message": "since_chunk must be the cursor of a previous response"
+                }, status_code=400)
+
+        response = await get_complete_lecture_handler(
+            course_title, lecture_title, since_chunk, request.headers.get('if-none-match')
+        )
+        if response['status'] == 'not_modified':
+            return Response(status_code=304, headers={"ETag": response['etag'], "Cache-Control": "no-cache"})
+        etag = response.pop('etag', None)
+        status_code = 200 if response['status'] == 'success' else 404
+        headers = {"ETag": etag, "Cache-Control": "no-cache"} if etag else None
+        return JSONResponse(response, status_code=status_code, headers=headers)
+    except Exception as e:
+        return _server_error(e)
+
+async_rag_routes = [
+    Route('/add_lecture', add_lecture, methods=['POST']),
+    Route('/add_lecture/bulk', add_lectures_bulk, methods=['POST']),
+    Route('/query', query, methods=['POST']),
+    Route('/query/stream', query_stream, methods=['POST']),
+    Route('/query_stats', get_query_stats, methods=['GET']),
+    Route('/finalize_lecture', finalize_lecture, methods=['POST']),
+    Route('/lecture_status', get_lecture_status, methods=['GET']),
+    Route('/lecture_summary', get_lecture_summary, methods=['GET']),
+    Route('/session_stats/{session_key}', get_session_stats, methods=['GET']),
+    Route('/ingest_stats', get_ingest_stats, methods=['GET']),
+    Route('/cache_stats', get_cache_stats, methods=['GET']),
+    Route('/metrics', get_metrics, methods=['GET']),
+    Route('/cleanup_session/{session_key}', cleanup_session, methods=['DELETE']),
+    Route('/recover_session/{session_key}', recover_session, methods=['POST']),
+    Route('/complete_lecture', get_complete_lecture, methods=['GET'])
+]
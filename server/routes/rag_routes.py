@@ -1,17 +1,54 @@
-from flask import Blueprint, request, jsonify
+import time
+from flask import Blueprint, Response, g, request, jsonify, stream_with_context
 from handlers.rag_handler import (
     add_lecture_handler, 
+    parse_bulk_lecture_items,
+    add_lectures_bulk_handler,
     query_handler_function,
+    query_stream_handler,
+    get_query_stats_handler,
+    parse_finalize_timeout,
     finalize_lecture_handler,
     get_lecture_status_handler,
+    get_lecture_summary_handler,
     get_session_stats_handler,
+    get_ingest_stats_handler,
+    get_cache_stats_handler,
+    get_metrics_handler,
     cleanup_session_handler,
     recover_session_handler,
-    get_complete_lecture_handler
+    get_complete_lecture_handler,
+    stream_complete_lecture_handler
 )
+from rag.lecture_stream import STREAM_FORMATS, STREAM_MIMETYPES
+from utils.sse import SSE_HEADERS, format_sse
+from utils.transcript_store import parse_cursor
+from utils.metrics import (CONTENT_TYPE, add_timings, finish_request_timings, metrics,
+                           start_request_timings, timings_requested)
+from config.config import Config
 
 rag_routes = Blueprint('rag_routes', __name__)
 
+@rag_routes.before_request
+def start_request_metrics():
+    g.request_started = time.perf_counter()
+    start_request_timings(timings_requested(request.args.get('timings'), Config.RESPONSE_TIMINGS))
+
+@rag_routes.after_request
+def record_request_metrics(response):
+    # Streamed responses are timed up to their first byte; the streams
+    # record their full duration as the query_stream stage
+    seconds = time.perf_counter() - g.request_started
+    # Labelled by view name, which matches the ASGI route endpoints
+    endpoint = request.endpoint.rsplit('.', 1)[-1] if request.endpoint else 'unmatched'
+    metrics.observe_request(endpoint, request.method, response.status_code, seconds)
+    timings = finish_request_timings()
+    if timings is not None and response.is_json and not response.is_streamed:
+        body = add_timings(response.get_data(), timings, seconds)
+        if body is not None:
+            response.set_data(body)
+    return response
+
 @rag_routes.route('/add_lecture', methods=['POST'])
 def add_lecture():
     try:
@@ -34,6 +71,25 @@ def add_lecture():
             "message": f"Server error: {str(e)}"
         }), 500
 
+@rag_routes.route('/add_lecture/bulk', methods=['POST'])
+def add_lectures_bulk():
+    try:
+        items = parse_bulk_lecture_items(request.get_data(), request.mimetype)
+    except ValueError as e:
+        return jsonify({
+            "status": "error",
+            "message": f"Invalid request body: {str(e)}"
+        }), 400
+    try:
+        response = add_lectures_bulk_handler(items)
+        status_code = {"success": 200, "partial": 207}.get(response['status'], 400)
+        return jsonify(response), status_code
+    except Exception as e:
+        return jsonify({
+            "status": "error",
+            "message": f"Server error: {str(e)}"
+        }), 500
+
 @rag_routes.route('/query', methods=['POST'])
 def query():
     try:
@@ -59,15 +115,59 @@ def query():
             "message": f"Server error: {str(e)}"
         }), 500
 
+@rag_routes.route('/query/stream', methods=['POST'])
+def query_stream():
+    try:
+        data = request.get_json()
+        events = query_stream_handler(
+            data['question'],
+            data['course_title'],
+            data['lecture_title'],
+            segment_id=data.get('segment_id'),
+            prefer_recent=data.get('prefer_recent', True),
+            limit=data.get('limit', 3)
+        )
+        body = (format_sse(event, payload) for event, payload in events)
+        return Response(stream_with_context(body), mimetype='text/event-stream', headers=SSE_HEADERS)
+    except KeyError as e:
+        return jsonify({
+            "status": "error",
+            "message": f"Missing required field: {str(e)}"
+        }), 400
+    except Exception as e:
+        return jsonify({
+            "status": "error",
+            "message": f"Server error: {str(e)}"
+        }), 500
+
+@rag_routes.route('/query_stats', methods=['GET'])
+def get_query_stats():
+    try:
+        response = get_query_stats_handler()
+        return jsonify(response), 200
+    except Exception as e:
+        return jsonify({
+            "status": "error",
+            "message": f"Server error: {str(e)}"
+        }), 500
+
 @rag_routes.route('/finalize_lecture', methods=['POST'])
 def finalize_lecture():
     try:
         data = request.get_json()
+        try:
+            timeout = parse_finalize_timeout(data.get('timeout'))
+        except ValueError as e:
+            return jsonify({
+                "status": "error",
+                "message": str(e)
+            }), 400
         response = finalize_lecture_handler(
             data['course_title'],
-            data['lecture_title']
+            data['lecture_title'],
+            timeout=timeout
         )
-        status_code = 200 if response['status'] == 'success' else 500
+        status_code = {"success": 200, "timeout": 202}.get(response['status'], 500)
         return jsonify(response), status_code
     except KeyError as e:
         return jsonify({
@@ -101,6 +201,27 @@ def get_lecture_status():
             "message": f"Server error: {str(e)}"
         }), 500
 
+@rag_routes.route('/lecture_summary', methods=['GET'])
+def get_lecture_summary():
+    try:
+        course_title = request.args.get('course_title')
+        lecture_title = request.args.get('lecture_title')
+        
+        if not course_title or not lecture_title:
+            return jsonify({
+                "status": "error",
+                "message": "Missing course_title or lecture_title parameter"
+            }), 400
+            
+        response = get_lecture_summary_handler(course_title, lecture_title, request.args.get('segment_id'))
+        status_code = 200 if response['status'] != 'error' else 404
+        return jsonify(response), status_code
+    except Exception as e:
+        return jsonify({
+            "status": "error",
+            "message": f"Server error: {str(e)}"
+        }), 500
+
 @rag_routes.route('/session_stats/<session_key>', methods=['GET'])
 def get_session_stats(session_key):
     try:
@@ -113,6 +234,38 @@ def get_session_stats(session_key):
             "message": f"Server error: {str(e)}"
         }), 500
 
+@rag_routes.route('/ingest_stats', methods=['GET'])
+def get_ingest_stats():
+    try:
+        response = get_ingest_stats_handler()
+        return jsonify(response), 200
+    except Exception as e:
+        return jsonify({
+            "status": "error",
+            "message": f"Server error: {str(e)}"
+        }), 500
+
+@rag_routes.route('/cache_stats', methods=['GET'])
+def get_cache_stats():
+    try:
+        response = get_cache_stats_handler()
+        return jsonify(response), 200
+    except Exception as e:
+        return jsonify({
+            "status": "error",
+            "message": f"Server error: {str(e)}"
+        }), 500
+
+@rag_routes.route('/metrics', methods=['GET'])
+def get_metrics():
+    try:
+        return Response(get_metrics_handler(), content_type=CONTENT_TYPE)
+    except Exception as e:
+        return jsonify({
+            "status": "error",
+            "message": f"Server error: {str(e)}"
+        }), 500
+
 @rag_routes.route('/cleanup_session/<session_key>', methods=['DELETE'])
 def cleanup_session(session_key):
     try:
@@ -149,9 +302,44 @@ def get_complete_lecture():
                 "message": "Missing course_title or lecture_title parameter"
             }), 400
             
-        response = get_complete_lecture_handler(course_title, lecture_title)
+        stream_format = request.args.get('stream')
+        if stream_format:
+            if stream_format not in STREAM_FORMATS:
+                return jsonify({
+                    "status": "error",
+                    "message": "stream must be one of: " + ", ".join(STREAM_FORMATS)
+                }), 400
+            stream = stream_complete_lecture_handler(course_title, lecture_title, stream_format)
+            if stream is None:
+                return jsonify({
+                    "status": "error",
+                    "message": "No content found for this lecture"
+                }), 404
+            return Response(stream_with_context(stream), mimetype=STREAM_MIMETYPES[stream_format])
+
+        since_chunk = request.args.get('since_chunk')
+        if since_chunk is not None:
+            try:
+                since_chunk = parse_cursor(since_chunk)
+            except ValueError:
+                return jsonify({
+                    "status": "error",
+                    "message": "since_chunk must be the cursor of a previous response"
+                }), 400
+
+        response = get_complete_lecture_handler(
+            course_title, lecture_title, since_chunk, request.headers.get('If-None-Match')
+        )
+        if response['status'] == 'not_modified':
+            return Response(status=304, headers={"ETag": response['etag'], "Cache-Control": "no-cache"})
+        etag = response.pop('etag', None)
         status_code = 200 if response['status'] == 'success' else 404
-        return jsonify(response), status_code
+        result = jsonify(response)
+        result.status_code = status_code
+        if etag:
+            result.headers['ETag'] = etag
+            result.headers['Cache-Control'] = 'no-cache'
+        return result
     except Exception as e:
         return jsonify({
             "status": "error",
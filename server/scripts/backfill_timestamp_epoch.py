@@ -0,0 +1,31 @@
+from datetime import datetime
+from qdrant_client.models import Filter, IsEmptyCondition, PayloadField
+from database.qdrant_db import QdrantDB
+from config.config import Config
+
+# Points written before timestamp_epoch existed are invisible to the
+# date-range filter in RAG.query until this has been run once.
+# Usage (from server/): python -m scripts.backfill_timestamp_epoch
+
+def backfill(db: QdrantDB, batch_size: int = 256) -> int:
+    missing = Filter(must=[IsEmptyCondition(is_empty=PayloadField(key="timestamp_epoch"))])
+    updated = 0
+    while True:
+        points, _ = db.client.scroll(
+            collection_name=db.collection_name,
+            scroll_filter=missing,
+            limit=batch_size,
+            with_payload=["timestamp"],
+            with_vectors=False
+        )
+        if not points:
+            return updated
+        for point in points:
+            timestamp = point.payload.get('timestamp')
+            epoch = datetime.fromisoformat(timestamp).timestamp() if timestamp else 0.0
+            db.set_payload({"timestamp_epoch": epoch}, [point.id])
+        updated += len(points)
+
+if __name__ == "__main__":
+    count = backfill(QdrantDB(Config.COLLECTION_NAME))
+    print(f"Backfilled timestamp_epoch on {count} points")
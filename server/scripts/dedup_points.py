@@ -0,0 +1,84 @@
+import argparse
+from collections import defaultdict
+from datetime import datetime
+from qdrant_client.models import PointIdsList, PointStruct
+from database.qdrant_db import QdrantDB
+from config.config import Config
+from rag.rag import content_hash, point_id
+
+# Points written before ids were derived from chunk coordinates got random
+# ids, so every retry or recovery added another copy of the chunk. This
+# keeps one copy of each and moves live-ingested chunks onto their
+# deterministic id so later resends overwrite them. Chunks that share
+# coordinates but not text are left alone. Bulk-uploaded lectures keep their
+# ids since the document hash those derive from is not stored.
+# Usage (from server/): python -m scripts.dedup_points [--dry-run]
+
+FIELDS = ["course_title", "lecture_title", "timestamp", "timestamp_epoch", "chunk_number",
+          "segment_id", "position", "text", "content_hash", "kind"]
+
+def _identity(payload: dict) -> tuple:
+    date = datetime.fromisoformat(payload['timestamp']).date()
+    session_key = f"{payload['course_title']}_{payload['lecture_title']}_{date}"
+    text_hash = payload.get('content_hash') or content_hash(payload.get('text', ''))
+    if payload.get('chunk_number') is not None:
+        return point_id(session_key, payload.get('segment_id'), payload['chunk_number']), text_hash
+    return None, (session_key, payload.get('position'), text_hash)
+
+def dedup(db: QdrantDB, batch_size: int = 256, dry_run: bool = False) -> dict:
+    groups = defaultdict(list)
+    texts_by_target = defaultdict(set)
+    scanned = 0
+    offset = None
+    while True:
+        points, offset = db.client.scroll(
+            collection_name=db.collection_name,
+            limit=batch_size,
+            offset=offset,
+            with_payload=FIELDS,
+            with_vectors=False
+        )
+        for point in points:
+            scanned += 1
+            payload = point.payload or {}
+            if not payload.get('timestamp') or 'course_title' not in payload \
+                    or payload.get('kind') == 'summary':
+                continue
+            target, text_hash = _identity(payload)
+            if target is not None:
+                texts_by_target[target].add(text_hash)
+            groups[(target, text_hash)].append((payload.get('timestamp_epoch') or 0.0, str(point.id)))
+        if offset is None:
+            break
+
+    duplicates = []
+    moved = []
+    for (target, _), copies in groups.items():
+        # The earliest copy is kept unless one already has the right id
+        ids = [copy_id for _, copy_id in sorted(copies)]
+        keep = target if target in ids else ids[0]
+        duplicates.extend(copy_id for copy_id in ids if copy_id != keep)
+        if target is not None and keep != target and len(texts_by_target[target]) == 1:
+            moved.append((keep, target))
+
+    if not dry_run:
+        for keep, target in moved:
+            point = db.retrieve([keep], with_payload=True, with_vectors=True)[0]
+            payload = dict(point.payload)
+            payload.setdefault('content_hash', content_hash(payload.get('text', '')))
+            db.add_points([PointStruct(id=target, vector=point.vector, payload=payload)])
+        stale = duplicates + [keep for keep, _ in moved]
+        for start in range(0, len(stale), batch_size):
+            db.client.delete(
+                collection_name=db.collection_name,
+                points_selector=PointIdsList(points=stale[start:start + batch_size])
+            )
+    return {"scanned": scanned, "removed": len(duplicates), "moved": len(moved)}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+    counts = dedup(QdrantDB(Config.COLLECTION_NAME), dry_run=args.dry_run)
+    print(f"Scanned {counts['scanned']} points, removed {counts['removed']} duplicates, "
+          f"moved {counts['moved']} chunks to deterministic ids")
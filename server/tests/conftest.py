@@ -0,0 +1,35 @@
+import os
+import sys
+
+# Config is read at import time. The tests use in-memory Qdrant and the
+# hashing embedder, and point OpenAI at a closed port, so nothing here
+# needs the network or writes outside pytest's tmp_path.
+os.environ.update({
+    "OPEN_API_SECRET_KEY": "test",
+    "OPENAI_BASE_URL": "http://127.0.0.1:9/v1",
+    "QDRANT_LOCATION": ":memory:",
+    "COLLECTION_NAME": "test",
+    "EMBEDDING_MODEL": "hashing",
+    "EMBEDDING_CACHE_PATH": "",
+    "INGEST_LOG_DIR": "",
+    "SUMMARY_ENABLED": "False"
+})
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+
+@pytest.fixture
+def rag():
+    from rag.rag import RAG
+    return RAG()
+
+
+@pytest.fixture
+def make_tracker(rag):
+    from rag.lecture_tracker import LectureTracker
+
+    def make(**kwargs):
+        kwargs.setdefault("idle_flush_seconds", 0)
+        return LectureTracker(rag, **kwargs)
+    return make
@@ -0,0 +1,69 @@
+from utils.context_assembler import ContextAssembler, parse_budgets
+
+
+def _messages(contexts):
+    return [{"role": "system", "content": "Answer from the context."},
+            {"role": "user", "content": "\n".join(contexts)}]
+
+
+def _result(text, score):
+    return {"text": text, "score": score}
+
+
+def _assembler(budget, dedup_threshold=0.85):
+    return ContextAssembler("gpt-3.5-turbo", budget=budget, dedup_threshold=dedup_threshold)
+
+
+def test_parse_budgets():
+    assert parse_budgets("gpt-4o=12000, gpt-3.5-turbo=3000,bad") == {"gpt-4o": 12000, "gpt-3.5-turbo": 3000}
+
+
+def test_everything_fits_and_keeps_the_original_order():
+    results = [_result("glycolysis splits glucose", 0.2), _result("the krebs cycle follows", 0.9)]
+
+    selected, info = _assembler(1000).assemble(results, _messages)
+    assert selected == results
+    assert info["contexts_used"] == 2
+    assert info["prompt_tokens"] <= 1000
+
+
+def test_near_duplicates_are_dropped_keeping_the_best_scored():
+    text = "the mitochondria is the powerhouse of the cell and makes atp"
+    results = [_result(text, 0.5), _result(text + " for the cell", 0.9), _result("ribosomes make proteins", 0.4)]
+
+    selected, info = _assembler(1000).assemble(results, _messages)
+    assert [r["score"] for r in selected] == [0.9, 0.4]
+    assert info["duplicates_dropped"] == 1
+
+
+def test_lower_scored_chunks_are_dropped_over_budget():
+    assembler = _assembler(0)
+    base = assembler.counter.count_messages(_messages([]))
+    long_text = " ".join(f"term{i}" for i in range(200))
+    short_text = "osmosis moves water"
+    assembler.budget = base + assembler.counter.count(long_text) + 1
+
+    selected, info = assembler.assemble([_result(short_text, 0.1), _result(long_text, 0.9)], _messages)
+    assert [r["text"] for r in selected] == [long_text]
+    assert info["over_budget_dropped"] == 1
+    assert info["prompt_tokens"] <= assembler.budget
+
+
+def test_best_chunk_is_truncated_when_nothing_fits():
+    assembler = _assembler(0)
+    base = assembler.counter.count_messages(_messages([]))
+    assembler.budget = base + 11
+    long_text = " ".join(f"term{i}" for i in range(200))
+
+    selected, info = assembler.assemble([_result(long_text, 0.9)], _messages)
+    assert info["truncated"]
+    assert selected[0]["truncated"]
+    assert long_text.startswith(selected[0]["text"])
+    assert assembler.counter.count(selected[0]["text"]) <= 10
+
+
+def test_budget_below_the_prompt_itself_leaves_no_context():
+    selected, info = _assembler(1).assemble([_result("osmosis moves water", 0.9)], _messages)
+
+    assert selected == []
+    assert info["contexts_used"] == 0
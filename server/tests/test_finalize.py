@@ -0,0 +1,58 @@
+import threading
+
+import pytest
+
+from handlers.rag_handler import parse_finalize_timeout
+
+CONTENT = "photosynthesis " * 200
+
+
+def _blocking_store(rag):
+    release = threading.Event()
+    store = rag.add_lecture_chunks_to_db
+
+    def blocked(batch):
+        release.wait(10)
+        return store(batch)
+
+    rag.add_lecture_chunks_to_db = blocked
+    return release
+
+
+def test_finalize_waits_for_pending_chunks(make_tracker):
+    tracker = make_tracker(num_workers=1, batch_wait_ms=0)
+    session_key = tracker.add_or_update_lecture("Biology", "Plants", CONTENT)["session_key"]
+
+    result = tracker.finalize_lecture("Biology", "Plants", timeout=10)
+    assert result["status"] == "success"
+    assert tracker.pending_chunks(session_key) == 0
+    assert tracker.get_lecture_status("Biology", "Plants")["status"] == "completed"
+
+
+def test_finalize_times_out_while_chunks_are_pending(rag, make_tracker):
+    release = _blocking_store(rag)
+    tracker = make_tracker(num_workers=1, batch_wait_ms=0)
+    tracker.add_or_update_lecture("Biology", "Plants", CONTENT)
+
+    result = tracker.finalize_lecture("Biology", "Plants", timeout=0.2)
+    assert result["status"] == "timeout"
+    assert result["pending_chunks"] > 0
+    assert tracker.get_lecture_status("Biology", "Plants")["status"] == "active"
+
+    release.set()
+    assert tracker.finalize_lecture("Biology", "Plants", timeout=10)["status"] == "success"
+
+
+def test_finalize_unknown_session(make_tracker):
+    tracker = make_tracker()
+
+    assert tracker.finalize_lecture("Biology", "Missing", timeout=0.1)["status"] == "error"
+
+
+def test_finalize_timeout_must_be_a_non_negative_number():
+    assert parse_finalize_timeout(None) is None
+    assert parse_finalize_timeout(0) == 0
+    assert parse_finalize_timeout(2.5) == 2.5
+    for value in ("5s", "5", -1, True, float("nan"), float("inf"), [5]):
+        with pytest.raises(ValueError):
+            parse_finalize_timeout(value)
@@ -0,0 +1,55 @@
+import threading
+import time
+from queue import Queue
+
+
+def _item(number):
+    return (time.perf_counter(), {"chunk_number": number})
+
+
+def test_next_batch_is_capped_at_batch_size(make_tracker):
+    tracker = make_tracker(batch_size=4, batch_wait_ms=0)
+    queue = Queue()
+    for number in range(10):
+        queue.put(_item(number))
+
+    assert [c["chunk_number"] for c in tracker._next_batch(queue)] == [0, 1, 2, 3]
+    assert [c["chunk_number"] for c in tracker._next_batch(queue)] == [4, 5, 6, 7]
+    assert queue.qsize() == 2
+
+
+def test_next_batch_waits_for_chunks_arriving_within_the_window(make_tracker):
+    tracker = make_tracker(batch_size=8, batch_wait_ms=500)
+    queue = Queue()
+    queue.put(_item(1))
+    threading.Timer(0.05, queue.put, args=(_item(2),)).start()
+
+    assert [c["chunk_number"] for c in tracker._next_batch(queue)] == [1, 2]
+
+
+def test_next_batch_does_not_wait_without_a_window(make_tracker):
+    tracker = make_tracker(batch_size=8, batch_wait_ms=0)
+    queue = Queue()
+    queue.put(_item(1))
+
+    started = time.monotonic()
+    assert len(tracker._next_batch(queue)) == 1
+    assert time.monotonic() - started < 0.1
+
+
+def test_chunks_submitted_together_are_stored_in_one_call(rag, make_tracker):
+    batches = []
+    store = rag.add_lecture_chunks_to_db
+
+    def recording_store(batch):
+        batches.append([chunk_data["chunk_number"] for chunk_data in batch])
+        return store(batch)
+
+    rag.add_lecture_chunks_to_db = recording_store
+    tracker = make_tracker(batch_size=32, batch_wait_ms=200, num_workers=1)
+    response = tracker.add_or_update_lecture("Biology", "Cells", "mitochondria " * 300)
+    assert response["chunks_flushed"] > 1
+
+    assert tracker.finalize_lecture("Biology", "Cells", timeout=10)["status"] == "success"
+    # The chunk flushed by finalize may or may not join the same batch
+    assert batches[0][:response["chunks_flushed"]] == list(range(1, response["chunks_flushed"] + 1))
@@ -0,0 +1,112 @@
+import os
+
+from config.config import Config
+from utils.ingest_log import DEAD_LETTER_FILE, IngestLog
+
+
+def _segments(directory):
+    return sorted(name for name in os.listdir(directory) if name.startswith("segment-"))
+
+
+def test_replay_returns_uncommitted_chunks_in_order(tmp_path):
+    log = IngestLog(str(tmp_path), fsync=False)
+    ids = log.append_many([{"n": 1}, {"n": 2}, {"n": 3}])
+    log.commit([ids[1]])
+    log.close()
+
+    pending = IngestLog(str(tmp_path), fsync=False).replay()
+    assert pending == [(ids[0], {"n": 1}), (ids[2], {"n": 3})]
+
+
+def test_replay_compacts_into_one_segment_and_keeps_ids_increasing(tmp_path):
+    log = IngestLog(str(tmp_path), segment_bytes=64, fsync=False)
+    ids = [log.append({"n": n}) for n in range(6)]
+    log.commit(ids[:5])
+    log.close()
+
+    reopened = IngestLog(str(tmp_path), segment_bytes=64, fsync=False)
+    assert reopened.replay() == [(ids[5], {"n": 5})]
+    assert len(_segments(tmp_path)) == 1
+    assert reopened.append({"n": 6}) > ids[5]
+
+
+def test_torn_tail_is_truncated(tmp_path):
+    log = IngestLog(str(tmp_path), fsync=False)
+    log.append_many([{"n": 1}, {"n": 2}])
+    log.close()
+    path = os.path.join(tmp_path, _segments(tmp_path)[-1])
+    with open(path, "ab") as f:
+        f.write(b"\x40\x00\x00\x00garbage")
+
+    assert [data for _, data in IngestLog(str(tmp_path), fsync=False).replay()] == [{"n": 1}, {"n": 2}]
+
+
+def test_committed_segments_are_deleted_oldest_first(tmp_path):
+    log = IngestLog(str(tmp_path), segment_bytes=64, fsync=False)
+    log.replay()
+    ids = [log.append({"n": n, "pad": "x" * 40}) for n in range(4)]
+    assert len(_segments(tmp_path)) > 2
+
+    # A pending chunk in the oldest segment keeps every later one too
+    log.commit(ids[1:])
+    assert len(_segments(tmp_path)) > 2
+    log.commit(ids[:1])
+    assert len(_segments(tmp_path)) == 1
+    assert log.stats()["uncommitted_chunks"] == 0
+
+
+def test_dead_lettered_chunks_are_committed_and_kept_aside(tmp_path):
+    log = IngestLog(str(tmp_path), fsync=False)
+    log.replay()
+    ids = log.append_many([{"n": 1}, {"n": 2}])
+    log.dead_letter([(ids[0], {"n": 1})])
+    log.close()
+
+    assert IngestLog(str(tmp_path), fsync=False).replay() == [(ids[1], {"n": 2})]
+    assert os.path.getsize(os.path.join(tmp_path, DEAD_LETTER_FILE)) > 0
+
+
+def test_failed_batches_are_retried_then_dead_lettered(rag, make_tracker, tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "INGEST_LOG_DIR", str(tmp_path))
+    monkeypatch.setattr(Config, "INGEST_MAX_ATTEMPTS", 3)
+    monkeypatch.setattr(Config, "INGEST_RETRY_BACKOFF_SECONDS", 0.01)
+    attempts = []
+
+    def failing_store(batch):
+        attempts.append(len(batch))
+        return {"status": "error", "message": "qdrant unavailable"}
+
+    rag.add_lecture_chunks_to_db = failing_store
+    tracker = make_tracker(num_workers=1, batch_wait_ms=0)
+    tracker.add_or_update_lecture("Biology", "Cells", "ribosome " * 20)
+
+    assert tracker.finalize_lecture("Biology", "Cells", timeout=10)["status"] == "success"
+    stats = tracker.get_ingest_stats()
+    assert stats["chunks_dead_lettered"] == 1
+    assert stats["chunks_retried"] == 2
+    assert len(attempts) == 3
+    assert stats["ingest_log"]["uncommitted_chunks"] == 0
+
+
+def test_retried_batch_commits_before_later_batches(rag, make_tracker, monkeypatch):
+    monkeypatch.setattr(Config, "INGEST_RETRY_BACKOFF_SECONDS", 0.05)
+    committed = []
+    store = rag.add_lecture_chunks_to_db
+
+    def flaky_store(batch):
+        if not committed and not flaky_store.failed:
+            flaky_store.failed = True
+            return {"status": "error", "message": "qdrant unavailable"}
+        committed.extend(chunk_data["chunk_number"] for chunk_data in batch)
+        return store(batch)
+
+    flaky_store.failed = False
+    rag.add_lecture_chunks_to_db = flaky_store
+    tracker = make_tracker(num_workers=1, batch_size=1, batch_wait_ms=0)
+    for i in range(5):
+        tracker.add_or_update_lecture("Biology", "Cells", f"mitochondria{i} " * 100)
+
+    assert tracker.finalize_lecture("Biology", "Cells", timeout=10)["status"] == "success"
+    assert flaky_store.failed
+    assert committed == list(range(1, len(committed) + 1))
+    assert tracker.get_ingest_stats()["chunks_retried"] == 1
@@ -0,0 +1,92 @@
+import threading
+import time
+
+
+def test_concurrent_fragments_are_committed_in_chunk_order(rag, make_tracker):
+    committed = []
+    store = rag.add_lecture_chunks_to_db
+
+    def recording_store(batch):
+        committed.extend(chunk_data["chunk_number"] for chunk_data in batch)
+        return store(batch)
+
+    rag.add_lecture_chunks_to_db = recording_store
+    tracker = make_tracker(num_workers=1, batch_wait_ms=0)
+
+    def speak(speaker):
+        for i in range(20):
+            tracker.add_or_update_lecture("Physics", "Motion", f"speaker{speaker} sentence{i} " * 40)
+
+    threads = [threading.Thread(target=speak, args=(speaker,)) for speaker in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert tracker.finalize_lecture("Physics", "Motion", timeout=30)["status"] == "success"
+
+    assert committed == list(range(1, len(committed) + 1))
+
+
+def test_finalize_holds_the_session_lock_against_new_fragments(make_tracker):
+    tracker = make_tracker(num_workers=1, batch_wait_ms=0)
+    tracker.add_or_update_lecture("Physics", "Waves", "opening remarks " * 40)
+    finalizing, release = threading.Event(), threading.Event()
+    submit = tracker._submit
+
+    def blocking_submit(chunks):
+        if threading.current_thread().name == "finalize":
+            finalizing.set()
+            release.wait(10)
+        return submit(chunks)
+
+    tracker._submit = blocking_submit
+    finalize = threading.Thread(name="finalize", target=tracker.finalize_lecture,
+                                args=("Physics", "Waves"), kwargs={"timeout": 10})
+    finalize.start()
+    assert finalizing.wait(10)
+
+    speaker = threading.Thread(target=tracker.add_or_update_lecture,
+                               args=("Physics", "Waves", "closing remarks " * 40))
+    speaker.start()
+    speaker.join(0.2)
+    assert speaker.is_alive()
+
+    release.set()
+    finalize.join(10)
+    speaker.join(10)
+    assert tracker.finalize_lecture("Physics", "Waves", timeout=10)["status"] == "success"
+    assert tracker._session_locks == {}
+
+
+def test_buffered_fragment_keeps_the_session_alive(make_tracker):
+    tracker = make_tracker()
+    response = tracker.add_or_update_lecture("Physics", "Motion", "a short fragment")
+    record = tracker.sessions.get(response["session_key"])
+    touched_at, last_update = record.touched_at, record.last_update
+
+    time.sleep(0.01)
+    response = tracker.add_or_update_lecture("Physics", "Motion", "still buffering")
+    assert response["chunks_flushed"] == 0
+    assert record.touched_at > touched_at
+    assert record.last_update > last_update
+
+
+def test_restarted_session_resumes_chunk_numbering(rag, make_tracker):
+    first = make_tracker(num_workers=1, batch_wait_ms=0)
+    first.add_or_update_lecture("Physics", "Motion", "velocity " * 120)
+    assert first.finalize_lecture("Physics", "Motion", timeout=10)["status"] == "success"
+    stored = first.get_lecture_status("Physics", "Motion")["total_chunks"]
+
+    rag.session_store.discard(next(key for key, _ in rag.session_store.items()))
+    second = make_tracker(num_workers=1, batch_wait_ms=0)
+    response = second.add_or_update_lecture("Physics", "Motion", "momentum " * 120)
+    assert response["chunk_number"] == stored + 1
+
+
+def test_query_does_not_start_a_lecture(rag, make_tracker):
+    tracker = make_tracker()
+    rag.query("What is osmosis?", "Biology", "Cells")
+
+    assert tracker.get_lecture_status("Biology", "Cells") == {"status": "not_found"}
+    result = tracker.finalize_lecture("Biology", "Cells", timeout=1)
+    assert result == {"status": "error", "message": "No active session found"}
@@ -0,0 +1,52 @@
+from utils.lexical_index import LexicalIndex, tokenize
+
+
+def _chunk(text, segment_id="seg"):
+    return {"text": text, "segment_id": segment_id}
+
+
+def test_tokenize_drops_stopwords_and_punctuation():
+    assert tokenize("What is the Krebs cycle?") == ["krebs", "cycle"]
+
+
+def test_rarer_terms_rank_higher():
+    index = LexicalIndex()
+    index.add_many("s", [
+        _chunk("the cell uses energy"),
+        _chunk("the cell membrane is selective"),
+        _chunk("the krebs cycle releases energy in the cell")
+    ])
+
+    results = index.search("s", "krebs cycle energy", limit=3)
+    assert results[0][1]["text"] == "the krebs cycle releases energy in the cell"
+    assert results[0][2] == 3
+    assert [score for score, *_ in results] == sorted((score for score, *_ in results), reverse=True)
+
+
+def test_relative_score_is_about_one_for_a_full_match():
+    index = LexicalIndex()
+    index.add_many("s", [_chunk(f"filler text number {i}") for i in range(20)] + [_chunk("osmosis diffusion")])
+
+    _, chunk, matched, relative = index.search("s", "osmosis diffusion", limit=1)[0]
+    assert chunk["text"] == "osmosis diffusion"
+    assert matched == 2
+    assert 0.8 < relative < 1.5
+
+
+def test_capacity_evicts_the_oldest_chunks():
+    index = LexicalIndex(capacity_per_session=2)
+    index.add_many("s", [_chunk("alpha"), _chunk("beta"), _chunk("gamma")])
+
+    assert index.search("s", "alpha") == []
+    assert index.stats()["chunks"] == 2
+    assert "alpha" not in index._sessions["s"].postings
+
+
+def test_segment_filter_session_isolation_and_drop():
+    index = LexicalIndex()
+    index.add_many("s", [_chunk("enzyme kinetics", "a"), _chunk("enzyme structure", "b")])
+
+    assert [hit[1]["segment_id"] for hit in index.search("s", "enzyme", segment_id="b")] == ["b"]
+    assert index.search("other", "enzyme") == []
+    index.drop_session("s")
+    assert index.search("s", "enzyme") == []
@@ -0,0 +1,45 @@
+from utils.recent_chunk_store import RecentChunkStore
+
+AXES = [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]]
+
+
+def _chunk(text, segment_id="seg"):
+    return {"text": text, "segment_id": segment_id}
+
+
+def test_search_ranks_by_cosine_similarity():
+    store = RecentChunkStore(capacity_per_session=8)
+    store.add_many("s", [_chunk("x"), _chunk("y"), _chunk("z")], AXES)
+
+    results = store.search("s", [0.1, 0.9, 0.2], limit=2)
+    assert [chunk["text"] for _, chunk in results] == ["y", "z"]
+    assert results[0][0] > results[1][0]
+
+
+def test_ring_keeps_only_the_newest_chunks():
+    store = RecentChunkStore(capacity_per_session=2)
+    store.add_many("s", [_chunk("x"), _chunk("y"), _chunk("z")], AXES)
+
+    texts = {chunk["text"] for _, chunk in store.search("s", [1.0, 1.0, 1.0], limit=5)}
+    assert texts == {"y", "z"}
+    assert store.stats()["chunks"] == 2
+
+
+def test_segment_filter_and_session_isolation():
+    store = RecentChunkStore()
+    store.add_many("s", [_chunk("x", "a"), _chunk("y", "b")], AXES[:2])
+    store.add_many("t", [_chunk("other")], AXES[:1])
+
+    assert [chunk["text"] for _, chunk in store.search("s", AXES[0], segment_id="b")] == ["y"]
+    assert store.search("missing", AXES[0]) == []
+
+    store.drop_session("s")
+    assert store.search("s", AXES[0]) == []
+    assert store.stats()["sessions"] == 1
+
+
+def test_zero_capacity_disables_the_store():
+    store = RecentChunkStore(capacity_per_session=0)
+    store.add_many("s", [_chunk("x")], AXES[:1])
+
+    assert store.search("s", AXES[0]) == []
@@ -0,0 +1,53 @@
+from types import SimpleNamespace
+
+from database.qdrant_db import next_scroll_cursor
+
+
+def _points(*pairs):
+    return [SimpleNamespace(id=point_id, payload={"t": value}) for point_id, value in pairs]
+
+
+def test_full_page_continues_from_its_last_value():
+    points = _points((1, 1.0), (2, 2.0), (3, 2.0))
+
+    fresh, start_from, seen, batch_size = next_scroll_cursor(points, "t", None, set(), 3)
+    assert fresh == points
+    assert start_from == 2.0
+    assert seen == {2, 3}
+    assert batch_size == 3
+
+
+def test_points_at_the_boundary_are_not_yielded_twice():
+    # The next page starts at (and includes) the previous last value
+    points = _points((2, 2.0), (3, 2.0), (4, 3.0))
+
+    fresh, start_from, seen, batch_size = next_scroll_cursor(points, "t", 2.0, {2, 3}, 3)
+    assert [point.id for point in fresh] == [4]
+    assert start_from == 3.0
+    assert seen == {4}
+
+
+def test_boundary_set_grows_while_the_value_repeats():
+    points = _points((3, 2.0), (4, 2.0), (5, 2.0))
+
+    fresh, start_from, seen, batch_size = next_scroll_cursor(points, "t", 2.0, {2, 3}, 3)
+    assert [point.id for point in fresh] == [4, 5]
+    assert start_from == 2.0
+    assert seen == {2, 3, 4, 5}
+
+
+def test_page_of_already_seen_points_doubles_the_batch():
+    points = _points((2, 2.0), (3, 2.0))
+
+    fresh, start_from, seen, batch_size = next_scroll_cursor(points, "t", 2.0, {2, 3}, 2)
+    assert fresh == []
+    assert start_from == 2.0
+    assert batch_size == 4
+
+
+def test_short_page_ends_the_scroll():
+    points = _points((5, 4.0))
+
+    fresh, _, _, batch_size = next_scroll_cursor(points, "t", 3.0, set(), 3)
+    assert fresh == points
+    assert batch_size is None
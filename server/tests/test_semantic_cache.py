@@ -0,0 +1,63 @@
+from utils.semantic_cache import SemanticAnswerCache
+
+SCOPE = (None, True, 3)
+QUESTION = [1.0, 0.0, 0.0]
+PARAPHRASE = [0.99, 0.05, 0.0]
+OTHER = [0.0, 1.0, 0.0]
+
+
+def test_similar_question_hits_within_the_same_version():
+    cache = SemanticAnswerCache(threshold=0.95)
+    cache.store("s", SCOPE, QUESTION, {"answer": "a"}, cache.version("s"))
+
+    answer, info = cache.lookup("s", SCOPE, PARAPHRASE)
+    assert answer == {"answer": "a"}
+    assert info["hit"]
+    assert cache.lookup("s", SCOPE, OTHER)[0] is None
+
+
+def test_new_content_invalidates_cached_answers():
+    cache = SemanticAnswerCache()
+    cache.store("s", SCOPE, QUESTION, {"answer": "a"}, cache.version("s"))
+    cache.mark_updated("s")
+
+    answer, info = cache.lookup("s", SCOPE, QUESTION)
+    assert answer is None
+    assert info["invalidated"] == 1
+    assert cache.stats()["entries"] == 0
+
+
+def test_answer_computed_before_an_update_is_not_stored():
+    cache = SemanticAnswerCache()
+    version = cache.version("s")
+    cache.mark_updated("s")
+    cache.store("s", SCOPE, QUESTION, {"answer": "stale"}, version)
+
+    assert cache.lookup("s", SCOPE, QUESTION)[0] is None
+
+
+def test_versions_and_scopes_are_per_session():
+    cache = SemanticAnswerCache()
+    cache.store("s", SCOPE, QUESTION, {"answer": "a"}, cache.version("s"))
+    cache.mark_updated("other")
+
+    assert cache.lookup("s", SCOPE, QUESTION)[0] == {"answer": "a"}
+    assert cache.lookup("s", ("segment", True, 3), QUESTION)[0] is None
+    assert cache.lookup("other", SCOPE, QUESTION)[0] is None
+
+
+def test_oldest_entries_are_dropped_past_the_session_limit():
+    cache = SemanticAnswerCache(max_entries_per_session=2)
+    for i, vector in enumerate(([1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0])):
+        cache.store("s", SCOPE, vector, {"answer": str(i)}, 0)
+
+    assert cache.lookup("s", SCOPE, [1.0, 0.0, 0.0])[0] is None
+    assert cache.lookup("s", SCOPE, [0.0, 0.0, 1.0])[0] == {"answer": "2"}
+
+
+def test_returned_answers_are_copies():
+    cache = SemanticAnswerCache()
+    cache.store("s", SCOPE, QUESTION, {"answer": "a"}, 0)
+    cache.lookup("s", SCOPE, QUESTION)[0]["answer"] = "changed"
+
+    assert cache.lookup("s", SCOPE, QUESTION)[0] == {"answer": "a"}
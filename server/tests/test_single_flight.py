@@ -0,0 +1,108 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from utils.single_flight import SingleFlight, normalize_question
+
+
+def test_normalize_question():
+    assert normalize_question("  What is  ATP?? ") == normalize_question("what is atp")
+
+
+def test_concurrent_callers_share_one_call():
+    flights = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        return {"answer": "atp"}
+
+    with ThreadPoolExecutor(8) as pool:
+        futures = [pool.submit(flights.do, "q", compute) for _ in range(8)]
+        while flights.stats()["upstream_calls_saved"] < 7:
+            time.sleep(0.01)
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert len(calls) == 1
+    assert sorted(shared for _, shared in results) == [False] + [True] * 7
+    assert all(result == {"answer": "atp"} for result, _ in results)
+    assert flights.stats()["in_flight"] == 0
+
+
+def test_error_reaches_every_waiting_caller():
+    flights = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def fail():
+        started.set()
+        release.wait(5)
+        raise RuntimeError("upstream down")
+
+    with ThreadPoolExecutor(2) as pool:
+        leader = pool.submit(flights.do, "q", fail)
+        started.wait(5)
+        follower = pool.submit(flights.do, "q", fail)
+        while flights.stats()["upstream_calls_saved"] < 1:
+            time.sleep(0.01)
+        release.set()
+        for future in (leader, follower):
+            with pytest.raises(RuntimeError):
+                future.result()
+
+
+def test_results_are_not_cached_after_the_call():
+    flights = SingleFlight()
+    calls = []
+
+    for _ in range(2):
+        flights.do("q", lambda: calls.append(1) or {})
+    assert len(calls) == 2
+
+
+def test_disabled_runs_every_call():
+    flights = SingleFlight(enabled=False)
+
+    assert flights.do("q", lambda: {"n": 1}) == ({"n": 1}, False)
+    assert flights.stats()["upstream_calls"] == 0
+
+
+def test_async_callers_share_one_task():
+    flights = SingleFlight()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"answer": "atp"}
+
+    async def run():
+        return await asyncio.gather(*(flights.ado("q", compute) for _ in range(5)))
+
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert [shared for _, shared in results].count(False) == 1
+    assert flights.stats()["in_flight"] == 0
+
+
+def test_cancelled_async_caller_does_not_cancel_the_others():
+    flights = SingleFlight()
+
+    async def compute():
+        await asyncio.sleep(0.05)
+        return {"answer": "atp"}
+
+    async def run():
+        first = asyncio.ensure_future(flights.ado("q", compute))
+        second = asyncio.ensure_future(flights.ado("q", compute))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(run()) == ({"answer": "atp"}, True)
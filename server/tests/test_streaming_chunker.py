@@ -0,0 +1,49 @@
+from utils.text_chunker import StreamingChunker, chunk_text
+
+TEXT = " ".join(f"word{i}" for i in range(200))
+
+
+def test_incremental_feeding_matches_one_shot_chunking():
+    words = TEXT.split()
+    chunker = StreamingChunker(chunk_size=100, overlap=20)
+    chunks = []
+    for start in range(0, len(words), 7):
+        chunks.extend(chunker.feed(" ".join(words[start:start + 7])))
+    chunks.append(chunker.flush())
+
+    assert chunks == chunk_text(TEXT, chunk_size=100, overlap=20)
+
+
+def test_chunks_reach_chunk_size_and_carry_the_overlap():
+    chunks = chunk_text(TEXT, chunk_size=100, overlap=20)
+
+    assert all(len(chunk) >= 100 - 1 for chunk in chunks[:-1])
+    for previous, current in zip(chunks, chunks[1:]):
+        carried = current.split()[:2]
+        assert previous.split()[-2:] == carried
+
+
+def test_buffer_reports_only_new_text():
+    chunker = StreamingChunker(chunk_size=100, overlap=20)
+    assert chunker.feed("short fragment") == []
+    assert chunker.has_content
+    assert chunker.buffered_chars == len("short fragment") + 1
+
+    chunker.flush()
+    assert not chunker.has_content
+    assert chunker.buffered_chars == 0
+    assert chunker.flush() is None
+
+
+def test_snap_to_sentence_waits_for_a_sentence_end():
+    text = "alpha beta gamma. delta epsilon zeta eta. theta"
+    chunks = chunk_text(text, chunk_size=10, snap_to_sentence=True, max_chunk_size=100)
+
+    assert chunks == ["alpha beta gamma.", "delta epsilon zeta eta.", "theta"]
+
+
+def test_max_chunk_size_caps_a_sentence_that_never_ends():
+    chunks = chunk_text(TEXT, chunk_size=50, snap_to_sentence=True, max_chunk_size=80)
+
+    assert all(len(chunk) <= 80 + len("word199") for chunk in chunks)
+    assert " ".join(chunks).split() == TEXT.split()
@@ -0,0 +1,28 @@
+from config.config import Config
+
+
+def _recording_retrieve(rag):
+    calls = []
+
+    def retrieve(ids):
+        calls.append(ids)
+        return []
+
+    rag.db.retrieve = retrieve
+    return calls
+
+
+def test_overview_question_skips_summary_lookup_when_disabled(rag, monkeypatch):
+    monkeypatch.setattr(Config, "SUMMARY_ENABLED", False)
+    calls = _recording_retrieve(rag)
+
+    rag.query("What has been covered so far?", "Biology", "Cells")
+    assert calls == []
+
+
+def test_overview_question_fetches_summary_when_enabled(rag, monkeypatch):
+    monkeypatch.setattr(Config, "SUMMARY_ENABLED", True)
+    calls = _recording_retrieve(rag)
+
+    rag.query("What has been covered so far?", "Biology", "Cells", segment_id="seg-1")
+    assert len(calls) == 1 and len(calls[0]) == 2
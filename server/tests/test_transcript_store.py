@@ -0,0 +1,99 @@
+import pytest
+
+from utils.transcript_store import MaterializedTranscript, TranscriptStore, etag_matches, parse_cursor
+
+
+def _chunk(second, text, segment_id="seg", chunk_number=None):
+    return {"timestamp": f"2024-01-01T10:00:{second:02d}", "segment_id": segment_id,
+            "chunk_number": chunk_number if chunk_number is not None else second, "text": text}
+
+
+def test_chunks_are_kept_in_timestamp_order():
+    transcript = MaterializedTranscript()
+    transcript.add([_chunk(1, "a"), _chunk(3, "c")])
+    transcript.add([_chunk(2, "b")])
+
+    version, chunks = transcript.snapshot()
+    assert [chunk["text"] for chunk in chunks] == ["a", "b", "c"]
+    assert version == 3
+
+
+def test_since_returns_only_later_changes():
+    transcript = MaterializedTranscript()
+    transcript.add([_chunk(1, "a"), _chunk(2, "b")])
+    cursor_version = transcript.version
+    transcript.add([_chunk(3, "c"), _chunk(1, "a")])
+    transcript.add([_chunk(2, "b edited")])
+
+    version, chunks = transcript.since(cursor_version)
+    assert [chunk["text"] for chunk in chunks] == ["b edited", "c"]
+    assert version == cursor_version + 2
+
+
+def test_cursor_round_trips_and_etag_is_weakly_compared():
+    transcript = MaterializedTranscript()
+    cursor = transcript.cursor(7)
+
+    assert parse_cursor(cursor) == (transcript.generation, 7)
+    assert etag_matches(f'W/{transcript.etag(7)}, "other"', transcript.etag(7))
+    assert etag_matches("*", transcript.etag(7))
+    assert not etag_matches(transcript.etag(6), transcript.etag(7))
+    for bad in ("7", "abc-", "abc-x"):
+        with pytest.raises(ValueError):
+            parse_cursor(bad)
+
+
+def test_response_is_built_once_per_version():
+    transcript = MaterializedTranscript()
+    transcript.add([_chunk(1, "a")])
+    builds = []
+
+    def build(chunks):
+        builds.append(len(chunks))
+        return {"status": "success", "chunks": len(chunks)}
+
+    assert transcript.response(build) == transcript.response(build) == (1, {"status": "success", "chunks": 1})
+    transcript.add([_chunk(2, "b")])
+    assert transcript.response(build)[0] == 2
+    assert builds == [1, 2]
+
+
+def test_store_evicts_least_recently_read_and_rebuilds_with_a_new_generation():
+    store = TranscriptStore(max_lectures=1)
+    first = store.start_loading("Bio", "L1")
+    store.finish_loading(first, [_chunk(1, "a")])
+    assert store.get("Bio", "L1") is first
+
+    store.finish_loading(store.start_loading("Bio", "L2"), [])
+    assert store.get("Bio", "L1") is None
+
+    rebuilt = store.start_loading("Bio", "L1")
+    store.finish_loading(rebuilt, [_chunk(1, "a")])
+    assert rebuilt.generation != first.generation
+    assert rebuilt.cursor(rebuilt.version) != first.cursor(first.version)
+
+
+def test_unread_lectures_are_not_materialized():
+    store = TranscriptStore()
+    store.add_chunks("Bio", "L1", [_chunk(1, "a")])
+
+    assert store.stats()["lectures"] == 0
+
+
+def test_stale_cursor_gets_the_full_transcript_with_resync(rag):
+    old = MaterializedTranscript()
+    old.add([_chunk(1, "a")])
+    transcript = MaterializedTranscript()
+    transcript.add([_chunk(1, "a"), _chunk(2, "b")])
+
+    delta = rag._transcript_response("Bio", "L1", transcript, parse_cursor(transcript.cursor(1)), None)
+    assert [chunk["text"] for chunk in delta["chunks"]] == ["b"]
+    assert delta["cursor"] == transcript.cursor(2)
+    assert "resync" not in delta
+
+    full = rag._transcript_response("Bio", "L1", transcript, parse_cursor(old.cursor(1)), None)
+    assert full["resync"]
+    assert full["cursor"] == transcript.cursor(2)
+
+    not_modified = rag._transcript_response("Bio", "L1", transcript, None, transcript.etag(2))
+    assert not_modified == {"status": "not_modified", "etag": transcript.etag(2)}
@@ -0,0 +1,135 @@
+import re
+from typing import Callable, Dict, List, Tuple
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+WORD_PATTERN = re.compile(r"\w+")
+SHINGLE_SIZE = 3
+# Approximate framing cost of the chat format per message and per reply
+MESSAGE_OVERHEAD_TOKENS = 4
+REPLY_OVERHEAD_TOKENS = 3
+# Used when tiktoken (or its vocabulary files) is unavailable
+CHARS_PER_TOKEN = 4
+
+
+def parse_budgets(spec: str) -> Dict[str, int]:
+    # "gpt-4o=12000,gpt-3.5-turbo=3000"
+    budgets = {}
+    for item in spec.split(","):
+        if "=" in item:
+            model, tokens = item.rsplit("=", 1)
+            budgets[model.strip()] = int(tokens)
+    return budgets
+
+
+class TokenCounter:
+    def __init__(self, model: str):
+        self.model = model
+        self.encoding = self._load_encoding(model)
+
+    @staticmethod
+    def _load_encoding(model: str):
+        if tiktoken is None:
+            return None
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            try:
+                return tiktoken.get_encoding("cl100k_base")
+            except Exception:
+                return None
+        except Exception:
+            return None
+
+    @property
+    def name(self) -> str:
+        return "tiktoken" if self.encoding is not None else "estimate"
+
+    def count(self, text: str) -> int:
+        if self.encoding is not None:
+            return len(self.encoding.encode(text))
+        return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+    def truncate(self, text: str, tokens: int) -> str:
+        if tokens <= 0:
+            return ""
+        if self.encoding is not None:
+            return self.encoding.decode(self.encoding.encode(text)[:tokens])
+        return text[:tokens * CHARS_PER_TOKEN]
+
+    def count_messages(self, messages: List[Dict]) -> int:
+        return sum(self.count(message["content"]) + MESSAGE_OVERHEAD_TOKENS
+                   for message in messages) + REPLY_OVERHEAD_TOKENS
+
+
+def _shingles(text: str) -> frozenset:
+    words = WORD_PATTERN.findall(text.lower())
+    if len(words) < SHINGLE_SIZE:
+        return frozenset([tuple(words)])
+    return frozenset(tuple(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1))
+
+
+def _similarity(a: frozenset, b: frozenset) -> float:
+    if not a or not b:
+        return 0.0
+    # Overlap coefficient, so a chunk contained in a longer one (overlapping
+    # windows, re-sent fragments) counts as a duplicate
+    return len(a & b) / min(len(a), len(b))
+
+
+class ContextAssembler:
+    # Picks the retrieved chunks that go into the prompt: near-duplicates
+    # (word-shingle overlap >= dedup_threshold) are dropped, then chunks are
+    # added in relevance order while the whole prompt fits the token budget.
+    # The chunks that are kept are returned in their original order.
+    def __init__(self, model: str, budget: int, dedup_threshold: float = 0.85):
+        self.counter = TokenCounter(model)
+        self.budget = budget
+        self.dedup_threshold = dedup_threshold
+
+    def assemble(self, results: List[Dict],
+                 build_messages: Callable[[List[str]], List[Dict]]) -> Tuple[List[Dict], dict]:
+        base_tokens = self.counter.count_messages(build_messages([]))
+        ranked = sorted(enumerate(results), key=lambda item: item[1].get('score') or 0.0, reverse=True)
+
+        kept: List[Tuple[int, Dict]] = []
+        kept_shingles: List[frozenset] = []
+        duplicates = 0
+        over_budget: List[Tuple[int, Dict]] = []
+        used = base_tokens
+        for position, result in ranked:
+            shingles = _shingles(result['text'])
+            if any(_similarity(shingles, other) >= self.dedup_threshold for other in kept_shingles):
+                duplicates += 1
+                continue
+            # Contexts are joined with newlines, one token each
+            cost = self.counter.count(result['text']) + 1
+            if used + cost > self.budget:
+                over_budget.append((position, result))
+                continue
+            kept.append((position, result))
+            kept_shingles.append(shingles)
+            used += cost
+
+        truncated = False
+        if not kept and over_budget:
+            # Better a truncated best chunk than no context at all
+            position, result = over_budget.pop(0)
+            text = self.counter.truncate(result['text'], self.budget - base_tokens - 1)
+            if text:
+                kept.append((position, dict(result, text=text, truncated=True)))
+                truncated = True
+
+        selected = [result for _, result in sorted(kept, key=lambda item: item[0])]
+        return selected, {
+            "prompt_tokens": self.counter.count_messages(build_messages([r['text'] for r in selected])),
+            "token_budget": self.budget,
+            "tokenizer": self.counter.name,
+            "contexts_used": len(selected),
+            "duplicates_dropped": duplicates,
+            "over_budget_dropped": len(over_budget),
+            "truncated": truncated
+        }
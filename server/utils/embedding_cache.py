@@ -0,0 +1,137 @@
+import hashlib
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+from typing import List, Optional
+
+
+class EmbeddingCache:
+    def __init__(self, max_entries: int = 5000, disk_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.disk_path = disk_path or None
+        self._memory: "OrderedDict[str, array]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = self._open_disk(self.disk_path) if self.disk_path else None
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.api_calls = 0
+        self.api_calls_saved = 0
+        self.api_seconds = 0.0
+
+    @staticmethod
+    def _open_disk(path: str) -> sqlite3.Connection:
+        connection = sqlite3.connect(path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, model TEXT NOT NULL, vector BLOB NOT NULL)"
+        )
+        connection.commit()
+        return connection
+
+    @staticmethod
+    def make_key(model: str, text: str) -> str:
+        return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 or self._disk is not None
+
+    def get_many(self, model: str, texts: List[str]) -> List[Optional[List[float]]]:
+        keys = [self.make_key(model, text) for text in texts]
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        with self._lock:
+            disk_lookups = []
+            for i, key in enumerate(keys):
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    results[i] = vector.tolist()
+                    self.memory_hits += 1
+                else:
+                    disk_lookups.append(i)
+
+            if disk_lookups and self._disk is not None:
+                found = self._read_disk([keys[i] for i in disk_lookups])
+                for i in disk_lookups:
+                    vector = found.get(keys[i])
+                    if vector is not None:
+                        self._remember(keys[i], vector)
+                        results[i] = vector.tolist()
+                        self.disk_hits += 1
+
+            self.misses += sum(1 for vector in results if vector is None)
+        return results
+
+    def put_many(self, model: str, texts: List[str], vectors: List[List[float]]):
+        rows = []
+        with self._lock:
+            for text, vector in zip(texts, vectors):
+                key = self.make_key(model, text)
+                packed = array('f', vector)
+                self._remember(key, packed)
+                rows.append((key, model, packed.tobytes()))
+
+            if self._disk is not None and rows:
+                self._disk.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, model, vector) VALUES (?, ?, ?)",
+                    rows
+                )
+                self._disk.commit()
+
+    def record_api_call(self, seconds: float):
+        with self._lock:
+            self.api_calls += 1
+            self.api_seconds += seconds
+
+    def record_saved_call(self):
+        with self._lock:
+            self.api_calls_saved += 1
+
+    def _remember(self, key: str, vector: array):
+        if self.max_entries <= 0:
+            return
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _read_disk(self, keys: List[str]) -> dict:
+        found = {}
+        # SQLite caps the number of bound parameters per statement
+        for start in range(0, len(keys), 500):
+            batch = keys[start:start + 500]
+            placeholders = ",".join("?" * len(batch))
+            rows = self._disk.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                batch
+            ).fetchall()
+            for key, blob in rows:
+                vector = array('f')
+                vector.frombytes(blob)
+                found[key] = vector
+        return found
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            avg_call_seconds = self.api_seconds / self.api_calls if self.api_calls else 0.0
+            return {
+                "memory_entries": len(self._memory),
+                "max_entries": self.max_entries,
+                "disk_path": self.disk_path,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "hits": hits,
+                "misses": self.misses,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "api_calls": self.api_calls,
+                "api_calls_saved": self.api_calls_saved,
+                "avg_api_call_ms": avg_call_seconds * 1000,
+                "estimated_ms_saved": self.api_calls_saved * avg_call_seconds * 1000
+            }
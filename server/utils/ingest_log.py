@@ -0,0 +1,239 @@
+import json
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+import zlib
+from collections import deque
+from typing import Dict, List, Set, Tuple
+
+import numpy as np
+
+# Record layout: <payload length: u32><crc32 of payload: u32><JSON payload>
+HEADER = struct.Struct("<II")
+SEGMENT_PATTERN = re.compile(r"^segment-(\d{8})\.log$")
+DEAD_LETTER_FILE = "dead-letter.log"
+LATENCY_SAMPLES = 1000
+
+
+class IngestLog:
+    # Segments are only deleted oldest-first, once every chunk in them is
+    # committed, so a commit record never outlives the chunk it refers to.
+    # Chunks that cannot be stored are moved to the dead-letter file (same
+    # record format, never replayed) and committed, so they don't hold
+    # their segment open forever.
+    def __init__(self, directory: str, segment_bytes: int = 16 * 1024 * 1024,
+                 fsync: bool = True, target_ms: float = 5.0):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.fsync = fsync
+        self.target_ms = target_ms
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._next_id = 1
+        self._segment_index = 0
+        self._file = None
+        self._pending_by_segment: Dict[int, Set[int]] = {}
+        self._segment_of: Dict[int, int] = {}
+
+        self.appends = 0
+        self.dead_lettered = 0
+        self.append_latencies = deque(maxlen=LATENCY_SAMPLES)
+        self.appends_over_target = 0
+
+    def _segment_path(self, index: int) -> str:
+        return os.path.join(self.directory, f"segment-{index:08d}.log")
+
+    def _segment_indexes(self) -> List[int]:
+        indexes = []
+        for name in os.listdir(self.directory):
+            match = SEGMENT_PATTERN.match(name)
+            if match:
+                indexes.append(int(match.group(1)))
+        return sorted(indexes)
+
+    def _read_segment(self, index: int) -> Tuple[List[dict], int]:
+        path = self._segment_path(index)
+        records = []
+        if os.path.getsize(path) == 0:
+            return records, 0
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            offset = 0
+            while offset + HEADER.size <= len(view):
+                length, checksum = HEADER.unpack_from(view, offset)
+                start = offset + HEADER.size
+                payload = view[start:start + length]
+                if len(payload) < length or zlib.crc32(payload) != checksum:
+                    # Torn write at the tail of the segment
+                    break
+                records.append(json.loads(payload))
+                offset = start + length
+        return records, offset
+
+    def replay(self) -> List[Tuple[int, dict]]:
+        with self._lock:
+            chunks: Dict[int, dict] = {}
+            committed: Set[int] = set()
+            indexes = self._segment_indexes()
+            for index in indexes:
+                records, valid_bytes = self._read_segment(index)
+                for record in records:
+                    if record["t"] == "chunk":
+                        chunks[record["id"]] = record["data"]
+                    elif record["t"] == "commit":
+                        committed.update(record["ids"])
+                if valid_bytes < os.path.getsize(self._segment_path(index)):
+                    with open(self._segment_path(index), "r+b") as f:
+                        f.truncate(valid_bytes)
+
+            if chunks:
+                self._next_id = max(chunks) + 1
+            pending = sorted(
+                (chunk_id, data) for chunk_id, data in chunks.items()
+                if chunk_id not in committed
+            )
+
+            # Compact: rewrite the uncommitted chunks into a fresh segment
+            # and drop everything older.
+            self._segment_index = (indexes[-1] + 1) if indexes else 0
+            self._open_segment()
+            if pending:
+                self._write([
+                    {"t": "chunk", "id": chunk_id, "data": data}
+                    for chunk_id, data in pending
+                ])
+                self._sync()
+                for chunk_id, _ in pending:
+                    self._track(chunk_id)
+            for index in indexes:
+                os.remove(self._segment_path(index))
+            return pending
+
+    def append_many(self, chunks: List[dict]) -> List[int]:
+        if not chunks:
+            return []
+        started = time.perf_counter()
+        with self._lock:
+            if self._file is None:
+                self._open_segment()
+            ids = list(range(self._next_id, self._next_id + len(chunks)))
+            self._next_id += len(chunks)
+            self._write([
+                {"t": "chunk", "id": chunk_id, "data": chunk_data}
+                for chunk_id, chunk_data in zip(ids, chunks)
+            ])
+            self._sync()
+            for chunk_id in ids:
+                self._track(chunk_id)
+            self._maybe_roll()
+
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.appends += 1
+            self.append_latencies.append(elapsed_ms)
+            if elapsed_ms > self.target_ms:
+                self.appends_over_target += 1
+        return ids
+
+    def append(self, chunk_data: dict) -> int:
+        return self.append_many([chunk_data])[0]
+
+    def commit(self, chunk_ids: List[int]):
+        # Commit records are flushed but not fsynced: losing one only means
+        # the chunk is replayed and upserted again after a crash.
+        chunk_ids = [chunk_id for chunk_id in chunk_ids if chunk_id is not None]
+        if not chunk_ids:
+            return
+        with self._lock:
+            if self._file is None:
+                self._open_segment()
+            self._write([{"t": "commit", "ids": chunk_ids}])
+            self._file.flush()
+            for chunk_id in chunk_ids:
+                index = self._segment_of.pop(chunk_id, None)
+                if index is not None:
+                    self._pending_by_segment[index].discard(chunk_id)
+            self._drop_committed_segments()
+            self._maybe_roll()
+
+    def dead_letter(self, entries: List[Tuple[int, dict]]):
+        entries = [(chunk_id, data) for chunk_id, data in entries if chunk_id is not None]
+        if not entries:
+            return
+        with self._lock:
+            with open(os.path.join(self.directory, DEAD_LETTER_FILE), "ab") as f:
+                f.write(self._encode([
+                    {"t": "chunk", "id": chunk_id, "data": data}
+                    for chunk_id, data in entries
+                ]))
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+            self.dead_lettered += len(entries)
+        self.commit([chunk_id for chunk_id, _ in entries])
+
+    def _open_segment(self):
+        if self._file is not None:
+            self._file.close()
+        self._file = open(self._segment_path(self._segment_index), "ab")
+        self._pending_by_segment.setdefault(self._segment_index, set())
+
+    @staticmethod
+    def _encode(records: List[dict]) -> bytes:
+        buffer = bytearray()
+        for record in records:
+            payload = json.dumps(record, separators=(",", ":")).encode("utf-8")
+            buffer += HEADER.pack(len(payload), zlib.crc32(payload))
+            buffer += payload
+        return bytes(buffer)
+
+    def _write(self, records: List[dict]):
+        self._file.write(self._encode(records))
+
+    def _sync(self):
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def _track(self, chunk_id: int):
+        self._segment_of[chunk_id] = self._segment_index
+        self._pending_by_segment[self._segment_index].add(chunk_id)
+
+    def _maybe_roll(self):
+        if self._file.tell() >= self.segment_bytes:
+            self._segment_index += 1
+            self._open_segment()
+            self._drop_committed_segments()
+
+    def _drop_committed_segments(self):
+        for index in sorted(self._pending_by_segment):
+            if index == self._segment_index or self._pending_by_segment[index]:
+                return
+            del self._pending_by_segment[index]
+            path = self._segment_path(index)
+            if os.path.exists(path):
+                os.remove(path)
+
+    def stats(self) -> dict:
+        with self._lock:
+            latencies = np.array(self.append_latencies) if self.append_latencies else None
+            return {
+                "directory": self.directory,
+                "fsync": self.fsync,
+                "segments": len(self._pending_by_segment),
+                "uncommitted_chunks": len(self._segment_of),
+                "dead_lettered_chunks": self.dead_lettered,
+                "appends": self.appends,
+                "append_p50_ms": float(np.percentile(latencies, 50)) if latencies is not None else 0.0,
+                "append_p99_ms": float(np.percentile(latencies, 99)) if latencies is not None else 0.0,
+                "target_ms": self.target_ms,
+                "appends_over_target": self.appends_over_target
+            }
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
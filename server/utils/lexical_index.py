@@ -0,0 +1,141 @@
+import math
+import re
+import threading
+from collections import Counter, deque
+from typing import Dict, List, Optional, Tuple
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset("""
+a an and are as at be but by can did do does for from had has have he her his how i if in into is
+it its me my of on or our she so than that the their them then there these they this to was we were
+what when where which who why will with you your
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+class _SessionIndex:
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.doc_terms: Dict[int, Counter] = {}
+        self.doc_lengths: Dict[int, int] = {}
+        self.docs: Dict[int, dict] = {}
+        self.order = deque()
+        self.total_length = 0
+        self.next_id = 0
+
+    def add(self, chunk: dict, text: str):
+        terms = Counter(tokenize(text))
+        doc_id = self.next_id
+        self.next_id += 1
+        for term, count in terms.items():
+            self.postings.setdefault(term, {})[doc_id] = count
+        self.doc_terms[doc_id] = terms
+        self.doc_lengths[doc_id] = sum(terms.values())
+        self.docs[doc_id] = chunk
+        self.order.append(doc_id)
+        self.total_length += self.doc_lengths[doc_id]
+        while len(self.order) > self.capacity:
+            self._remove(self.order.popleft())
+
+    def _remove(self, doc_id: int):
+        terms = self.doc_terms.pop(doc_id)
+        for term in terms:
+            posting = self.postings[term]
+            del posting[doc_id]
+            if not posting:
+                del self.postings[term]
+        del self.docs[doc_id]
+        self.total_length -= self.doc_lengths.pop(doc_id)
+
+    def search(self, query_terms: List[str], segment_id: Optional[str], limit: int,
+               k1: float, b: float) -> List[Tuple[float, dict, int, float]]:
+        doc_count = len(self.docs)
+        if not doc_count or not query_terms:
+            return []
+        average_length = self.total_length / doc_count or 1.0
+        unique_terms = set(query_terms)
+        scores: Dict[int, float] = {}
+        matched: Dict[int, int] = {}
+        ideal = 0.0
+        for term in unique_terms:
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            idf = math.log(1 + (doc_count - len(posting) + 0.5) / (len(posting) + 0.5))
+            ideal += idf
+            for doc_id, frequency in posting.items():
+                length = self.doc_lengths[doc_id]
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (k1 + 1) / (
+                    frequency + k1 * (1 - b + b * length / average_length)
+                )
+                matched[doc_id] = matched.get(doc_id, 0) + 1
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        results = []
+        for doc_id, score in ranked:
+            chunk = self.docs[doc_id]
+            if segment_id is not None and chunk.get('segment_id') != segment_id:
+                continue
+            results.append((score, chunk, matched[doc_id], score / ideal if ideal else 0.0))
+            if len(results) >= limit:
+                break
+        return results
+
+
+class LexicalIndex:
+    # In-process BM25 index over the chunks ingested for each session. Each
+    # hit is (score, chunk, matched query terms, relative score). The
+    # relative score divides by the score an average-length chunk holding
+    # every indexed query term once would get, so it is ~1.0 for a full
+    # match regardless of corpus size.
+    def __init__(self, capacity_per_session: int = 5000, k1: float = 1.5, b: float = 0.75):
+        self.capacity_per_session = capacity_per_session
+        self.k1 = k1
+        self.b = b
+        self._sessions: Dict[str, _SessionIndex] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity_per_session > 0
+
+    def add_many(self, session_key: str, chunks: List[dict], text_key: str = 'text'):
+        if not self.enabled or not chunks:
+            return
+        with self._lock:
+            index = self._sessions.get(session_key)
+            if index is None:
+                index = _SessionIndex(self.capacity_per_session)
+                self._sessions[session_key] = index
+            for chunk in chunks:
+                index.add(chunk, chunk[text_key])
+
+    def search(self, session_key: str, query: str, segment_id: Optional[str] = None,
+               limit: int = 3) -> List[Tuple[float, dict, int, float]]:
+        query_terms = tokenize(query)
+        return self.search_terms(session_key, query_terms, segment_id, limit)
+
+    def search_terms(self, session_key: str, query_terms: List[str], segment_id: Optional[str] = None,
+                     limit: int = 3) -> List[Tuple[float, dict, int, float]]:
+        with self._lock:
+            index = self._sessions.get(session_key)
+            if index is None:
+                return []
+            return index.search(query_terms, segment_id, limit, self.k1, self.b)
+
+    def drop_session(self, session_key: str):
+        with self._lock:
+            self._sessions.pop(session_key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "capacity_per_session": self.capacity_per_session,
+                "chunks": sum(len(index.docs) for index in self._sessions.values()),
+                "terms": sum(len(index.postings) for index in self._sessions.values())
+            }
@@ -0,0 +1,266 @@
+import json
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, Optional, Tuple, Union
+from urllib.parse import parse_qs
+
+PREFIX = "lecture_rag"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Stage timings of the request being served, when it asked for them
+_request_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_timings", default=None)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: Tuple) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, label_names: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series: Dict[Tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # Per-bucket counts (last one is +Inf), then sum and count
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def summary(self, *labels) -> dict:
+        # Quantiles are interpolated within buckets, as histogram_quantile does
+        with self._lock:
+            series = list(self._series.get(labels, ()))
+        if not series or not series[-1]:
+            return {"count": 0}
+        count = series[-1]
+        summary = {"count": count, "mean": series[-2] / count}
+        for name, q in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99)):
+            rank = q * count
+            cumulative = 0
+            for index, bucket_count in enumerate(series[:len(self.buckets) + 1]):
+                if bucket_count and cumulative + bucket_count >= rank:
+                    if index == len(self.buckets):
+                        summary[name] = self.buckets[-1]
+                    else:
+                        lower = self.buckets[index - 1] if index else 0.0
+                        summary[name] = lower + (self.buckets[index] - lower) * (rank - cumulative) / bucket_count
+                    break
+                cumulative += bucket_count
+        return summary
+
+    def render(self) -> str:
+        with self._lock:
+            snapshot = {labels: list(series) for labels, series in self._series.items()}
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                bucket_labels = _labels(self.label_names + ("le",), labels + (_number(bound),))
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {_number(series[-2])}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {series[-1]}")
+        return "\n".join(lines)
+
+
+class Counter:
+    def __init__(self, name: str, help: str, label_names: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> str:
+        with self._lock:
+            snapshot = dict(self._values)
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(snapshot.items()):
+            lines.append(f"{self.name}{_labels(self.label_names, labels)} {_number(value)}")
+        return "\n".join(lines)
+
+
+class _Callback:
+    # Read at scrape time, so gauges cost nothing on the request path. The
+    # callback returns a number, or {label value: number} for one label.
+    def __init__(self, name: str, help: str, kind: str, fn: Callable[[], Union[float, dict]],
+                 label_name: Optional[str]):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.fn = fn
+        self.label_name = label_name
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        try:
+            value = self.fn()
+        except Exception:
+            return "\n".join(lines)
+        if isinstance(value, dict):
+            for label, number in sorted(value.items()):
+                lines.append(f"{self.name}{_labels((self.label_name,), (label,))} {_number(number)}")
+        else:
+            lines.append(f"{self.name} {_number(value)}")
+        return "\n".join(lines)
+
+
+class _Span:
+    __slots__ = ("registry", "stage", "started")
+
+    def __init__(self, registry: "MetricsRegistry", stage: str):
+        self.registry = registry
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.registry.observe(self.stage, time.perf_counter() - self.started)
+        return False
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.stages = Histogram(f"{PREFIX}_stage_seconds",
+                                "Time spent in each processing stage", ("stage",))
+        self.requests = Histogram(f"{PREFIX}_request_seconds",
+                                  "End-to-end HTTP request latency", ("endpoint", "method"))
+        self.responses = Counter(f"{PREFIX}_responses_total",
+                                 "HTTP responses by status code", ("endpoint", "method", "status"))
+        self.errors = Counter(f"{PREFIX}_errors_total", "Errors by component", ("component",))
+        self._callbacks: Dict[str, _Callback] = {}
+
+    def span(self, stage: str) -> _Span:
+        return _Span(self, stage)
+
+    def observe(self, stage: str, seconds: float):
+        self.stages.observe(seconds, stage)
+        timings = _request_timings.get()
+        if timings is not None:
+            key = f"{stage}_ms"
+            timings[key] = timings.get(key, 0.0) + seconds * 1000
+
+    def observe_request(self, endpoint: str, method: str, status: int, seconds: float):
+        self.requests.observe(seconds, endpoint, method)
+        self.responses.inc(endpoint, method, str(status))
+
+    def gauge(self, name: str, help: str, fn: Callable[[], Union[float, dict]], label_name: str = None):
+        self._callbacks[name] = _Callback(f"{PREFIX}_{name}", help, "gauge", fn, label_name)
+
+    def counter_callback(self, name: str, help: str, fn: Callable[[], Union[float, dict]],
+                         label_name: str = None):
+        self._callbacks[name] = _Callback(f"{PREFIX}_{name}", help, "counter", fn, label_name)
+
+    def render(self) -> str:
+        families = [self.stages, self.requests, self.responses, self.errors] + list(self._callbacks.values())
+        return "\n".join(family.render() for family in families) + "\n"
+
+
+def start_request_timings(enabled: bool):
+    _request_timings.set({} if enabled else None)
+
+
+def finish_request_timings() -> Optional[Dict[str, float]]:
+    timings = _request_timings.get()
+    _request_timings.set(None)
+    return timings
+
+
+def timings_requested(value: Optional[str], default: bool) -> bool:
+    # ?timings=true adds the stage timings of that request to its JSON body
+    if value is None:
+        return default
+    return value.lower() in ("1", "true")
+
+
+def add_timings(body: bytes, timings: Dict[str, float], seconds: float) -> Optional[bytes]:
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return None
+    if not isinstance(data, dict):
+        return None
+    data["timings"] = dict(timings, total_ms=seconds * 1000)
+    return json.dumps(data).encode("utf-8")
+
+
+class RequestMetricsMiddleware:
+    # ASGI counterpart of the request hooks on the Flask blueprint. Bodies
+    # are only buffered when the request asked for timings.
+    def __init__(self, app, timings_default: bool = False):
+        self.app = app
+        self.timings_default = timings_default
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        start_request_timings(timings_requested(query.get("timings", [None])[-1], self.timings_default))
+        status = 500
+        held_start = None
+        held_body = []
+
+        async def send_with_timings(message):
+            nonlocal status, held_start
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                content_type = dict(message.get("headers", [])).get(b"content-type", b"")
+                if _request_timings.get() is not None and content_type.startswith(b"application/json"):
+                    held_start = message
+                    return
+            elif held_start is not None and message["type"] == "http.response.body":
+                held_body.append(message.get("body", b""))
+                if message.get("more_body"):
+                    return
+                body = b"".join(held_body)
+                body = add_timings(body, _request_timings.get(), time.perf_counter() - started) or body
+                headers = [(name, value) for name, value in held_start.get("headers", [])
+                           if name.lower() != b"content-length"]
+                headers.append((b"content-length", str(len(body)).encode("latin-1")))
+                await send(dict(held_start, headers=headers))
+                await send({"type": "http.response.body", "body": body})
+                return
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timings)
+        finally:
+            endpoint = getattr(scope.get("endpoint"), "__name__", "unmatched")
+            metrics.observe_request(endpoint, scope["method"], status, time.perf_counter() - started)
+            finish_request_timings()
+
+
+metrics = MetricsRegistry()
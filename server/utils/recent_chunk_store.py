@@ -0,0 +1,88 @@
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class _SessionRing:
+    def __init__(self, capacity: int, dimension: int):
+        self.capacity = capacity
+        self.vectors = np.zeros((capacity, dimension), dtype=np.float32)
+        self.chunks: List[Optional[dict]] = [None] * capacity
+        self.next_index = 0
+        self.size = 0
+
+    def add(self, chunk: dict, vector: np.ndarray):
+        self.vectors[self.next_index] = vector
+        self.chunks[self.next_index] = chunk
+        self.next_index = (self.next_index + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def search(self, query: np.ndarray, segment_id: Optional[str], limit: int) -> List[Tuple[float, dict]]:
+        if self.size == 0 or limit <= 0:
+            return []
+        scores = self.vectors[:self.size] @ query
+        if segment_id is not None:
+            mask = np.fromiter(
+                (chunk.get('segment_id') == segment_id for chunk in self.chunks[:self.size]),
+                dtype=bool,
+                count=self.size
+            )
+            scores = np.where(mask, scores, -np.inf)
+
+        limit = min(limit, self.size)
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top])]
+        return [
+            (float(scores[i]), self.chunks[i])
+            for i in top
+            if np.isfinite(scores[i])
+        ]
+
+
+class RecentChunkStore:
+    def __init__(self, capacity_per_session: int = 32):
+        self.capacity_per_session = capacity_per_session
+        self._sessions: Dict[str, _SessionRing] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(vectors) -> np.ndarray:
+        matrix = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def add_many(self, session_key: str, chunks: List[dict], embeddings: List[List[float]]):
+        if self.capacity_per_session <= 0 or not chunks:
+            return
+        vectors = self._normalize(embeddings)
+        with self._lock:
+            ring = self._sessions.get(session_key)
+            if ring is None:
+                ring = _SessionRing(self.capacity_per_session, vectors.shape[1])
+                self._sessions[session_key] = ring
+            for chunk, vector in zip(chunks, vectors):
+                ring.add(chunk, vector)
+
+    def search(self, session_key: str, query_embedding: List[float],
+               segment_id: Optional[str] = None, limit: int = 3) -> List[Tuple[float, dict]]:
+        query = self._normalize(query_embedding)[0]
+        with self._lock:
+            ring = self._sessions.get(session_key)
+            if ring is None:
+                return []
+            return ring.search(query, segment_id, limit)
+
+    def drop_session(self, session_key: str):
+        with self._lock:
+            self._sessions.pop(session_key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "capacity_per_session": self.capacity_per_session,
+                "chunks": sum(ring.size for ring in self._sessions.values()),
+                "bytes": sum(ring.vectors.nbytes for ring in self._sessions.values())
+            }
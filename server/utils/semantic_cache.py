@@ -0,0 +1,114 @@
+import threading
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+
+class _SessionAnswers:
+    def __init__(self):
+        self.version = 0
+        self.scopes: List[Hashable] = []
+        self.vectors: List[np.ndarray] = []
+        self.versions: List[int] = []
+        self.answers: List[dict] = []
+
+    def drop_stale(self) -> int:
+        keep = [i for i, version in enumerate(self.versions) if version == self.version]
+        dropped = len(self.versions) - len(keep)
+        if dropped:
+            self.scopes = [self.scopes[i] for i in keep]
+            self.vectors = [self.vectors[i] for i in keep]
+            self.versions = [self.versions[i] for i in keep]
+            self.answers = [self.answers[i] for i in keep]
+        return dropped
+
+
+class SemanticAnswerCache:
+    def __init__(self, threshold: float = 0.95, max_entries_per_session: int = 64):
+        self.threshold = threshold
+        self.max_entries_per_session = max_entries_per_session
+        self._sessions: Dict[str, _SessionAnswers] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries_per_session > 0
+
+    @staticmethod
+    def _normalize(vector: List[float]) -> np.ndarray:
+        array = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(array)
+        return array / norm if norm else array
+
+    def mark_updated(self, session_key: str):
+        with self._lock:
+            session = self._sessions.setdefault(session_key, _SessionAnswers())
+            session.version += 1
+
+    def version(self, session_key: str) -> int:
+        with self._lock:
+            session = self._sessions.get(session_key)
+            return session.version if session is not None else 0
+
+    def lookup(self, session_key: str, scope: Hashable,
+               vector: List[float]) -> Tuple[Optional[dict], dict]:
+        info = {"hit": False, "similarity": None, "invalidated": 0}
+        with self._lock:
+            session = self._sessions.get(session_key)
+            if session is not None:
+                dropped = session.drop_stale()
+                self.invalidations += dropped
+                info["invalidated"] = dropped
+
+                candidates = [i for i, entry_scope in enumerate(session.scopes) if entry_scope == scope]
+                if candidates:
+                    matrix = np.stack([session.vectors[i] for i in candidates])
+                    similarities = matrix @ self._normalize(vector)
+                    best = int(np.argmax(similarities))
+                    info["similarity"] = float(similarities[best])
+                    if similarities[best] >= self.threshold:
+                        self.hits += 1
+                        info["hit"] = True
+                        return dict(session.answers[candidates[best]]), info
+
+            self.misses += 1
+            return None, info
+
+    def store(self, session_key: str, scope: Hashable, vector: List[float],
+              answer: dict, version: int):
+        with self._lock:
+            session = self._sessions.setdefault(session_key, _SessionAnswers())
+            if version != session.version:
+                return
+            session.scopes.append(scope)
+            session.vectors.append(self._normalize(vector))
+            session.versions.append(version)
+            session.answers.append(dict(answer))
+
+            overflow = len(session.answers) - self.max_entries_per_session
+            if overflow > 0:
+                del session.scopes[:overflow]
+                del session.vectors[:overflow]
+                del session.versions[:overflow]
+                del session.answers[:overflow]
+
+    def drop_session(self, session_key: str):
+        with self._lock:
+            self._sessions.pop(session_key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "sessions": len(self._sessions),
+                "entries": sum(len(session.answers) for session in self._sessions.values()),
+                "threshold": self.threshold,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
@@ -0,0 +1,241 @@
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+# Records created only so the RAG's per-session caches share the store's TTL.
+CACHE_STATUS = 'cache'
+EVICTABLE_STATUSES = ('completed', 'inactive', CACHE_STATUS)
+
+
+def _approx_size(value) -> int:
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(_approx_size(key) + _approx_size(item) for key, item in value.items())
+    elif isinstance(value, (list, tuple, deque)):
+        size += sum(_approx_size(item) for item in value)
+    return size
+
+
+class _SizedDeque(deque):
+    # Bounded deque that keeps a running total of its items' approximate
+    # size (measured when appended), so budget checks don't walk every item
+    def __init__(self, maxlen: int):
+        super().__init__(maxlen=maxlen)
+        self._sizes = deque(maxlen=maxlen)
+        self.item_bytes = 0
+
+    def append(self, item):
+        if self.maxlen is not None and len(self._sizes) == self.maxlen:
+            self.item_bytes -= self._sizes[0]
+        size = _approx_size(item)
+        self._sizes.append(size)
+        self.item_bytes += size
+        super().append(item)
+
+    def clear(self):
+        self._sizes.clear()
+        self.item_bytes = 0
+        super().clear()
+
+    def approx_bytes(self) -> int:
+        return sys.getsizeof(self) + self.item_bytes
+
+
+class SessionRecord:
+    __slots__ = (
+        'course_title', 'lecture_title', 'start_time', 'last_update', 'end_time',
+        'status', 'chunk_count', 'last_processed', 'errors', 'backup', 'memory',
+        'metadata', 'touched_at'
+    )
+
+    def __init__(self, course_title: str, lecture_title: str, start_time: datetime,
+                 max_backup: int, max_errors: int, max_memory: int):
+        self.course_title = course_title
+        self.lecture_title = lecture_title
+        self.start_time = start_time
+        self.last_update = start_time
+        self.end_time: Optional[datetime] = None
+        self.status = 'active'
+        self.chunk_count = 0
+        self.last_processed: Optional[datetime] = None
+        self.errors = _SizedDeque(max_errors)
+        self.backup = _SizedDeque(max_backup)
+        self.memory = _SizedDeque(max_memory)
+        self.metadata: Optional[Dict] = None
+        self.touched_at = time.monotonic()
+
+    def touch(self):
+        self.touched_at = time.monotonic()
+
+    def to_dict(self) -> dict:
+        return {
+            'course_title': self.course_title,
+            'lecture_title': self.lecture_title,
+            'start_time': self.start_time.isoformat(),
+            'last_update': self.last_update.isoformat(),
+            'end_time': self.end_time.isoformat() if self.end_time else None,
+            'status': self.status,
+            'total_chunks': self.chunk_count
+        }
+
+    def approx_bytes(self) -> Dict[str, int]:
+        return {
+            'records': sys.getsizeof(self) + sum(
+                sys.getsizeof(getattr(self, name))
+                for name in ('course_title', 'lecture_title', 'start_time', 'last_update',
+                             'end_time', 'status', 'last_processed')
+            ),
+            'backup_content': self.backup.approx_bytes(),
+            'error_logs': self.errors.approx_bytes(),
+            'session_memory': self.memory.approx_bytes(),
+            'lecture_metadata': _approx_size(self.metadata) if self.metadata else 0
+        }
+
+
+class SessionStore:
+    # Completed or inactive sessions are evicted after ttl_seconds without a
+    # touch, or earlier (least recently touched first) while the store is over
+    # max_sessions or max_bytes. The byte budget is checked by evict_expired,
+    # which the caller runs periodically. Active sessions are never evicted.
+    def __init__(self, ttl_seconds: float = 3600, max_sessions: int = 10000,
+                 max_bytes: int = 64 * 1024 * 1024, max_backup: int = 100,
+                 max_errors: int = 100, max_memory: int = 50):
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.max_backup = max_backup
+        self.max_errors = max_errors
+        self.max_memory = max_memory
+        self._records: Dict[str, SessionRecord] = {}
+        self._lock = threading.RLock()
+        self._listeners: List[Callable[[str], None]] = []
+        self._guards: List[Callable[[str], bool]] = []
+
+        self.ttl_evictions = 0
+        self.budget_evictions = 0
+
+    def add_eviction_listener(self, listener: Callable[[str], None]):
+        self._listeners.append(listener)
+
+    def add_eviction_guard(self, guard: Callable[[str], bool]):
+        self._guards.append(guard)
+
+    def __contains__(self, session_key: str) -> bool:
+        return session_key in self._records
+
+    def get(self, session_key: str) -> Optional[SessionRecord]:
+        return self._records.get(session_key)
+
+    def items(self) -> List[tuple]:
+        with self._lock:
+            return list(self._records.items())
+
+    def get_or_create(self, session_key: str, course_title: str, lecture_title: str,
+                      start_time: datetime, status: str = 'active') -> SessionRecord:
+        # status only applies to a new record
+        with self._lock:
+            record = self._records.get(session_key)
+            if record is None:
+                record = SessionRecord(course_title, lecture_title, start_time,
+                                       self.max_backup, self.max_errors, self.max_memory)
+                record.status = status
+                self._records[session_key] = record
+                if len(self._records) > self.max_sessions:
+                    self.enforce_budget()
+            record.touch()
+            return record
+
+    def log_error(self, session_key: str, message: str):
+        record = self._records.get(session_key)
+        if record is not None:
+            record.errors.append(message)
+
+    def remember(self, session_key: str, response: str):
+        record = self._records.get(session_key)
+        if record is not None and response not in record.memory:
+            record.memory.append(response)
+
+    def discard(self, session_key: str) -> Optional[SessionRecord]:
+        with self._lock:
+            record = self._records.pop(session_key, None)
+        if record is not None:
+            self._notify(session_key)
+        return record
+
+    def _notify(self, session_key: str):
+        for listener in self._listeners:
+            try:
+                listener(session_key)
+            except Exception as e:
+                print(f"Error in session eviction listener: {str(e)}")
+
+    def _evictable(self, session_key: str, record: SessionRecord) -> bool:
+        return record.status in EVICTABLE_STATUSES and all(guard(session_key) for guard in self._guards)
+
+    def evict_expired(self) -> int:
+        now = time.monotonic()
+        with self._lock:
+            expired = [
+                session_key for session_key, record in self._records.items()
+                if now - record.touched_at > self.ttl_seconds and self._evictable(session_key, record)
+            ]
+            for session_key in expired:
+                del self._records[session_key]
+            self.ttl_evictions += len(expired)
+        for session_key in expired:
+            self._notify(session_key)
+        return len(expired) + self.enforce_budget()
+
+    def enforce_budget(self) -> int:
+        evicted = []
+        with self._lock:
+            total_bytes = self._total_bytes()
+            if len(self._records) > self.max_sessions or total_bytes > self.max_bytes:
+                candidates = sorted(
+                    (record.touched_at, session_key) for session_key, record in self._records.items()
+                    if self._evictable(session_key, record)
+                )
+                for _, session_key in candidates:
+                    if len(self._records) <= self.max_sessions and total_bytes <= self.max_bytes:
+                        break
+                    record = self._records.pop(session_key)
+                    total_bytes -= sum(record.approx_bytes().values())
+                    evicted.append(session_key)
+                self.budget_evictions += len(evicted)
+        for session_key in evicted:
+            self._notify(session_key)
+        return len(evicted)
+
+    def _total_bytes(self) -> int:
+        return sum(sum(record.approx_bytes().values()) for record in self._records.values())
+
+    def stats(self) -> dict:
+        with self._lock:
+            by_status: Dict[str, int] = {}
+            structure_bytes = {
+                'records': 0, 'backup_content': 0, 'error_logs': 0,
+                'session_memory': 0, 'lecture_metadata': 0
+            }
+            counts = {'backup_content': 0, 'error_logs': 0, 'session_memory': 0}
+            for record in self._records.values():
+                by_status[record.status] = by_status.get(record.status, 0) + 1
+                for name, size in record.approx_bytes().items():
+                    structure_bytes[name] += size
+                counts['backup_content'] += len(record.backup)
+                counts['error_logs'] += len(record.errors)
+                counts['session_memory'] += len(record.memory)
+            return {
+                "sessions": len(self._records),
+                "by_status": by_status,
+                "counts": counts,
+                "bytes": structure_bytes,
+                "total_bytes": sum(structure_bytes.values()),
+                "max_sessions": self.max_sessions,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "ttl_evictions": self.ttl_evictions,
+                "budget_evictions": self.budget_evictions
+            }
@@ -0,0 +1,92 @@
+import asyncio
+import re
+import threading
+from typing import Awaitable, Callable, Dict, Hashable, Tuple
+
+WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_question(question: str) -> str:
+    # Case, spacing and trailing punctuation don't change what is asked
+    return WHITESPACE.sub(" ", question).strip().rstrip("?!. ").lower()
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    # Concurrent calls with the same key wait for the first caller and share
+    # its result. Nothing is kept once that call returns, so this is not a
+    # cache: a later identical question is computed again (or answered by
+    # the answer cache). Thread callers and asyncio callers are coalesced
+    # separately but counted together.
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._calls: Dict[Hashable, _Call] = {}
+        self._tasks: Dict[Hashable, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+
+    def _count(self, leader: bool):
+        if leader:
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+
+    def do(self, key: Hashable, fn: Callable[[], dict]) -> Tuple[dict, bool]:
+        # Returns the result and whether it was shared from another caller
+        if not self.enabled:
+            return fn(), False
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            self._count(leader)
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    async def ado(self, key: Hashable, fn: Callable[[], Awaitable[dict]]) -> Tuple[dict, bool]:
+        if not self.enabled:
+            return await fn(), False
+        with self._lock:
+            task = self._tasks.get(key)
+            leader = task is None
+            if leader:
+                task = self._tasks[key] = asyncio.ensure_future(fn())
+                task.add_done_callback(lambda _: self._tasks.pop(key, None))
+            self._count(leader)
+        # Shielded so a caller that disconnects doesn't cancel the
+        # computation the others are waiting on
+        return await asyncio.shield(task), not leader
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "in_flight": len(self._calls) + len(self._tasks),
+                "upstream_calls": self.leaders,
+                "upstream_calls_saved": self.coalesced
+            }
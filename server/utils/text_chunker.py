@@ -0,0 +1,76 @@
+import time
+from typing import List, Optional
+
+SENTENCE_ENDINGS = ('.', '!', '?', '."', '!"', '?"', ".'", "!'", "?'", '.)', '!)', '?)')
+
+
+class StreamingChunker:
+    # Word-based chunker that can be fed text incrementally. A chunk is cut
+    # once it reaches chunk_size characters; with snap_to_sentence it keeps
+    # growing until a word ends a sentence, up to max_chunk_size. The last
+    # `overlap` characters (whole words) of each chunk start the next one.
+    def __init__(self, chunk_size: int = 500, overlap: int = 0,
+                 snap_to_sentence: bool = False, max_chunk_size: Optional[int] = None):
+        self.chunk_size = max(1, chunk_size)
+        self.overlap = min(max(0, overlap), self.chunk_size // 2)
+        self.snap_to_sentence = snap_to_sentence
+        self.max_chunk_size = max(self.chunk_size, max_chunk_size or self.chunk_size)
+
+        self.words: List[str] = []
+        self.size = 0
+        self.carried = 0
+        self.last_fed = time.monotonic()
+
+    @property
+    def buffered_chars(self) -> int:
+        return sum(len(word) + 1 for word in self.words[self.carried:])
+
+    @property
+    def has_content(self) -> bool:
+        return len(self.words) > self.carried
+
+    def feed(self, text: str) -> List[str]:
+        self.last_fed = time.monotonic()
+        chunks = []
+        for word in text.split():
+            self.words.append(word)
+            self.size += len(word) + 1
+            if self._should_cut(word):
+                chunks.append(self._emit())
+        return chunks
+
+    def flush(self) -> Optional[str]:
+        if not self.has_content:
+            return None
+        return self._emit()
+
+    def _should_cut(self, word: str) -> bool:
+        if self.size < self.chunk_size:
+            return False
+        if not self.snap_to_sentence or self.size >= self.max_chunk_size:
+            return True
+        return word.endswith(SENTENCE_ENDINGS)
+
+    def _emit(self) -> str:
+        chunk = " ".join(self.words)
+        carry: List[str] = []
+        carry_size = 0
+        for word in reversed(self.words[1:]):
+            if carry_size + len(word) + 1 > self.overlap:
+                break
+            carry.insert(0, word)
+            carry_size += len(word) + 1
+        self.words = carry
+        self.size = carry_size
+        self.carried = len(carry)
+        return chunk
+
+
+def chunk_text(text: str, chunk_size: int = 500, overlap: int = 0,
+               snap_to_sentence: bool = False, max_chunk_size: Optional[int] = None) -> List[str]:
+    chunker = StreamingChunker(chunk_size, overlap, snap_to_sentence, max_chunk_size)
+    chunks = chunker.feed(text)
+    remainder = chunker.flush()
+    if remainder is not None:
+        chunks.append(remainder)
+    return chunks
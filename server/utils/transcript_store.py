@@ -0,0 +1,167 @@
+import threading
+import uuid
+from bisect import bisect_right
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+
+def parse_cursor(value: str) -> Tuple[str, int]:
+    # Cursors are "<generation>-<version>", as returned in a response's cursor
+    generation, _, version = value.strip().partition("-")
+    if not generation or not version.isdigit():
+        raise ValueError(f"Invalid cursor: {value}")
+    return generation, int(version)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    # Weak comparison, as If-None-Match specifies
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class MaterializedTranscript:
+    # A lecture's chunks in timestamp order, kept up to date as chunks are
+    # committed. Every change bumps the version; each chunk also carries the
+    # sequence number (version) of the change that added it. A cursor pairs
+    # a version with the generation, which is new each time the transcript
+    # is rebuilt, so a cursor from before a rebuild is recognised as stale.
+    def __init__(self):
+        self.generation = uuid.uuid4().hex[:8]
+        self.version = 0
+        self.ready = False
+        self.chunks: List[Dict] = []
+        self._timestamps: List[str] = []
+        self._index: Dict[Tuple, Dict] = {}
+        self._response: Optional[Tuple[int, dict]] = None
+        self._lock = threading.Lock()
+        self._response_lock = threading.Lock()
+
+    @staticmethod
+    def _key(chunk: Dict) -> Tuple:
+        return chunk['timestamp'], chunk['segment_id'], chunk.get('chunk_number')
+
+    def cursor(self, version: int) -> str:
+        return f"{self.generation}-{version}"
+
+    def etag(self, version: int) -> str:
+        # The generation keeps tags from a rebuilt transcript from matching
+        return f'"{self.cursor(version)}"'
+
+    def add(self, chunks: Iterable[Dict]) -> int:
+        changed = 0
+        with self._lock:
+            for chunk in chunks:
+                existing = self._index.get(self._key(chunk))
+                if existing is not None:
+                    if existing['text'] == chunk['text']:
+                        continue
+                    existing['text'] = chunk['text']
+                    self.version += 1
+                    existing['seq'] = self.version
+                    changed += 1
+                    continue
+                self.version += 1
+                chunk = dict(chunk, seq=self.version)
+                self._index[self._key(chunk)] = chunk
+                if not self._timestamps or chunk['timestamp'] >= self._timestamps[-1]:
+                    self.chunks.append(chunk)
+                    self._timestamps.append(chunk['timestamp'])
+                else:
+                    position = bisect_right(self._timestamps, chunk['timestamp'])
+                    self.chunks.insert(position, chunk)
+                    self._timestamps.insert(position, chunk['timestamp'])
+                changed += 1
+        return changed
+
+    def snapshot(self) -> Tuple[int, List[Dict]]:
+        with self._lock:
+            return self.version, list(self.chunks)
+
+    def since(self, seq: int) -> Tuple[int, List[Dict]]:
+        with self._lock:
+            return self.version, [chunk for chunk in self.chunks if chunk['seq'] > seq]
+
+    def response(self, build: Callable[[List[Dict]], dict]) -> Tuple[int, dict]:
+        # The full response is built once per version and shared by every
+        # poll until the transcript changes again; concurrent polls wait for
+        # the one build instead of repeating it
+        with self._response_lock:
+            if self._response is None or self._response[0] != self.version:
+                version, chunks = self.snapshot()
+                self._response = (version, build(chunks))
+            return self._response
+
+
+class TranscriptStore:
+    # Least recently read lectures are dropped beyond max_lectures; the next
+    # read rebuilds them from the collection
+    def __init__(self, max_lectures: int = 64):
+        self.max_lectures = max_lectures
+        self._transcripts: "OrderedDict[Tuple[str, str], MaterializedTranscript]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.loads = 0
+        self.not_modified = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_lectures > 0
+
+    def get(self, course_title: str, lecture_title: str) -> Optional[MaterializedTranscript]:
+        key = (course_title, lecture_title)
+        with self._lock:
+            transcript = self._transcripts.get(key)
+            if transcript is None or not transcript.ready:
+                return None
+            self._transcripts.move_to_end(key)
+            self.hits += 1
+            return transcript
+
+    def start_loading(self, course_title: str, lecture_title: str) -> MaterializedTranscript:
+        # Registered before the collection is read so chunks committed while
+        # it loads are not missed; overlap is removed by chunk identity
+        key = (course_title, lecture_title)
+        with self._lock:
+            transcript = self._transcripts.get(key)
+            if transcript is None:
+                transcript = self._transcripts[key] = MaterializedTranscript()
+                while len(self._transcripts) > self.max_lectures:
+                    self._transcripts.popitem(last=False)
+            self.loads += 1
+            return transcript
+
+    def finish_loading(self, transcript: MaterializedTranscript, chunks: Iterable[Dict]):
+        transcript.add(chunks)
+        transcript.ready = True
+
+    def discard(self, course_title: str, lecture_title: str):
+        with self._lock:
+            self._transcripts.pop((course_title, lecture_title), None)
+
+    def add_chunks(self, course_title: str, lecture_title: str, chunks: List[Dict]):
+        # Lectures nobody has read are not materialized
+        with self._lock:
+            transcript = self._transcripts.get((course_title, lecture_title))
+        if transcript is not None:
+            transcript.add(chunks)
+
+    def record_not_modified(self):
+        with self._lock:
+            self.not_modified += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            transcripts = list(self._transcripts.values())
+            return {
+                "lectures": len(transcripts),
+                "chunks": sum(len(transcript.chunks) for transcript in transcripts),
+                "hits": self.hits,
+                "loads": self.loads,
+                "not_modified": self.not_modified
+            }